@@ -3,26 +3,66 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from app.utils.json_provider import AppJSONProvider
+from app.utils.compression import compress_response
+from app.utils.deferred import run_deferred
+from app.utils.metrics import enable_multiprocess
+from app.utils.request_metrics import start_request_timer, record_request
+from app.utils.profiling import start_profiling, stop_profiling
+from app.db.circuit_breaker import database_unavailable_response
+from app.services.health_service import HealthService
 
 
 def create_app():
     """Create and configure Flask application."""
     app = Flask(__name__)
     
+    # Serialize ObjectId/datetime natively (orjson when installed)
+    app.json = AppJSONProvider(app)
+    
     # Load configuration
     app.config.from_object('app.config.Config')
     
-    # Enable CORS
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # Enable CORS (expose ETag for conditional requests, Retry-After for 503s)
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=['ETag', 'Retry-After'])
+    
+    # Time every request (recorded after the final status is known)
+    app.before_request(start_request_timer)
+    app.after_request(record_request)
+    if app.config['METRICS_MULTIPROC_DIR']:
+        enable_multiprocess(app.config['METRICS_MULTIPROC_DIR'], app.config['METRICS_FLUSH_SECONDS'])
+    
+    # Compress large responses
+    app.after_request(compress_response)
+    
+    # Run work deferred by views once the response has been sent
+    app.after_request(run_deferred)
+    
+    # Profile requests on demand (stopped before deferred work is collected)
+    if app.config['PROFILING_TOKEN'] or app.config['PROFILE_SAMPLE_RATE']:
+        app.before_request(start_profiling)
+        app.after_request(stop_profiling)
+    
+    # Answer requests failed by an unreachable database with 503
+    app.after_request(database_unavailable_response)
+    
+    # Probe dependency health in the background (once per worker process)
+    app.before_request(lambda: HealthService.ensure_started(app))
     
     # Initialize JWT
     JWTManager(app)
     
     # Register blueprints
-    from app.routes import auth, user, session, audits
+    from app.routes import auth, user, session, audits, organizations, batch, metrics, health, admin, frontend
     app.register_blueprint(auth.bp)
     app.register_blueprint(user.bp)
     app.register_blueprint(session.bp)
     app.register_blueprint(audits.bp)
+    app.register_blueprint(organizations.bp)
+    app.register_blueprint(batch.bp)
+    app.register_blueprint(metrics.bp)
+    app.register_blueprint(health.bp)
+    app.register_blueprint(admin.bp)
+    app.register_blueprint(frontend.bp)
     
     return app
@@ -1,6 +1,7 @@
 """Application configuration."""
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,6 +21,16 @@ class Config:
     # MongoDB
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
     MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'sustainability_db')
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_BREAKER_FAILURE_THRESHOLD = int(os.getenv('MONGO_BREAKER_FAILURE_THRESHOLD', 5))
+    MONGO_BREAKER_PROBE_SECONDS = float(os.getenv('MONGO_BREAKER_PROBE_SECONDS', 5))
+    MONGODB_MAX_STALENESS_SECONDS = int(os.getenv('MONGODB_MAX_STALENESS_SECONDS', 90))
+    MONGODB_READ_YOUR_WRITES_SECONDS = int(os.getenv('MONGODB_READ_YOUR_WRITES_SECONDS', MONGODB_MAX_STALENESS_SECONDS))
+    
+    # Health probes (stale results count as down; SMTP connects time out)
+    HEALTH_PROBE_SECONDS = float(os.getenv('HEALTH_PROBE_SECONDS', 10))
+    HEALTH_STALE_SECONDS = float(os.getenv('HEALTH_STALE_SECONDS', 3 * HEALTH_PROBE_SECONDS))
+    HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv('HEALTH_PROBE_TIMEOUT_SECONDS', 3))
     
     # Email
     SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -30,3 +41,65 @@ class Config:
     
     # OTP
     OTP_EXPIRY_MINUTES = int(os.getenv('OTP_EXPIRY_MINUTES', 10))
+    OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', 5))
+    TOTP_CACHE_SECONDS = int(os.getenv('TOTP_CACHE_SECONDS', 60))
+    
+    # Analytics
+    RANKING_REFRESH_SECONDS = int(os.getenv('RANKING_REFRESH_SECONDS', 300))
+    LEADERBOARD_MAX_K = int(os.getenv('LEADERBOARD_MAX_K', 100))
+    SCENARIO_MAX_POINTS = int(os.getenv('SCENARIO_MAX_POINTS', 20000))
+    SCENARIO_MAX_DIMENSIONS = int(os.getenv('SCENARIO_MAX_DIMENSIONS', 3))
+    UNCERTAINTY_MAX_SAMPLES = int(os.getenv('UNCERTAINTY_MAX_SAMPLES', 1000000))
+    UNCERTAINTY_MAX_AUDITS = int(os.getenv('UNCERTAINTY_MAX_AUDITS', 100))
+    UNCERTAINTY_CHUNK_SIZE = int(os.getenv('UNCERTAINTY_CHUNK_SIZE', 100000))
+    UNCERTAINTY_CHUNK_CELLS = int(os.getenv('UNCERTAINTY_CHUNK_CELLS', 1000000))  # audits x samples
+    UNCERTAINTY_WORKERS = int(os.getenv('UNCERTAINTY_WORKERS', os.cpu_count() or 1))
+    
+    # Reports
+    REPORT_CACHE_DIR = os.getenv(
+        'REPORT_CACHE_DIR',
+        os.path.join(tempfile.gettempdir(), 'sustainability-reports')
+    )
+    REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', 2))
+    REPORT_RENDER_TIMEOUT = int(os.getenv('REPORT_RENDER_TIMEOUT', 30))
+    # Artifacts of older versions are kept this long after last being served
+    REPORT_STALE_SECONDS = int(os.getenv('REPORT_STALE_SECONDS', 300))
+    
+    # Response compression
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+    
+    # Audit feed and dashboard
+    FEED_DEFAULT_LIMIT = int(os.getenv('FEED_DEFAULT_LIMIT', 20))
+    FEED_MAX_LIMIT = int(os.getenv('FEED_MAX_LIMIT', 100))
+    DASHBOARD_CACHE_SECONDS = int(os.getenv('DASHBOARD_CACHE_SECONDS', 30))
+    
+    # Tenancy
+    TENANT_CACHE_SECONDS = int(os.getenv('TENANT_CACHE_SECONDS', 60))
+    TENANT_BACKFILL_COMPLETE = os.getenv('TENANT_BACKFILL_COMPLETE', 'false').lower() == 'true'
+    
+    # Metrics (bearer token required from scrapers when set; outside development, required to serve them)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_REQUIRE_TOKEN = os.getenv('METRICS_REQUIRE_TOKEN', str(FLASK_ENV != 'development')).lower() == 'true'
+    # Shared directory aggregating metrics of several worker processes (empty it on restart)
+    METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR')
+    METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', 5))
+    
+    # Request profiling (off unless a token or a sample rate is set)
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 1))
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 100))
+    PROFILE_DIR = os.getenv(
+        'PROFILE_DIR',
+        os.path.join(tempfile.gettempdir(), 'sustainability-profiles')
+    )
+    
+    # Batched API calls
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+    
+    # Frontend assets (built by build_assets.py)
+    FRONTEND_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'frontend'))
+    ASSETS_SOURCE_DIR = os.getenv('ASSETS_SOURCE_DIR', os.path.join(FRONTEND_DIR, 'public'))
+    ASSETS_DIR = os.getenv('ASSETS_DIR', os.path.join(FRONTEND_DIR, 'dist'))
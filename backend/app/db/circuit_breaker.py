@@ -0,0 +1,236 @@
+"""Circuit breaker around MongoDB operations.
+
+After MONGO_BREAKER_FAILURE_THRESHOLD consecutive connection failures
+the breaker opens: database calls then fail at once with
+DatabaseUnavailable instead of each waiting out the server selection
+timeout, and requests that hit one are answered with 503 and
+Retry-After. While open, a background thread pings the server every
+MONGO_BREAKER_PROBE_SECONDS (half-open during the ping) and closes the
+breaker once one succeeds.
+
+The same proxies time every operation by collection and command; a
+find() is timed over the iteration of its cursor, where its round trips
+happen.
+"""
+
+import inspect
+import logging
+import math
+import threading
+import time
+from flask import g, has_app_context, jsonify
+from pymongo.errors import ConnectionFailure
+from app.utils.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+BREAKER_STATE = gauge('mongo_circuit_state', 'MongoDB circuit breaker state (0 closed, 1 open, 2 half-open)')
+BREAKER_TRANSITIONS = counter(
+    'mongo_circuit_transitions_total', 'MongoDB circuit breaker state transitions', ('from_state', 'to_state')
+)
+BREAKER_REJECTIONS = counter('mongo_circuit_rejections_total', 'MongoDB calls failed fast by the open breaker')
+OPERATION_LATENCY = histogram(
+    'mongo_operation_seconds', 'MongoDB operation latency by collection and command', ('collection', 'command')
+)
+
+
+class DatabaseUnavailable(ConnectionFailure):
+    """Raised instead of calling MongoDB while the breaker is open."""
+
+
+def _flag_request(retry_after):
+    """Mark the current request as failed by the database."""
+    if has_app_context():
+        g.database_retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a background recovery probe."""
+
+    def __init__(self, failure_threshold, probe_interval, probe):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            probe_interval: Seconds between recovery probes while open
+            probe: Callable raising on failure, e.g. a ping
+        """
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self.state = CLOSED
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        BREAKER_STATE.set(STATE_VALUES[CLOSED])
+
+    @property
+    def retry_after(self):
+        """Seconds a client should wait before retrying."""
+        return max(1, math.ceil(self.probe_interval))
+
+    def _transition(self, state):
+        """Move to `state`; call with the lock held."""
+        if state == self.state:
+            return
+        logger.warning("MongoDB circuit breaker %s -> %s", self.state, state)
+        BREAKER_TRANSITIONS.inc(from_state=self.state, to_state=state)
+        BREAKER_STATE.set(STATE_VALUES[state])
+        self.state = state
+
+    def check(self):
+        """Raise DatabaseUnavailable unless calls may go through."""
+        if self.state != CLOSED:
+            BREAKER_REJECTIONS.inc()
+            _flag_request(self.retry_after)
+            raise DatabaseUnavailable('Database temporarily unavailable')
+
+    def record_success(self):
+        """Reset the consecutive failure count."""
+        # Most calls find nothing to reset and skip the lock
+        if self.failures:
+            with self._lock:
+                self.failures = 0
+
+    def record_failure(self):
+        """Count a connection failure, opening the breaker at the threshold."""
+        _flag_request(self.retry_after)
+        with self._lock:
+            self.failures += 1
+            if self.state != CLOSED or self.failures < self.failure_threshold:
+                return
+            self._transition(OPEN)
+        threading.Thread(target=self._probe_until_closed, name='mongo-breaker-probe', daemon=True).start()
+
+    def _probe_until_closed(self):
+        """Ping every probe_interval until the database answers."""
+        while not self._stopped.wait(self.probe_interval):
+            with self._lock:
+                self._transition(HALF_OPEN)
+            try:
+                self.probe()
+            except Exception as e:
+                logger.warning("MongoDB recovery probe failed: %s", e)
+                with self._lock:
+                    self._transition(OPEN)
+                continue
+            with self._lock:
+                self.failures = 0
+                self._transition(CLOSED)
+            return
+
+    def stop(self):
+        """Stop the recovery probe (on shutdown)."""
+        self._stopped.set()
+
+
+class GuardedCursor:
+    """Cursor whose iteration is accounted by the breaker and timed."""
+
+    def __init__(self, cursor, breaker, labels):
+        self._cursor = cursor
+        self._breaker = breaker
+        self._labels = labels
+        self._elapsed = 0.0
+        self._timed = False
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if not inspect.ismethod(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # sort(), limit() etc. return the cursor itself
+            return self if result is self._cursor else result
+        return chained
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            document = next(self._cursor)
+        except StopIteration:
+            self._elapsed += time.perf_counter() - started
+            self._observe()
+            self._breaker.record_success()
+            raise
+        except ConnectionFailure:
+            self._breaker.record_failure()
+            raise
+        self._elapsed += time.perf_counter() - started
+        return document
+
+    def _observe(self):
+        """Record the time spent fetching, once per cursor."""
+        if not self._timed:
+            self._timed = True
+            OPERATION_LATENCY.observe(self._elapsed, **self._labels)
+
+    def close(self):
+        self._observe()
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GuardedCollection:
+    """Collection whose operations are checked and accounted by the breaker."""
+
+    # Methods returning a cursor that only reaches the server when iterated
+    LAZY_METHODS = ('find', 'find_raw_batches')
+
+    def __init__(self, collection, breaker):
+        self._collection = collection
+        self._breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not inspect.ismethod(attr):
+            return attr
+        breaker = self._breaker
+        labels = {'collection': self._collection.name, 'command': name}
+
+        def guarded(*args, **kwargs):
+            breaker.check()
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except ConnectionFailure:
+                breaker.record_failure()
+                raise
+            if name in self.LAZY_METHODS:
+                return GuardedCursor(result, breaker, labels)
+            OPERATION_LATENCY.observe(time.perf_counter() - started, **labels)
+            breaker.record_success()
+            return result
+        return guarded
+
+    def __getitem__(self, name):
+        return GuardedCollection(self._collection[name], self._breaker)
+
+
+def database_unavailable_response(response):
+    """Turn a failed response into 503 + Retry-After when the database was down.
+
+    Registered as an after_request hook, so routes keep their own error
+    handling and need no knowledge of the breaker.
+    """
+    retry_after = g.pop('database_retry_after', None)
+    if retry_after is None or response.status_code < 500:
+        return response
+    unavailable = jsonify({'success': False, 'message': 'Database temporarily unavailable'})
+    unavailable.status_code = 503
+    unavailable.headers['Retry-After'] = str(retry_after)
+    return unavailable
@@ -0,0 +1,44 @@
+"""Index creation and reconciliation for every collection."""
+
+from app.models.user import User
+from app.models.otp import OTP
+from app.models.email_verification import EmailVerification
+from app.models.two_factor_auth import TwoFactorAuth
+from app.models.organization import Organization
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.igbc_green_building_audit import IGBCGreenBuildingAudit
+from app.models.esg_audit import ESGAudit
+
+INDEXED_MODELS = (
+    User,
+    OTP,
+    EmailVerification,
+    TwoFactorAuth,
+    Organization,
+    CarbonEmissionAudit,
+    IGBCGreenBuildingAudit,
+    ESGAudit
+)
+
+
+def create_all_indexes():
+    """Create (or confirm) the indexes of every model."""
+    for model in INDEXED_MODELS:
+        model.create_indexes()
+
+
+def index_keys(db):
+    """Key patterns of the indexes of every collection in `db`."""
+    return {
+        name: {tuple(info['key']) for info in db[name].index_information().values()}
+        for name in db.list_collection_names()
+    }
+
+
+def missing_indexes(expected, current):
+    """(collection, key pattern) of expected indexes not in `current`."""
+    return [
+        (name, keys)
+        for name, patterns in expected.items()
+        for keys in patterns - current.get(name, set())
+    ]
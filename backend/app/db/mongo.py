@@ -1,12 +1,54 @@
-"""MongoDB connection and management."""
+"""MongoDB connection and management.
 
+Reads go to the primary unless the model method declares
+SECONDARY_PREFERRED, as lists, exports and aggregates do; a route can
+override that for every query its view makes with @read_preference.
+Writes always go to the primary. A secondary may lag by up to the
+declared max staleness, so a reader that declares a `writer` key (e.g.
+its tenant) reads from the primary for MONGODB_READ_YOUR_WRITES_SECONDS
+after note_write() with that key in this process.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import threading
+import time
 from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError
+from pymongo.read_preferences import SecondaryPreferred
 from flask import current_app
+from app.db.circuit_breaker import CircuitBreaker, GuardedCollection
 import logging
 
 logger = logging.getLogger(__name__)
 
+PRIMARY = 'primary'
+SECONDARY_PREFERRED = 'secondaryPreferred'
+
+# (read, max_staleness) declared by the route being served, if any
+_read_override = ContextVar('mongo_read_override', default=None)
+
+
+def read_preference(read, max_staleness=None):
+    """Route decorator: serve every read of the view with this preference.
+
+    Args:
+        read: PRIMARY or SECONDARY_PREFERRED
+        max_staleness: Seconds of replication lag tolerated (at least 90),
+            MONGODB_MAX_STALENESS_SECONDS by default
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            token = _read_override.set((read, max_staleness))
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _read_override.reset(token)
+        return wrapper
+    return decorator
+
 
 class MongoDB:
     """MongoDB connection manager."""
@@ -14,39 +56,125 @@ class MongoDB:
     _instance = None
     _client = None
     _db = None
+    _breaker = None
+    
+    # writer key -> monotonic time until which its reads use the primary
+    _recent_writes = {}
+    _writes_lock = threading.Lock()
     
     def __init__(self):
         """Initialize MongoDB connection."""
         if MongoDB._client is None:
+            MongoDB._client = MongoClient(
+                current_app.config['MONGODB_URI'],
+                serverSelectionTimeoutMS=current_app.config['MONGODB_SERVER_SELECTION_TIMEOUT_MS']
+            )
+            # The client reconnects by itself, so keep it even if the ping fails
+            MongoDB._db = MongoDB._client[current_app.config['MONGODB_DB_NAME']]
             try:
-                MongoDB._client = MongoClient(
-                    current_app.config['MONGODB_URI'],
-                    serverSelectionTimeoutMS=5000
-                )
                 # Test connection
                 MongoDB._client.admin.command('ping')
-                MongoDB._db = MongoDB._client[current_app.config['MONGODB_DB_NAME']]
                 logger.info("Connected to MongoDB")
             except ServerSelectionTimeoutError:
                 logger.error("Failed to connect to MongoDB")
+                MongoDB.breaker().record_failure()
                 raise
     
+    @classmethod
+    def breaker(cls):
+        """Circuit breaker guarding database operations."""
+        if cls._breaker is None:
+            cls._breaker = CircuitBreaker(
+                current_app.config['MONGO_BREAKER_FAILURE_THRESHOLD'],
+                current_app.config['MONGO_BREAKER_PROBE_SECONDS'],
+                lambda: cls._client.admin.command('ping')
+            )
+        return cls._breaker
+    
     @classmethod
     def get_db(cls):
-        """Get database instance."""
+        """Get database instance, failing fast while the breaker is open."""
+        cls.breaker().check()
         if cls._db is None:
             cls()
         return cls._db
     
     @classmethod
-    def get_collection(cls, collection_name):
-        """Get specific collection."""
+    def get_collection(cls, collection_name, read=PRIMARY, max_staleness=None, writer=None):
+        """Get specific collection.
+        
+        Args:
+            read: PRIMARY, or SECONDARY_PREFERRED for reads that tolerate
+                replication lag; a route's @read_preference takes precedence
+            max_staleness: Seconds of lag tolerated on a secondary (at
+                least 90), MONGODB_MAX_STALENESS_SECONDS by default
+            writer: Key whose recent writes the reads must see
+        
+        Returns:
+            The collection, its operations guarded by the circuit breaker
+        """
         db = cls.get_db()
-        return db[collection_name]
+        override = _read_override.get()
+        if override is not None:
+            read, max_staleness = override
+        if read == PRIMARY or (writer is not None and cls.wrote_recently(writer)):
+            return GuardedCollection(db[collection_name], cls.breaker())
+        
+        max_staleness = max_staleness or current_app.config['MONGODB_MAX_STALENESS_SECONDS']
+        collection = db.get_collection(
+            collection_name,
+            read_preference=SecondaryPreferred(max_staleness=max_staleness)
+        )
+        return GuardedCollection(collection, cls.breaker())
+    
+    @classmethod
+    def note_write(cls, writer):
+        """Send reads declaring `writer` to the primary for a while."""
+        now = time.monotonic()
+        window = current_app.config['MONGODB_READ_YOUR_WRITES_SECONDS']
+        with cls._writes_lock:
+            if len(cls._recent_writes) > 10000:
+                cls._recent_writes = {
+                    key: until for key, until in cls._recent_writes.items() if until > now
+                }
+            cls._recent_writes[str(writer)] = now + window
+    
+    @classmethod
+    def wrote_recently(cls, writer):
+        """Whether `writer` wrote within MONGODB_READ_YOUR_WRITES_SECONDS."""
+        until = cls._recent_writes.get(str(writer))
+        return until is not None and until > time.monotonic()
+    
+    @classmethod
+    def supports_transactions(cls):
+        """Whether the deployment is a replica set or sharded cluster."""
+        cls.get_db()
+        topology = getattr(cls._client, 'topology_description', None)
+        return topology is not None and topology.topology_type_name in (
+            'ReplicaSetWithPrimary', 'Sharded'
+        )
+    
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        """Run a block in a transaction when the deployment supports one.
+        
+        Yields a session to pass to each operation, or None on a standalone
+        server, where the operations run without a transaction.
+        """
+        if not cls.supports_transactions():
+            yield None
+            return
+        with cls._client.start_session() as session:
+            with session.start_transaction():
+                yield session
     
     @classmethod
     def close(cls):
         """Close database connection."""
+        if cls._breaker:
+            cls._breaker.stop()
+            cls._breaker = None
         if cls._client:
             cls._client.close()
             cls._client = None
@@ -1,6 +1,9 @@
 from datetime import datetime
 from bson import ObjectId
-from app.db.mongo import MongoDB
+from app.db.mongo import MongoDB, PRIMARY, SECONDARY_PREFERRED
+from app.utils.etags import VERSION_PROJECTION
+from app.utils.tenancy import SHARD_KEY, tenant_filter, tenant_scoped
+from app.scoring.compiler import SCORING_SECONDS
 
 
 class CarbonEmissionAudit:
@@ -8,10 +11,48 @@ class CarbonEmissionAudit:
     
     COLLECTION_NAME = 'carbon_emission_audits'
     
+    # Fields returned in feeds and other audit summaries
+    SUMMARY_PROJECTION = {
+        field: 1 for field in (
+            'facility_name', 'total_carbon_footprint', 'audit_period', 'status', 'created_at', 'updated_at'
+        )
+    }
+    
+    # Inputs of the emissions model
+    INPUT_FIELDS = (
+        'electricity_consumption',
+        'natural_gas_consumption',
+        'water_consumption',
+        'waste_generated',
+        'renewable_energy_percentage'
+    )
+    
+    # Emission factors (kg CO2 per unit)
+    EMISSION_FACTORS = {
+        'electricity': 0.82,  # kg CO2/kWh
+        'natural_gas': 2.04,  # kg CO2/m3
+        'water': 0.34,  # kg CO2/m3
+        'waste': 0.5  # kg CO2/kg
+    }
+    
+    # Metrics compared period over period by facility_trends
+    TREND_METRICS = (
+        'total_carbon_footprint',
+        'emissions.electricity_emissions',
+        'emissions.natural_gas_emissions',
+        'emissions.water_emissions',
+        'emissions.waste_emissions'
+    )
+    
     @staticmethod
-    def _get_collection():
-        """Get MongoDB collection"""
-        return MongoDB.get_collection(CarbonEmissionAudit.COLLECTION_NAME)
+    def _get_collection(read=PRIMARY, writer=None):
+        """Get MongoDB collection
+        
+        Args:
+            read: Read preference (see app.db.mongo)
+            writer: Tenant whose own recent writes the reads must see
+        """
+        return MongoDB.get_collection(CarbonEmissionAudit.COLLECTION_NAME, read, writer=writer)
     
     @staticmethod
     def create_indexes():
@@ -19,10 +60,15 @@ class CarbonEmissionAudit:
         collection = CarbonEmissionAudit._get_collection()
         collection.create_index("user_id")
         collection.create_index("created_at")
+        collection.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+        collection.create_index([("tenant_id", 1), ("created_at", -1), ("_id", -1)])
+        collection.create_index(list(SHARD_KEY.items()))
         collection.create_index("facility_name")
+        collection.create_index([("user_id", 1), ("facility_name", 1), ("created_at", 1)])
+        collection.create_index([("tenant_id", 1), ("facility_name", 1), ("created_at", 1)])
     
     @staticmethod
-    def create_audit(user_id, facility_name, audit_period, data):
+    def create_audit(user_id, facility_name, audit_period, data, tenant_id=None):
         """Create a new carbon emission audit
         
         Args:
@@ -35,6 +81,7 @@ class CarbonEmissionAudit:
                 - water_consumption (m3)
                 - waste_generated (kg)
                 - renewable_energy_percentage (%)
+            tenant_id: Owning tenant, the user's personal tenant by default
         
         Returns:
             Inserted audit ID
@@ -44,6 +91,7 @@ class CarbonEmissionAudit:
         
         audit_doc = {
             'user_id': ObjectId(user_id),
+            'tenant_id': ObjectId(tenant_id or user_id),
             'facility_name': facility_name,
             'audit_period': audit_period,
             'input_data': data,
@@ -51,14 +99,17 @@ class CarbonEmissionAudit:
             'total_carbon_footprint': emissions['total_carbon_footprint'],
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow(),
+            'revision': 1,
             'status': 'completed'
         }
         
         collection = CarbonEmissionAudit._get_collection()
         result = collection.insert_one(audit_doc)
+        MongoDB.note_write(audit_doc['tenant_id'])
         return str(result.inserted_id)
     
     @staticmethod
+    @SCORING_SECONDS.time(kind='carbon')
     def calculate_emissions(data):
         """Calculate carbon emissions based on input data
         
@@ -68,29 +119,37 @@ class CarbonEmissionAudit:
         - Water: 0.34 kg CO2/m3
         - Waste: 0.5 kg CO2/kg (average)
         """
+        inputs = {field: float(data.get(field, 0)) for field in CarbonEmissionAudit.INPUT_FIELDS}
+        emissions = CarbonEmissionAudit.emissions_model(**inputs)
         
-        electricity_consumption = float(data.get('electricity_consumption', 0))
-        natural_gas_consumption = float(data.get('natural_gas_consumption', 0))
-        water_consumption = float(data.get('water_consumption', 0))
-        waste_generated = float(data.get('waste_generated', 0))
-        renewable_energy_percentage = float(data.get('renewable_energy_percentage', 0))
+        return {key: round(value, 2) for key, value in emissions.items()}
+    
+    @staticmethod
+    def emissions_model(electricity_consumption, natural_gas_consumption, water_consumption,
+                        waste_generated, renewable_energy_percentage, factors=None):
+        """Emissions model shared by single audits, scenarios and simulations
         
-        # Emission factors
-        ELECTRICITY_FACTOR = 0.82  # kg CO2/kWh
-        NATURAL_GAS_FACTOR = 2.04  # kg CO2/m3
-        WATER_FACTOR = 0.34  # kg CO2/m3
-        WASTE_FACTOR = 0.5  # kg CO2/kg
+        Arguments may be floats or broadcastable NumPy arrays, so a whole
+        grid or sample set is evaluated in one pass.
+        
+        Args:
+            factors: Optional overrides of EMISSION_FACTORS (floats or arrays)
+        
+        Returns:
+            Dictionary of unrounded emissions per source and in total
+        """
+        factors = {**CarbonEmissionAudit.EMISSION_FACTORS, **(factors or {})}
         
         # Calculate emissions from each source
-        electricity_emissions = electricity_consumption * ELECTRICITY_FACTOR
+        electricity_emissions = electricity_consumption * factors['electricity']
         
         # Adjust for renewable energy
         renewable_reduction = (electricity_emissions * renewable_energy_percentage) / 100
-        electricity_emissions -= renewable_reduction
+        electricity_emissions = electricity_emissions - renewable_reduction
         
-        natural_gas_emissions = natural_gas_consumption * NATURAL_GAS_FACTOR
-        water_emissions = water_consumption * WATER_FACTOR
-        waste_emissions = waste_generated * WASTE_FACTOR
+        natural_gas_emissions = natural_gas_consumption * factors['natural_gas']
+        water_emissions = water_consumption * factors['water']
+        waste_emissions = waste_generated * factors['waste']
         
         # Total carbon footprint
         total_carbon_footprint = (
@@ -101,41 +160,186 @@ class CarbonEmissionAudit:
         )
         
         return {
-            'electricity_emissions': round(electricity_emissions, 2),
-            'natural_gas_emissions': round(natural_gas_emissions, 2),
-            'water_emissions': round(water_emissions, 2),
-            'waste_emissions': round(waste_emissions, 2),
-            'renewable_energy_offset': round(renewable_reduction, 2),
-            'total_carbon_footprint': round(total_carbon_footprint, 2)
+            'electricity_emissions': electricity_emissions,
+            'natural_gas_emissions': natural_gas_emissions,
+            'water_emissions': water_emissions,
+            'waste_emissions': waste_emissions,
+            'renewable_energy_offset': renewable_reduction,
+            'total_carbon_footprint': total_carbon_footprint
         }
     
     @staticmethod
-    def find_by_id(audit_id):
-        """Find audit by ID"""
-        collection = CarbonEmissionAudit._get_collection()
-        audit = collection.find_one({'_id': ObjectId(audit_id)})
-        if audit:
-            audit['_id'] = str(audit['_id'])
-            audit['user_id'] = str(audit['user_id'])
-        return audit
+    def find_by_id(audit_id, tenant_id=None):
+        """Find audit by ID, within a tenant when given"""
+        collection = CarbonEmissionAudit._get_collection(writer=tenant_id)
+        query = {'_id': ObjectId(audit_id)}
+        return collection.find_one(tenant_scoped(tenant_id, query) if tenant_id else query)
     
     @staticmethod
-    def find_by_user(user_id, limit=50):
-        """Find all audits for a user"""
-        collection = CarbonEmissionAudit._get_collection()
-        audits = list(collection.find(
-            {'user_id': ObjectId(user_id)}
-        ).sort('created_at', -1).limit(limit))
+    def find_by_ids(audit_ids, tenant_id):
+        """Find a tenant's audits by ID in one query"""
+        collection = CarbonEmissionAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return list(collection.find(tenant_scoped(
+            tenant_id,
+            {'_id': {'$in': [ObjectId(audit_id) for audit_id in audit_ids]}}
+        )))
+    
+    @staticmethod
+    def find_by_tenant(tenant_id, limit=50):
+        """Find a tenant's audits, newest first"""
+        collection = CarbonEmissionAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return list(collection.find(
+            tenant_filter(tenant_id)
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    
+    @staticmethod
+    def has_facility(tenant_id, facility_name):
+        """Whether a tenant has audits of a facility"""
+        collection = CarbonEmissionAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return collection.find_one(
+            tenant_scoped(tenant_id, {'facility_name': facility_name}), {'_id': 1}
+        ) is not None
+    
+    @staticmethod
+    def facility_trends(tenant_id, facility_name=None):
+        """Per-facility time series with period-over-period deltas
+        
+        Uses $setWindowFields partitioned by facility_name and sorted by
+        created_at, so the (tenant_id, facility_name, created_at) index
+        serves the scan and deltas are computed in the database.
+        
+        Returns:
+            List of {'facility_name', 'periods'} ordered by facility name,
+            periods oldest first
+        """
+        collection = CarbonEmissionAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
         
-        for audit in audits:
-            audit['_id'] = str(audit['_id'])
-            audit['user_id'] = str(audit['user_id'])
+        match = tenant_filter(tenant_id)
+        if facility_name:
+            match['facility_name'] = facility_name
         
-        return audits
+        # Metric path -> output key, e.g. 'emissions.water_emissions' -> 'water_emissions'
+        keys = {path: path.split('.')[-1] for path in CarbonEmissionAudit.TREND_METRICS}
+        
+        previous = {
+            f'previous_{key}': {'$shift': {'output': f'${path}', 'by': -1}}
+            for path, key in keys.items()
+        }
+        deltas = {
+            key: {
+                'change': {'$round': [{'$subtract': [f'${path}', f'$previous_{key}']}, 2]},
+                'percent_change': {
+                    '$cond': [
+                        {'$in': [f'$previous_{key}', [None, 0]]},
+                        None,
+                        {'$round': [{'$multiply': [
+                            {'$divide': [
+                                {'$subtract': [f'${path}', f'$previous_{key}']},
+                                f'$previous_{key}'
+                            ]},
+                            100
+                        ]}, 2]}
+                    ]
+                }
+            }
+            for path, key in keys.items()
+        }
+        
+        pipeline = [
+            {'$match': match},
+            {'$sort': {'facility_name': 1, 'created_at': 1}},
+            {'$setWindowFields': {
+                'partitionBy': '$facility_name',
+                'sortBy': {'created_at': 1},
+                'output': previous
+            }},
+            {'$group': {
+                '_id': '$facility_name',
+                'periods': {'$push': {
+                    'audit_id': {'$toString': '$_id'},
+                    'audit_period': '$audit_period',
+                    'created_at': '$created_at',
+                    'values': {key: f'${path}' for path, key in keys.items()},
+                    'deltas': deltas
+                }}
+            }},
+            {'$sort': {'_id': 1}},
+            {'$project': {'_id': 0, 'facility_name': '$_id', 'periods': 1}}
+        ]
+        
+        return list(collection.aggregate(pipeline))
+    
+    @staticmethod
+    def find_page_by_tenant(tenant_id, limit, before=None):
+        """Find a page of a tenant's audit summaries, newest first
+        
+        Args:
+            before: Optional (created_at, _id) keyset cursor; only audits
+                strictly older than it are returned
+        """
+        collection = CarbonEmissionAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        keyset = None
+        if before:
+            created_at, audit_id = before
+            keyset = {'$or': [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': audit_id}}
+            ]}
+        
+        return list(collection.find(
+            tenant_scoped(tenant_id, keyset),
+            CarbonEmissionAudit.SUMMARY_PROJECTION
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
     
     @staticmethod
-    def update_audit(audit_id, user_id, data):
-        """Update existing audit"""
+    def summarize_by_tenant(tenant_id):
+        """Summarize a tenant's audits in one aggregation
+        
+        Returns:
+            Facet document with 'totals' (count, total and average
+            footprint) and 'latest' (newest audit summary)
+        """
+        collection = CarbonEmissionAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        pipeline = [
+            {'$match': tenant_filter(tenant_id)},
+            {'$sort': {'created_at': -1, '_id': -1}},
+            {'$project': CarbonEmissionAudit.SUMMARY_PROJECTION},
+            {'$facet': {
+                'totals': [{'$group': {
+                    '_id': None,
+                    'count': {'$sum': 1},
+                    'total_carbon_footprint': {'$sum': '$total_carbon_footprint'},
+                    'average_carbon_footprint': {'$avg': '$total_carbon_footprint'}
+                }}],
+                'latest': [{'$limit': 1}]
+            }}
+        ]
+        return next(collection.aggregate(pipeline))
+    
+    @staticmethod
+    def find_version(audit_id, tenant_id=None):
+        """Find only the owner and version fields of an audit, within a tenant when given"""
+        collection = CarbonEmissionAudit._get_collection(writer=tenant_id)
+        query = {'_id': ObjectId(audit_id)}
+        return collection.find_one(tenant_scoped(tenant_id, query) if tenant_id else query, VERSION_PROJECTION)
+    
+    @staticmethod
+    def find_versions_by_tenant(tenant_id, limit=50):
+        """Find owner and version fields of a tenant's audits, ordered like find_by_tenant"""
+        collection = CarbonEmissionAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return list(collection.find(
+            tenant_filter(tenant_id),
+            VERSION_PROJECTION
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    
+    @staticmethod
+    def update_audit(audit_id, tenant_id, data, version_filter=None):
+        """Update existing audit
+        
+        Args:
+            version_filter: Optional extra filter the audit must match, so
+                an If-Match update only applies to the expected revision
+        """
         collection = CarbonEmissionAudit._get_collection()
         
         # Recalculate emissions
@@ -147,41 +351,46 @@ class CarbonEmissionAudit:
                 'emissions': emissions,
                 'total_carbon_footprint': emissions['total_carbon_footprint'],
                 'updated_at': datetime.utcnow()
-            }
+            },
+            '$inc': {'revision': 1}
         }
         
         result = collection.update_one(
-            {'_id': ObjectId(audit_id), 'user_id': ObjectId(user_id)},
+            tenant_scoped(tenant_id, {'_id': ObjectId(audit_id)}, version_filter),
             update_doc
         )
+        MongoDB.note_write(tenant_id)
         
         return result.modified_count > 0
     
     @staticmethod
-    def delete_audit(audit_id, user_id):
-        """Delete audit"""
+    def delete_audit(audit_id, tenant_id):
+        """Delete a tenant's audit"""
         collection = CarbonEmissionAudit._get_collection()
-        result = collection.delete_one({
-            '_id': ObjectId(audit_id),
-            'user_id': ObjectId(user_id)
-        })
+        result = collection.delete_one(tenant_scoped(tenant_id, {'_id': ObjectId(audit_id)}))
+        MongoDB.note_write(tenant_id)
         return result.deleted_count > 0
     
     @staticmethod
     def to_dict(audit):
-        """Convert audit document to dictionary"""
+        """Convert audit document to dictionary
+        
+        ObjectId and datetime values are left for the app's JSON provider.
+        """
         if not audit:
             return None
         
         return {
-            'id': str(audit['_id']),
-            'user_id': str(audit['user_id']),
+            'id': audit['_id'],
+            'user_id': audit['user_id'],
+            'tenant_id': audit.get('tenant_id', audit['user_id']),
             'facility_name': audit['facility_name'],
             'audit_period': audit['audit_period'],
             'input_data': audit['input_data'],
             'emissions': audit['emissions'],
             'total_carbon_footprint': audit['total_carbon_footprint'],
-            'created_at': audit['created_at'].isoformat(),
-            'updated_at': audit['updated_at'].isoformat(),
+            'created_at': audit['created_at'],
+            'updated_at': audit['updated_at'],
+            'revision': audit.get('revision'),
             'status': audit['status']
         }
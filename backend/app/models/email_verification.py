@@ -3,11 +3,16 @@
 from datetime import datetime, timedelta
 from flask import current_app
 from app.db.mongo import MongoDB
+import hashlib
 import secrets
 
 
 class EmailVerification:
-    """Email verification tokens for new registrations."""
+    """Email verification tokens for new registrations.
+    
+    Only a SHA-256 hash of each token is stored; tokens are random and
+    long enough that an unkeyed hash cannot be reversed.
+    """
     
     COLLECTION_NAME = "email_verifications"
     TOKEN_LENGTH = 32
@@ -21,9 +26,17 @@ class EmailVerification:
     def create_indexes(cls):
         """Create indexes for email verification collection."""
         collection = cls.get_collection()
+        # Sparse: records stored before hashing have no token_hash until
+        # migrate_legacy_secrets.py has run
+        collection.create_index("token_hash", unique=True, sparse=True)
         collection.create_index("email", unique=False)
         collection.create_index("expires_at", expireAfterSeconds=0)
     
+    @staticmethod
+    def hash_token(token):
+        """Hash of a verification token as stored in the database."""
+        return hashlib.sha256(token.encode()).hexdigest()
+    
     @classmethod
     def create_verification(cls, email):
         """Create email verification token.
@@ -41,7 +54,7 @@ class EmailVerification:
         
         verification_data = {
             "email": email,
-            "token": token,
+            "token_hash": cls.hash_token(token),
             "is_verified": False,
             "created_at": datetime.utcnow(),
             "expires_at": datetime.utcnow() + timedelta(hours=24)
@@ -51,29 +64,24 @@ class EmailVerification:
         return token
     
     @classmethod
-    def find_by_token(cls, token):
-        """Find verification record by token."""
-        collection = cls.get_collection()
-        return collection.find_one({
-            "token": token,
-            "is_verified": False,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
-    
-    @classmethod
-    def mark_verified(cls, token):
-        """Mark email as verified."""
+    def consume_token(cls, token, session=None):
+        """Verify and use up a token in one atomic operation.
+        
+        Args:
+            token: Verification token from the email link
+            session: Optional session of a surrounding transaction
+            
+        Returns:
+            The consumed verification record, or None if invalid
+        """
         collection = cls.get_collection()
-        result = collection.update_one(
-            {"token": token},
-            {"$set": {"is_verified": True}}
+        now = datetime.utcnow()
+        return collection.find_one_and_update(
+            {
+                "token_hash": cls.hash_token(token),
+                "is_verified": False,
+                "expires_at": {"$gt": now}
+            },
+            {"$set": {"is_verified": True, "verified_at": now}},
+            session=session
         )
-        return result.modified_count > 0
-    
-    @classmethod
-    def get_email_by_token(cls, token):
-        """Get email from verification token."""
-        record = cls.find_by_token(token)
-        if record:
-            return record.get("email")
-        return None
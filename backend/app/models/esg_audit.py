@@ -1,6 +1,9 @@
 from datetime import datetime
 from bson import ObjectId
-from app.db.mongo import MongoDB
+from app.db.mongo import MongoDB, PRIMARY, SECONDARY_PREFERRED
+from app.utils.etags import VERSION_PROJECTION
+from app.utils.tenancy import SHARD_KEY, tenant_filter, tenant_scoped
+from app.scoring.compiler import SCORING_SECONDS, get_spec
 
 
 class ESGAudit:
@@ -8,10 +11,26 @@ class ESGAudit:
     
     COLLECTION_NAME = 'esg_audits'
     
+    # Fields returned in feeds and other audit summaries
+    SUMMARY_PROJECTION = {
+        field: 1 for field in (
+            'organization_name', 'esg_score', 'esg_rating', 'audit_period', 'status', 'created_at', 'updated_at'
+        )
+    }
+    
+    ENVIRONMENTAL_FIELDS = ('carbon_management', 'water_management', 'waste_management', 'renewable_energy')
+    SOCIAL_FIELDS = ('employee_satisfaction', 'community_impact', 'health_safety', 'diversity_inclusion')
+    GOVERNANCE_FIELDS = ('ethics_compliance', 'audit_controls', 'board_diversity', 'transparency')
+    
     @staticmethod
-    def _get_collection():
-        """Get MongoDB collection"""
-        return MongoDB.get_collection(ESGAudit.COLLECTION_NAME)
+    def _get_collection(read=PRIMARY, writer=None):
+        """Get MongoDB collection
+        
+        Args:
+            read: Read preference (see app.db.mongo)
+            writer: Tenant whose own recent writes the reads must see
+        """
+        return MongoDB.get_collection(ESGAudit.COLLECTION_NAME, read, writer=writer)
     
     @staticmethod
     def create_indexes():
@@ -19,10 +38,13 @@ class ESGAudit:
         collection = ESGAudit._get_collection()
         collection.create_index("user_id")
         collection.create_index("created_at")
+        collection.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+        collection.create_index([("tenant_id", 1), ("created_at", -1), ("_id", -1)])
+        collection.create_index(list(SHARD_KEY.items()))
         collection.create_index("organization_name")
     
     @staticmethod
-    def create_audit(user_id, organization_name, audit_period, data):
+    def create_audit(user_id, organization_name, audit_period, data, tenant_id=None):
         """Create a new ESG audit
         
         Args:
@@ -30,6 +52,7 @@ class ESGAudit:
             organization_name: Name of organization being audited
             audit_period: Period of audit
             data: Dictionary containing ESG parameters
+            tenant_id: Owning tenant, the user's personal tenant by default
         
         Returns:
             Inserted audit ID
@@ -39,6 +62,7 @@ class ESGAudit:
         
         audit_doc = {
             'user_id': ObjectId(user_id),
+            'tenant_id': ObjectId(tenant_id or user_id),
             'organization_name': organization_name,
             'audit_period': audit_period,
             'input_data': data,
@@ -48,132 +72,156 @@ class ESGAudit:
             'governance_score': scores['governance_score'],
             'esg_score': scores['esg_score'],
             'esg_rating': scores['esg_rating'],
+            'scoring_version': scores['scoring_version'],
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow(),
+            'revision': 1,
             'status': 'completed'
         }
         
         collection = ESGAudit._get_collection()
         result = collection.insert_one(audit_doc)
+        MongoDB.note_write(audit_doc['tenant_id'])
         return str(result.inserted_id)
     
     @staticmethod
-    def calculate_scores(data):
+    def calculate_scores(data, version=None):
         """Calculate ESG scores based on input data
         
         ESG Categories (each out of 100):
         - Environmental: Carbon, Water, Waste Management, Renewable Energy
         - Social: Employee Satisfaction, Community Impact, Health & Safety, Diversity
         - Governance: Ethics, Compliance, Board Diversity, Transparency
-        """
         
-        # Environmental Score
-        carbon_management = float(data.get('carbon_management', 0))
-        water_management = float(data.get('water_management', 0))
-        waste_management = float(data.get('waste_management', 0))
-        renewable_energy = float(data.get('renewable_energy', 0))
-        
-        environmental_score = (
-            (carbon_management * 0.3) +
-            (water_management * 0.3) +
-            (waste_management * 0.2) +
-            (renewable_energy * 0.2)
-        )
-        
-        # Social Score
-        employee_satisfaction = float(data.get('employee_satisfaction', 0))
-        community_impact = float(data.get('community_impact', 0))
-        health_safety = float(data.get('health_safety', 0))
-        diversity_inclusion = float(data.get('diversity_inclusion', 0))
-        
-        social_score = (
-            (employee_satisfaction * 0.3) +
-            (community_impact * 0.3) +
-            (health_safety * 0.2) +
-            (diversity_inclusion * 0.2)
-        )
+        Weights and rating thresholds come from the scoring spec for
+        `version` (current by default) and the optional `industry` input.
+        """
+        return ESGAudit.calculate_scores_batch([data], version)[0]
+    
+    @staticmethod
+    @SCORING_SECONDS.time(kind='esg')
+    def calculate_scores_batch(rows, version=None):
+        """Calculate ESG scores for many input dicts at once
         
-        # Governance Score
-        ethics_compliance = float(data.get('ethics_compliance', 0))
-        audit_controls = float(data.get('audit_controls', 0))
-        board_diversity = float(data.get('board_diversity', 0))
-        transparency = float(data.get('transparency', 0))
-        
-        governance_score = (
-            (ethics_compliance * 0.35) +
-            (audit_controls * 0.35) +
-            (board_diversity * 0.15) +
-            (transparency * 0.15)
-        )
+        Rows are grouped by industry so each group is scored with a
+        single matrix multiply against its compiled spec.
+        """
+        results = [None] * len(rows)
+        by_industry = {}
+        for i, row in enumerate(rows):
+            spec = get_spec('esg', version, row.get('industry'))
+            by_industry.setdefault(spec.industry, (spec, []))[1].append(i)
         
-        # Overall ESG Score (average of E, S, G)
-        esg_score = (environmental_score + social_score + governance_score) / 3
-        
-        # Determine ESG Rating
-        if esg_score >= 80:
-            esg_rating = 'EXCELLENT'
-        elif esg_score >= 70:
-            esg_rating = 'VERY GOOD'
-        elif esg_score >= 60:
-            esg_rating = 'GOOD'
-        elif esg_score >= 50:
-            esg_rating = 'ADEQUATE'
-        else:
-            esg_rating = 'NEEDS IMPROVEMENT'
+        for spec, indexes in by_industry.values():
+            inputs = spec.vectorize([rows[i] for i in indexes])
+            _, scores, ratings = spec.score_batch(inputs)
+            for row_num, i in enumerate(indexes):
+                details = dict(zip(spec.fields, inputs[row_num].round(2).tolist()))
+                result = dict(zip(spec.outputs, scores[row_num].round(2).tolist()))
+                result.update({
+                    'esg_rating': ratings[row_num],
+                    'environmental_details': {
+                        field: details[field] for field in ESGAudit.ENVIRONMENTAL_FIELDS
+                    },
+                    'social_details': {
+                        field: details[field] for field in ESGAudit.SOCIAL_FIELDS
+                    },
+                    'governance_details': {
+                        field: details[field] for field in ESGAudit.GOVERNANCE_FIELDS
+                    },
+                    'scoring_version': spec.version,
+                    'industry': spec.industry
+                })
+                results[i] = result
         
-        return {
-            'environmental_score': round(environmental_score, 2),
-            'social_score': round(social_score, 2),
-            'governance_score': round(governance_score, 2),
-            'esg_score': round(esg_score, 2),
-            'esg_rating': esg_rating,
-            'environmental_details': {
-                'carbon_management': round(carbon_management, 2),
-                'water_management': round(water_management, 2),
-                'waste_management': round(waste_management, 2),
-                'renewable_energy': round(renewable_energy, 2)
-            },
-            'social_details': {
-                'employee_satisfaction': round(employee_satisfaction, 2),
-                'community_impact': round(community_impact, 2),
-                'health_safety': round(health_safety, 2),
-                'diversity_inclusion': round(diversity_inclusion, 2)
-            },
-            'governance_details': {
-                'ethics_compliance': round(ethics_compliance, 2),
-                'audit_controls': round(audit_controls, 2),
-                'board_diversity': round(board_diversity, 2),
-                'transparency': round(transparency, 2)
-            }
-        }
+        return results
     
     @staticmethod
-    def find_by_id(audit_id):
-        """Find audit by ID"""
-        collection = ESGAudit._get_collection()
-        audit = collection.find_one({'_id': ObjectId(audit_id)})
-        if audit:
-            audit['_id'] = str(audit['_id'])
-            audit['user_id'] = str(audit['user_id'])
-        return audit
+    def find_by_id(audit_id, tenant_id=None):
+        """Find audit by ID, within a tenant when given"""
+        collection = ESGAudit._get_collection(writer=tenant_id)
+        query = {'_id': ObjectId(audit_id)}
+        return collection.find_one(tenant_scoped(tenant_id, query) if tenant_id else query)
     
     @staticmethod
-    def find_by_user(user_id, limit=50):
-        """Find all audits for a user"""
-        collection = ESGAudit._get_collection()
-        audits = list(collection.find(
-            {'user_id': ObjectId(user_id)}
-        ).sort('created_at', -1).limit(limit))
+    def find_by_tenant(tenant_id, limit=50):
+        """Find a tenant's audits, newest first"""
+        collection = ESGAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return list(collection.find(
+            tenant_filter(tenant_id)
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    
+    @staticmethod
+    def find_page_by_tenant(tenant_id, limit, before=None):
+        """Find a page of a tenant's audit summaries, newest first
+        
+        Args:
+            before: Optional (created_at, _id) keyset cursor; only audits
+                strictly older than it are returned
+        """
+        collection = ESGAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        keyset = None
+        if before:
+            created_at, audit_id = before
+            keyset = {'$or': [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': audit_id}}
+            ]}
         
-        for audit in audits:
-            audit['_id'] = str(audit['_id'])
-            audit['user_id'] = str(audit['user_id'])
+        return list(collection.find(
+            tenant_scoped(tenant_id, keyset),
+            ESGAudit.SUMMARY_PROJECTION
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    
+    @staticmethod
+    def summarize_by_tenant(tenant_id):
+        """Summarize a tenant's audits in one aggregation
         
-        return audits
+        Returns:
+            Facet document with 'totals' (count and average score),
+            'latest' (newest audit summary) and 'ratings' (count per rating)
+        """
+        collection = ESGAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        pipeline = [
+            {'$match': tenant_filter(tenant_id)},
+            {'$sort': {'created_at': -1, '_id': -1}},
+            {'$project': ESGAudit.SUMMARY_PROJECTION},
+            {'$facet': {
+                'totals': [{'$group': {
+                    '_id': None,
+                    'count': {'$sum': 1},
+                    'average_score': {'$avg': '$esg_score'}
+                }}],
+                'latest': [{'$limit': 1}],
+                'ratings': [{'$group': {'_id': '$esg_rating', 'count': {'$sum': 1}}}]
+            }}
+        ]
+        return next(collection.aggregate(pipeline))
     
     @staticmethod
-    def update_audit(audit_id, user_id, data):
-        """Update existing audit"""
+    def find_version(audit_id, tenant_id=None):
+        """Find only the owner and version fields of an audit, within a tenant when given"""
+        collection = ESGAudit._get_collection(writer=tenant_id)
+        query = {'_id': ObjectId(audit_id)}
+        return collection.find_one(tenant_scoped(tenant_id, query) if tenant_id else query, VERSION_PROJECTION)
+    
+    @staticmethod
+    def find_versions_by_tenant(tenant_id, limit=50):
+        """Find owner and version fields of a tenant's audits, ordered like find_by_tenant"""
+        collection = ESGAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return list(collection.find(
+            tenant_filter(tenant_id),
+            VERSION_PROJECTION
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    
+    @staticmethod
+    def update_audit(audit_id, tenant_id, data, version_filter=None):
+        """Update existing audit
+        
+        Args:
+            version_filter: Optional extra filter the audit must match, so
+                an If-Match update only applies to the expected revision
+        """
         collection = ESGAudit._get_collection()
         
         # Recalculate scores
@@ -188,36 +236,41 @@ class ESGAudit:
                 'governance_score': scores['governance_score'],
                 'esg_score': scores['esg_score'],
                 'esg_rating': scores['esg_rating'],
+                'scoring_version': scores['scoring_version'],
                 'updated_at': datetime.utcnow()
-            }
+            },
+            '$inc': {'revision': 1}
         }
         
         result = collection.update_one(
-            {'_id': ObjectId(audit_id), 'user_id': ObjectId(user_id)},
+            tenant_scoped(tenant_id, {'_id': ObjectId(audit_id)}, version_filter),
             update_doc
         )
+        MongoDB.note_write(tenant_id)
         
         return result.modified_count > 0
     
     @staticmethod
-    def delete_audit(audit_id, user_id):
-        """Delete audit"""
+    def delete_audit(audit_id, tenant_id):
+        """Delete a tenant's audit"""
         collection = ESGAudit._get_collection()
-        result = collection.delete_one({
-            '_id': ObjectId(audit_id),
-            'user_id': ObjectId(user_id)
-        })
+        result = collection.delete_one(tenant_scoped(tenant_id, {'_id': ObjectId(audit_id)}))
+        MongoDB.note_write(tenant_id)
         return result.deleted_count > 0
     
     @staticmethod
     def to_dict(audit):
-        """Convert audit document to dictionary"""
+        """Convert audit document to dictionary
+        
+        ObjectId and datetime values are left for the app's JSON provider.
+        """
         if not audit:
             return None
         
         return {
-            'id': str(audit['_id']),
-            'user_id': str(audit['user_id']),
+            'id': audit['_id'],
+            'user_id': audit['user_id'],
+            'tenant_id': audit.get('tenant_id', audit['user_id']),
             'organization_name': audit['organization_name'],
             'audit_period': audit['audit_period'],
             'input_data': audit['input_data'],
@@ -227,7 +280,9 @@ class ESGAudit:
             'governance_score': audit['governance_score'],
             'esg_score': audit['esg_score'],
             'esg_rating': audit['esg_rating'],
-            'created_at': audit['created_at'].isoformat(),
-            'updated_at': audit['updated_at'].isoformat(),
+            'scoring_version': audit.get('scoring_version'),
+            'created_at': audit['created_at'],
+            'updated_at': audit['updated_at'],
+            'revision': audit.get('revision'),
             'status': audit['status']
         }
@@ -1,6 +1,9 @@
 from datetime import datetime
 from bson import ObjectId
-from app.db.mongo import MongoDB
+from app.db.mongo import MongoDB, PRIMARY, SECONDARY_PREFERRED
+from app.utils.etags import VERSION_PROJECTION
+from app.utils.tenancy import SHARD_KEY, tenant_filter, tenant_scoped
+from app.scoring.compiler import SCORING_SECONDS, get_spec
 
 
 class IGBCGreenBuildingAudit:
@@ -8,10 +11,22 @@ class IGBCGreenBuildingAudit:
     
     COLLECTION_NAME = 'igbc_green_building_audits'
     
+    # Fields returned in feeds and other audit summaries
+    SUMMARY_PROJECTION = {
+        field: 1 for field in (
+            'building_name', 'total_score', 'rating', 'audit_period', 'status', 'created_at', 'updated_at'
+        )
+    }
+    
     @staticmethod
-    def _get_collection():
-        """Get MongoDB collection"""
-        return MongoDB.get_collection(IGBCGreenBuildingAudit.COLLECTION_NAME)
+    def _get_collection(read=PRIMARY, writer=None):
+        """Get MongoDB collection
+        
+        Args:
+            read: Read preference (see app.db.mongo)
+            writer: Tenant whose own recent writes the reads must see
+        """
+        return MongoDB.get_collection(IGBCGreenBuildingAudit.COLLECTION_NAME, read, writer=writer)
     
     @staticmethod
     def create_indexes():
@@ -19,10 +34,13 @@ class IGBCGreenBuildingAudit:
         collection = IGBCGreenBuildingAudit._get_collection()
         collection.create_index("user_id")
         collection.create_index("created_at")
+        collection.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+        collection.create_index([("tenant_id", 1), ("created_at", -1), ("_id", -1)])
+        collection.create_index(list(SHARD_KEY.items()))
         collection.create_index("building_name")
     
     @staticmethod
-    def create_audit(user_id, building_name, audit_period, data):
+    def create_audit(user_id, building_name, audit_period, data, tenant_id=None):
         """Create a new IGBC Green Building audit
         
         Args:
@@ -30,6 +48,7 @@ class IGBCGreenBuildingAudit:
             building_name: Name of building being audited
             audit_period: Period of audit
             data: Dictionary containing IGBC parameters
+            tenant_id: Owning tenant, the user's personal tenant by default
         
         Returns:
             Inserted audit ID
@@ -39,23 +58,27 @@ class IGBCGreenBuildingAudit:
         
         audit_doc = {
             'user_id': ObjectId(user_id),
+            'tenant_id': ObjectId(tenant_id or user_id),
             'building_name': building_name,
             'audit_period': audit_period,
             'input_data': data,
             'scores': scores,
             'total_score': scores['total_score'],
             'rating': scores['rating'],
+            'scoring_version': scores['scoring_version'],
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow(),
+            'revision': 1,
             'status': 'completed'
         }
         
         collection = IGBCGreenBuildingAudit._get_collection()
         result = collection.insert_one(audit_doc)
+        MongoDB.note_write(audit_doc['tenant_id'])
         return str(result.inserted_id)
     
     @staticmethod
-    def calculate_scores(data):
+    def calculate_scores(data, version=None):
         """Calculate IGBC Green Building scores based on input data
         
         IGBC Categories (out of 100 points):
@@ -67,92 +90,115 @@ class IGBCGreenBuildingAudit:
         - Construction Practices (10)
         - Management & Operations (10)
         - Innovation (5)
-        """
         
-        # Get scores from input data
-        site_score = float(data.get('site_selection', 0))
-        water_score = float(data.get('water_conservation', 0))
-        energy_score = float(data.get('energy_conservation', 0))
-        environment_score = float(data.get('environment_protection', 0))
-        health_score = float(data.get('health_wellbeing', 0))
-        construction_score = float(data.get('construction_practices', 0))
-        management_score = float(data.get('management_operations', 0))
-        innovation_score = float(data.get('innovation', 0))
-        
-        # Verify scores are within ranges
-        site_score = min(site_score, 10)
-        water_score = min(water_score, 10)
-        energy_score = min(energy_score, 15)
-        environment_score = min(environment_score, 10)
-        health_score = min(health_score, 10)
-        construction_score = min(construction_score, 10)
-        management_score = min(management_score, 10)
-        innovation_score = min(innovation_score, 5)
-        
-        # Calculate total score (out of 100)
-        total_score = (
-            site_score + 
-            water_score + 
-            energy_score + 
-            environment_score + 
-            health_score + 
-            construction_score + 
-            management_score + 
-            innovation_score
-        )
+        Category caps and rating thresholds come from the scoring spec
+        for `version` (current by default).
+        """
+        return IGBCGreenBuildingAudit.calculate_scores_batch([data], version)[0]
+    
+    @staticmethod
+    @SCORING_SECONDS.time(kind='igbc')
+    def calculate_scores_batch(rows, version=None):
+        """Calculate IGBC scores for many input dicts with one matrix multiply"""
+        spec = get_spec('igbc', version)
+        capped, scores, ratings = spec.score_batch(spec.vectorize(rows))
         
-        # Determine rating based on total score
-        if total_score >= 85:
-            rating = 'PLATINUM'
-        elif total_score >= 70:
-            rating = 'GOLD'
-        elif total_score >= 55:
-            rating = 'SILVER'
-        elif total_score >= 40:
-            rating = 'GREEN'
-        else:
-            rating = 'NOT RATED'
+        results = []
+        for row_num in range(len(rows)):
+            result = dict(zip(spec.fields, capped[row_num].round(2).tolist()))
+            result.update(zip(spec.outputs, scores[row_num].round(2).tolist()))
+            result['rating'] = ratings[row_num]
+            result['scoring_version'] = spec.version
+            results.append(result)
         
-        return {
-            'site_selection': round(site_score, 2),
-            'water_conservation': round(water_score, 2),
-            'energy_conservation': round(energy_score, 2),
-            'environment_protection': round(environment_score, 2),
-            'health_wellbeing': round(health_score, 2),
-            'construction_practices': round(construction_score, 2),
-            'management_operations': round(management_score, 2),
-            'innovation': round(innovation_score, 2),
-            'total_score': round(total_score, 2),
-            'rating': rating
-        }
+        return results
     
     @staticmethod
-    def find_by_id(audit_id):
-        """Find audit by ID"""
-        collection = IGBCGreenBuildingAudit._get_collection()
-        audit = collection.find_one({'_id': ObjectId(audit_id)})
-        if audit:
-            audit['_id'] = str(audit['_id'])
-            audit['user_id'] = str(audit['user_id'])
-        return audit
+    def find_by_id(audit_id, tenant_id=None):
+        """Find audit by ID, within a tenant when given"""
+        collection = IGBCGreenBuildingAudit._get_collection(writer=tenant_id)
+        query = {'_id': ObjectId(audit_id)}
+        return collection.find_one(tenant_scoped(tenant_id, query) if tenant_id else query)
     
     @staticmethod
-    def find_by_user(user_id, limit=50):
-        """Find all audits for a user"""
-        collection = IGBCGreenBuildingAudit._get_collection()
-        audits = list(collection.find(
-            {'user_id': ObjectId(user_id)}
-        ).sort('created_at', -1).limit(limit))
+    def find_by_tenant(tenant_id, limit=50):
+        """Find a tenant's audits, newest first"""
+        collection = IGBCGreenBuildingAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return list(collection.find(
+            tenant_filter(tenant_id)
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    
+    @staticmethod
+    def find_page_by_tenant(tenant_id, limit, before=None):
+        """Find a page of a tenant's audit summaries, newest first
         
-        for audit in audits:
-            audit['_id'] = str(audit['_id'])
-            audit['user_id'] = str(audit['user_id'])
+        Args:
+            before: Optional (created_at, _id) keyset cursor; only audits
+                strictly older than it are returned
+        """
+        collection = IGBCGreenBuildingAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        keyset = None
+        if before:
+            created_at, audit_id = before
+            keyset = {'$or': [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': audit_id}}
+            ]}
+        
+        return list(collection.find(
+            tenant_scoped(tenant_id, keyset),
+            IGBCGreenBuildingAudit.SUMMARY_PROJECTION
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    
+    @staticmethod
+    def summarize_by_tenant(tenant_id):
+        """Summarize a tenant's audits in one aggregation
         
-        return audits
+        Returns:
+            Facet document with 'totals' (count and average score),
+            'latest' (newest audit summary) and 'ratings' (count per rating)
+        """
+        collection = IGBCGreenBuildingAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        pipeline = [
+            {'$match': tenant_filter(tenant_id)},
+            {'$sort': {'created_at': -1, '_id': -1}},
+            {'$project': IGBCGreenBuildingAudit.SUMMARY_PROJECTION},
+            {'$facet': {
+                'totals': [{'$group': {
+                    '_id': None,
+                    'count': {'$sum': 1},
+                    'average_score': {'$avg': '$total_score'}
+                }}],
+                'latest': [{'$limit': 1}],
+                'ratings': [{'$group': {'_id': '$rating', 'count': {'$sum': 1}}}]
+            }}
+        ]
+        return next(collection.aggregate(pipeline))
+    
+    @staticmethod
+    def find_version(audit_id, tenant_id=None):
+        """Find only the owner and version fields of an audit, within a tenant when given"""
+        collection = IGBCGreenBuildingAudit._get_collection(writer=tenant_id)
+        query = {'_id': ObjectId(audit_id)}
+        return collection.find_one(tenant_scoped(tenant_id, query) if tenant_id else query, VERSION_PROJECTION)
+    
+    @staticmethod
+    def find_versions_by_tenant(tenant_id, limit=50):
+        """Find owner and version fields of a tenant's audits, ordered like find_by_tenant"""
+        collection = IGBCGreenBuildingAudit._get_collection(SECONDARY_PREFERRED, tenant_id)
+        return list(collection.find(
+            tenant_filter(tenant_id),
+            VERSION_PROJECTION
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
     
     @staticmethod
-    def update_audit(audit_id, user_id, data):
-        """Update existing audit"""
+    def update_audit(audit_id, tenant_id, data, version_filter=None):
+        """Update existing audit
+        
+        Args:
+            version_filter: Optional extra filter the audit must match, so
+                an If-Match update only applies to the expected revision
+        """
         collection = IGBCGreenBuildingAudit._get_collection()
         
         # Recalculate scores
@@ -164,43 +210,50 @@ class IGBCGreenBuildingAudit:
                 'scores': scores,
                 'total_score': scores['total_score'],
                 'rating': scores['rating'],
+                'scoring_version': scores['scoring_version'],
                 'updated_at': datetime.utcnow()
-            }
+            },
+            '$inc': {'revision': 1}
         }
         
         result = collection.update_one(
-            {'_id': ObjectId(audit_id), 'user_id': ObjectId(user_id)},
+            tenant_scoped(tenant_id, {'_id': ObjectId(audit_id)}, version_filter),
             update_doc
         )
+        MongoDB.note_write(tenant_id)
         
         return result.modified_count > 0
     
     @staticmethod
-    def delete_audit(audit_id, user_id):
-        """Delete audit"""
+    def delete_audit(audit_id, tenant_id):
+        """Delete a tenant's audit"""
         collection = IGBCGreenBuildingAudit._get_collection()
-        result = collection.delete_one({
-            '_id': ObjectId(audit_id),
-            'user_id': ObjectId(user_id)
-        })
+        result = collection.delete_one(tenant_scoped(tenant_id, {'_id': ObjectId(audit_id)}))
+        MongoDB.note_write(tenant_id)
         return result.deleted_count > 0
     
     @staticmethod
     def to_dict(audit):
-        """Convert audit document to dictionary"""
+        """Convert audit document to dictionary
+        
+        ObjectId and datetime values are left for the app's JSON provider.
+        """
         if not audit:
             return None
         
         return {
-            'id': str(audit['_id']),
-            'user_id': str(audit['user_id']),
+            'id': audit['_id'],
+            'user_id': audit['user_id'],
+            'tenant_id': audit.get('tenant_id', audit['user_id']),
             'building_name': audit['building_name'],
             'audit_period': audit['audit_period'],
             'input_data': audit['input_data'],
             'scores': audit['scores'],
             'total_score': audit['total_score'],
             'rating': audit['rating'],
-            'created_at': audit['created_at'].isoformat(),
-            'updated_at': audit['updated_at'].isoformat(),
+            'scoring_version': audit.get('scoring_version'),
+            'created_at': audit['created_at'],
+            'updated_at': audit['updated_at'],
+            'revision': audit.get('revision'),
             'status': audit['status']
         }
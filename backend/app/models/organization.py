@@ -0,0 +1,147 @@
+"""Organization and membership models for MongoDB."""
+
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+from app.db.mongo import MongoDB
+
+
+class Organization:
+    """Organization model.
+
+    An organization is a tenant shared by its members. Every user also has
+    a personal tenant whose id is their user id; it has no organization
+    document and no memberships.
+    """
+
+    COLLECTION_NAME = "organizations"
+    MEMBERSHIPS_COLLECTION_NAME = "memberships"
+
+    ROLES = ("owner", "member")
+
+    @classmethod
+    def get_collection(cls):
+        """Get organizations collection."""
+        return MongoDB.get_collection(cls.COLLECTION_NAME)
+
+    @classmethod
+    def get_memberships_collection(cls):
+        """Get memberships collection."""
+        return MongoDB.get_collection(cls.MEMBERSHIPS_COLLECTION_NAME)
+
+    @classmethod
+    def create_indexes(cls):
+        """Create indexes for organization collections."""
+        memberships = cls.get_memberships_collection()
+        memberships.create_index([("user_id", 1), ("tenant_id", 1)], unique=True)
+        memberships.create_index([("tenant_id", 1), ("created_at", 1)])
+
+    @classmethod
+    def create_organization(cls, name, owner_id):
+        """Create an organization with `owner_id` as its owner."""
+        result = cls.get_collection().insert_one({
+            "name": name,
+            "created_by": ObjectId(owner_id),
+            "created_at": datetime.utcnow()
+        })
+        cls.add_member(result.inserted_id, owner_id, "owner")
+        return str(result.inserted_id)
+
+    @classmethod
+    def find_by_id(cls, tenant_id):
+        """Find organization by ID."""
+        try:
+            return cls.get_collection().find_one({"_id": ObjectId(tenant_id)})
+        except Exception:
+            return None
+
+    @classmethod
+    def add_member(cls, tenant_id, user_id, role="member"):
+        """Add a user to an organization.
+
+        Returns:
+            False if the user is already a member
+        """
+        try:
+            cls.get_memberships_collection().insert_one({
+                "tenant_id": ObjectId(tenant_id),
+                "user_id": ObjectId(user_id),
+                "role": role,
+                "created_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @classmethod
+    def remove_member(cls, tenant_id, user_id):
+        """Remove a user from an organization.
+
+        Returns:
+            False if the user is not a member
+
+        Raises:
+            ValueError: If the user is the organization's last owner
+        """
+        try:
+            tenant_id, user_id = ObjectId(tenant_id), ObjectId(user_id)
+        except Exception:
+            return False
+
+        memberships = cls.get_memberships_collection()
+        with MongoDB.transaction() as session:
+            membership = memberships.find_one({"user_id": user_id, "tenant_id": tenant_id}, session=session)
+            if membership is None:
+                return False
+            if membership["role"] == "owner":
+                # Writing the organization makes concurrent removals of
+                # its owners conflict, so they cannot both pass the check
+                cls.get_collection().update_one(
+                    {"_id": tenant_id}, {"$set": {"updated_at": datetime.utcnow()}}, session=session
+                )
+                owners = memberships.count_documents({"tenant_id": tenant_id, "role": "owner"}, session=session)
+                if owners == 1:
+                    raise ValueError("An organization needs at least one owner")
+            memberships.delete_one({"_id": membership["_id"]}, session=session)
+        return True
+
+    @classmethod
+    def find_membership(cls, tenant_id, user_id):
+        """Find a user's membership of an organization."""
+        try:
+            return cls.get_memberships_collection().find_one({
+                "user_id": ObjectId(user_id),
+                "tenant_id": ObjectId(tenant_id)
+            })
+        except Exception:
+            return None
+
+    @classmethod
+    def find_memberships_by_user(cls, user_id):
+        """Find all organization memberships of a user."""
+        return list(cls.get_memberships_collection().find({"user_id": ObjectId(user_id)}))
+
+    @classmethod
+    def find_members(cls, tenant_id):
+        """Find the memberships of an organization, oldest first."""
+        return list(cls.get_memberships_collection().find(
+            {"tenant_id": ObjectId(tenant_id)}
+        ).sort("created_at", 1))
+
+    @classmethod
+    def find_by_ids(cls, tenant_ids):
+        """Find organizations by ID in one query."""
+        return list(cls.get_collection().find({"_id": {"$in": [ObjectId(t) for t in tenant_ids]}}))
+
+    @classmethod
+    def to_dict(cls, organization, role=None):
+        """Convert organization document to dictionary."""
+        if organization is None:
+            return None
+        return {
+            "id": str(organization["_id"]),
+            "name": organization["name"],
+            "role": role,
+            "personal": False,
+            "created_at": organization.get("created_at")
+        }
@@ -1,65 +1,95 @@
 """OTP model for MongoDB."""
 
 from datetime import datetime, timedelta
+import hashlib
+import hmac
 from flask import current_app
+from pymongo import ReturnDocument
 from app.db.mongo import MongoDB
 
 
 class OTP:
-    """OTP model for password reset."""
-    
+    """OTP model for password reset.
+
+    Codes are stored as keyed hashes, so a database leak does not expose
+    them (a plain hash of a 6-digit code is trivially reversible).
+    """
+
     COLLECTION_NAME = "otps"
-    
+
     @classmethod
     def get_collection(cls):
         """Get OTP collection."""
         return MongoDB.get_collection(cls.COLLECTION_NAME)
-    
+
     @classmethod
     def create_indexes(cls):
         """Create indexes for OTP collection."""
         collection = cls.get_collection()
-        collection.create_index("email", unique=False)
+        collection.create_index([("email", 1), ("code_hash", 1)])
         collection.create_index("expires_at", expireAfterSeconds=0)
-    
+
+    @staticmethod
+    def hash_code(email, otp_code):
+        """Keyed hash of an OTP code, bound to the email it was sent to."""
+        key = current_app.config['SECRET_KEY'].encode()
+        return hmac.new(key, f"{email}:{otp_code}".encode(), hashlib.sha256).hexdigest()
+
     @classmethod
     def create_otp(cls, email, otp_code):
-        """Create OTP for email."""
+        """Create OTP for email, replacing any unused ones."""
         collection = cls.get_collection()
         expiry_minutes = current_app.config['OTP_EXPIRY_MINUTES']
-        
+
+        collection.delete_many({"email": email, "is_used": False})
+
         otp_data = {
             "email": email,
-            "code": otp_code,
+            "code_hash": cls.hash_code(email, otp_code),
             "is_used": False,
+            "attempts": 0,
             "created_at": datetime.utcnow(),
             "expires_at": datetime.utcnow() + timedelta(minutes=expiry_minutes)
         }
         result = collection.insert_one(otp_data)
         return str(result.inserted_id)
-    
-    @classmethod
-    def find_valid_otp(cls, email, otp_code):
-        """Find valid OTP for email."""
-        collection = cls.get_collection()
-        return collection.find_one({
-            "email": email,
-            "code": otp_code,
-            "is_used": False,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
-    
+
     @classmethod
-    def mark_as_used(cls, otp_id):
-        """Mark OTP as used."""
-        from bson.objectid import ObjectId
+    def consume_otp(cls, email, otp_code):
+        """Verify and use up an OTP.
+
+        Every guess first reserves one of the OTP's OTP_MAX_ATTEMPTS
+        attempts in an atomic increment, so concurrent guesses cannot
+        exceed the limit; only then is the code compared. Only one of
+        several concurrent calls with the right code can use it up.
+
+        Returns:
+            The consumed OTP document, or None if invalid
+        """
         collection = cls.get_collection()
-        result = collection.update_one(
-            {"_id": ObjectId(otp_id)},
-            {"$set": {"is_used": True}}
+        now = datetime.utcnow()
+        max_attempts = current_app.config['OTP_MAX_ATTEMPTS']
+
+        otp = collection.find_one_and_update(
+            {
+                "email": email,
+                "is_used": False,
+                "attempts": {"$lt": max_attempts},
+                "expires_at": {"$gt": now}
+            },
+            {"$inc": {"attempts": 1}},
+            sort=[("created_at", -1)],
+            return_document=ReturnDocument.AFTER
         )
-        return result.modified_count > 0
-    
+        if otp is None or not hmac.compare_digest(otp["code_hash"], cls.hash_code(email, otp_code)):
+            return None
+
+        return collection.find_one_and_update(
+            {"_id": otp["_id"], "is_used": False},
+            {"$set": {"is_used": True, "used_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+
     @classmethod
     def delete_used_otps(cls, email):
         """Delete all used OTPs for email."""
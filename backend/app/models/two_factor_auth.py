@@ -1,16 +1,41 @@
 """Two-Factor Authentication model for MongoDB."""
 
 from datetime import datetime
+from bson.objectid import ObjectId
+from flask import current_app
 from app.db.mongo import MongoDB
+import hashlib
+import hmac
 import pyotp
 import secrets
+import threading
+import time
 
 
 class TwoFactorAuth:
-    """2FA settings and backup codes for users."""
+    """2FA settings and backup codes for users.
+    
+    TOTP verifiers are cached in memory per user for TOTP_CACHE_SECONDS,
+    so most attempts need no database read. An accepted code is claimed
+    by one conditional write, raising the user's last used time step
+    only while 2FA is still enabled with the same secret: a code of a
+    step not after the last used one is rejected as a replay, and a
+    verifier cached by a worker after 2FA was disabled or set up again
+    elsewhere accepts nothing.
+    
+    Backup codes are stored as keyed hashes and removed when used.
+    """
     
     COLLECTION_NAME = "two_factor_auth"
     
+    # Time steps accepted either side of the current one
+    VALID_WINDOW = 1
+    
+    _lock = threading.Lock()
+    _verifiers = {}
+    # User -> last time step claimed by this worker, to reject replays early
+    _last_steps = {}
+    
     @classmethod
     def get_collection(cls):
         """Get 2FA collection."""
@@ -49,35 +74,52 @@ class TwoFactorAuth:
         """
         return [secrets.token_hex(4) for _ in range(count)]
     
+    @staticmethod
+    def hash_backup_code(user_id, code):
+        """Keyed hash of a backup code, bound to its user.
+        
+        Codes are short, so an unkeyed hash could be brute-forced from a
+        database dump.
+        """
+        key = current_app.config['SECRET_KEY'].encode()
+        message = f"{user_id}:{str(code).strip().lower()}".encode()
+        return hmac.new(key, message, hashlib.sha256).hexdigest()
+    
     @classmethod
     def create_2fa(cls, user_id, secret, backup_codes):
-        """Create 2FA record for user.
+        """Create (or replace) the 2FA record of a user, not yet enabled.
         
         Args:
             user_id: User ID
             secret: TOTP secret
-            backup_codes: List of backup codes
+            backup_codes: List of backup codes (stored hashed)
         """
         collection = cls.get_collection()
         
         twofa_data = {
-            "user_id": user_id,
             "secret": secret,
             "is_enabled": False,
-            "backup_codes": backup_codes,
-            "used_backup_codes": [],
-            "created_at": datetime.utcnow(),
+            "backup_codes": [cls.hash_backup_code(user_id, code) for code in backup_codes],
+            "backup_codes_hashed": True,
             "updated_at": datetime.utcnow()
         }
         
-        result = collection.insert_one(twofa_data)
-        return str(result.inserted_id)
+        # Replaces the settings of a user setting up 2FA again
+        collection.update_one(
+            {"user_id": ObjectId(user_id)},
+            {
+                "$set": twofa_data,
+                "$unset": {"used_backup_codes": ""},
+                "$setOnInsert": {"created_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+        cls.invalidate(user_id)
     
     @classmethod
     def find_by_user(cls, user_id):
         """Find 2FA settings by user ID."""
         collection = cls.get_collection()
-        from bson.objectid import ObjectId
         try:
             return collection.find_one({"user_id": ObjectId(user_id)})
         except:
@@ -87,7 +129,6 @@ class TwoFactorAuth:
     def enable_2fa(cls, user_id):
         """Enable 2FA for user."""
         collection = cls.get_collection()
-        from bson.objectid import ObjectId
         result = collection.update_one(
             {"user_id": ObjectId(user_id)},
             {
@@ -97,50 +138,127 @@ class TwoFactorAuth:
                 }
             }
         )
+        cls.invalidate(user_id)
         return result.modified_count > 0
     
     @classmethod
-    def verify_totp(cls, user_id, code):
-        """Verify TOTP code."""
+    def invalidate(cls, user_id):
+        """Drop a user's cached TOTP verifier after their settings change."""
+        with cls._lock:
+            cls._verifiers.pop(str(user_id), None)
+    
+    @classmethod
+    def _get_verifier(cls, user_id):
+        """Cached pyotp.TOTP of a user, or None if 2FA is not enabled."""
+        user_id = str(user_id)
+        now = time.monotonic()
+        with cls._lock:
+            cached = cls._verifiers.get(user_id)
+        if cached and cached[0] > now:
+            return cached[1]
+        
         twofa = cls.find_by_user(user_id)
-        if not twofa or not twofa.get("is_enabled"):
-            return False
+        totp = pyotp.TOTP(twofa["secret"]) if twofa and twofa.get("is_enabled") else None
+        with cls._lock:
+            cls._verifiers[user_id] = (now + current_app.config['TOTP_CACHE_SECONDS'], totp)
+        return totp
+    
+    @classmethod
+    def _claim_step(cls, user_id, secret, step):
+        """Record a time step as the user's last used one.
         
-        secret = twofa.get("secret")
-        totp = pyotp.TOTP(secret)
+        Returns:
+            False if a step at least as recent was used before, or 2FA is
+            no longer enabled with `secret`
+        """
+        with cls._lock:
+            if cls._last_steps.get(user_id, -1) >= step:
+                return False
         
-        # Allow 1 time step tolerance (30 seconds)
-        return totp.verify(code, valid_window=1)
+        result = cls.get_collection().update_one(
+            {
+                "user_id": ObjectId(user_id),
+                "is_enabled": True,
+                "secret": secret,
+                "$or": [{"last_totp_step": {"$exists": False}}, {"last_totp_step": {"$lt": step}}]
+            },
+            {"$set": {"last_totp_step": step}}
+        )
+        if not result.modified_count:
+            return False
+        with cls._lock:
+            if len(cls._last_steps) > 10000:
+                cls._last_steps = {}
+            cls._last_steps[user_id] = max(step, cls._last_steps.get(user_id, -1))
+        return True
     
     @classmethod
-    def use_backup_code(cls, user_id, code):
-        """Use a backup code."""
-        collection = cls.get_collection()
-        from bson.objectid import ObjectId
-        
-        twofa = cls.find_by_user(user_id)
-        if not twofa or code not in twofa.get("backup_codes", []):
+    def verify_totp(cls, user_id, code):
+        """Verify TOTP code, rejecting codes of a time step already used."""
+        totp = cls._get_verifier(user_id)
+        if totp is None:
             return False
         
-        if code in twofa.get("used_backup_codes", []):
-            return False
+        # Allow 1 time step tolerance (30 seconds)
+        current = int(time.time()) // totp.interval
+        for step in range(current - cls.VALID_WINDOW, current + cls.VALID_WINDOW + 1):
+            if hmac.compare_digest(str(code), totp.generate_otp(step)):
+                return cls._claim_step(str(user_id), totp.secret, step)
+        return False
+    
+    @classmethod
+    def use_backup_code(cls, user_id, code):
+        """Use up a backup code.
         
-        # Mark as used
+        Checking and removing the code is a single conditional update, so
+        of several concurrent requests with the same code only one succeeds.
+        """
+        collection = cls.get_collection()
+        code_hash = cls.hash_backup_code(user_id, code)
         result = collection.update_one(
-            {"user_id": ObjectId(user_id)},
+            {"user_id": ObjectId(user_id), "is_enabled": True, "backup_codes": code_hash},
             {
-                "$push": {"used_backup_codes": code},
+                "$pull": {"backup_codes": code_hash},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
-        
         return result.modified_count > 0
     
+    @classmethod
+    def regenerate_backup_codes(cls, user_id, count=10):
+        """Replace a user's backup codes with new ones.
+        
+        Returns:
+            List of new backup codes, or None if 2FA is not enabled
+        """
+        collection = cls.get_collection()
+        codes = cls.generate_backup_codes(count)
+        result = collection.update_one(
+            {"user_id": ObjectId(user_id), "is_enabled": True},
+            {
+                "$set": {
+                    "backup_codes": [cls.hash_backup_code(user_id, code) for code in codes],
+                    "backup_codes_hashed": True,
+                    "updated_at": datetime.utcnow()
+                }
+            }
+        )
+        return codes if result.matched_count else None
+    
+    @classmethod
+    def count_backup_codes(cls, user_id):
+        """Number of unused backup codes, or None if 2FA is not enabled."""
+        collection = cls.get_collection()
+        result = list(collection.aggregate([
+            {"$match": {"user_id": ObjectId(user_id), "is_enabled": True}},
+            {"$project": {"remaining": {"$size": {"$ifNull": ["$backup_codes", []]}}}}
+        ]))
+        return result[0]["remaining"] if result else None
+    
     @classmethod
     def disable_2fa(cls, user_id):
         """Disable 2FA for user."""
         collection = cls.get_collection()
-        from bson.objectid import ObjectId
         result = collection.update_one(
             {"user_id": ObjectId(user_id)},
             {
@@ -150,4 +268,5 @@ class TwoFactorAuth:
                 }
             }
         )
+        cls.invalidate(user_id)
         return result.modified_count > 0
@@ -24,9 +24,12 @@ class User:
     
     @classmethod
     def create_user(cls, email, hashed_password, is_verified=True):
-        """Create a new user."""
+        """Create a new user, whose personal tenant id is their user id."""
         collection = cls.get_collection()
+        user_id = ObjectId()
         user_data = {
+            "_id": user_id,
+            "tenant_id": user_id,
             "email": email,
             "password": hashed_password,
             "is_active": True,
@@ -75,6 +78,7 @@ class User:
             return None
         return {
             "id": str(user_doc["_id"]),
+            "tenant_id": str(user_doc.get("tenant_id", user_doc["_id"])),
             "email": user_doc["email"],
             "is_active": user_doc.get("is_active", True),
             "is_verified": user_doc.get("is_verified", True),
@@ -98,6 +102,26 @@ class User:
         )
         return result.modified_count > 0
     
+    @classmethod
+    def mark_verified_by_email(cls, email, session=None):
+        """Mark user email as verified by email address.
+        
+        Returns:
+            True if a user with this email exists
+        """
+        collection = cls.get_collection()
+        result = collection.update_one(
+            {"email": email},
+            {
+                "$set": {
+                    "is_verified": True,
+                    "updated_at": datetime.utcnow()
+                }
+            },
+            session=session
+        )
+        return result.matched_count > 0
+    
     @classmethod
     def enable_2fa(cls, user_id):
         """Enable 2FA for user."""
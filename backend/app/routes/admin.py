@@ -0,0 +1,44 @@
+"""Admin endpoints for request profiles."""
+
+import hmac
+import logging
+from flask import Blueprint, current_app, jsonify, request
+from app.utils.profiling import list_profiles, load_profile
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+def _authorized():
+    """Whether the request carries PROFILING_TOKEN as a bearer token."""
+    token = current_app.config['PROFILING_TOKEN']
+    return bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+@bp.route('/profiles', methods=['GET'])
+def get_profiles():
+    """Metadata of the stored request profiles, newest first."""
+    if not _authorized():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    try:
+        return jsonify({
+            "success": True,
+            "profiles": list_profiles(current_app.config['PROFILE_DIR'])
+        }), 200
+    except Exception as e:
+        logger.error("List profiles error: %s", e)
+        return jsonify({"success": False, "message": "Failed to list profiles"}), 500
+
+
+@bp.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Collapsed stacks of a profile, for flamegraph.pl or speedscope."""
+    if not _authorized():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    collapsed = load_profile(current_app.config['PROFILE_DIR'], profile_id)
+    if collapsed is None:
+        return jsonify({"success": False, "message": "Profile not found"}), 404
+    response = current_app.response_class(collapsed, mimetype='text/plain')
+    response.headers['Content-Disposition'] = f'attachment; filename="{profile_id}.collapsed"'
+    return response
@@ -1,20 +1,135 @@
-from flask import Blueprint, request, jsonify
+from concurrent.futures import TimeoutError as RenderTimeoutError
+from bson import ObjectId
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.db.mongo import read_preference, SECONDARY_PREFERRED
+from app.routes.batch import batchable
 from app.models.carbon_emission_audit import CarbonEmissionAudit
 from app.models.igbc_green_building_audit import IGBCGreenBuildingAudit
 from app.models.esg_audit import ESGAudit
+from app.services.audit_types import AUDIT_MODELS
+from app.services.ranking_service import RankingService, ALL_SEGMENT
+from app.services.scenario_service import ScenarioService
+from app.services.uncertainty_service import UncertaintyService
+from app.services.report_service import ReportService, REPORT_FORMATS
+from app.services.feed_service import FeedService
+from app.services.dashboard_service import DashboardService
+from app.services.tenant_service import TenantService, TENANT_HEADER
+from app.utils.etags import audit_etag, identity_etag, list_etag, none_match, version_filter
 
 bp = Blueprint('audits', __name__, url_prefix='/api/audits')
 
 
+# ==================== TENANCY ====================
+
+def _current_tenant():
+    """Tenant the request acts on, or None if the user is not a member of it"""
+    return TenantService.resolve(get_jwt_identity(), request.headers.get(TENANT_HEADER))
+
+
+def _not_a_member():
+    """Response to a request for a tenant the user is not a member of"""
+    return jsonify({'success': False, 'message': 'Not a member of this organization'}), 403
+
+
+# ==================== CONDITIONAL REQUESTS ====================
+
+def _not_modified(etag):
+    """Empty 304 response carrying the current ETag"""
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def _get_audit_response(audit_type, audit_id, tenant_id):
+    """GET one audit, answering If-None-Match with 304 from a projected read"""
+    model = AUDIT_MODELS[audit_type]
+    
+    if request.if_none_match:
+        version = model.find_version(audit_id, tenant_id)
+        if not version:
+            return jsonify({'success': False, 'message': 'Audit not found'}), 404
+        if none_match(request.if_none_match, audit_etag(version)):
+            return _not_modified(audit_etag(version))
+    
+    audit = model.find_by_id(audit_id, tenant_id)
+    
+    if not audit:
+        return jsonify({'success': False, 'message': 'Audit not found'}), 404
+    
+    response = jsonify({
+        'success': True,
+        'audit': model.to_dict(audit)
+    })
+    response.set_etag(audit_etag(audit))
+    return response, 200
+
+
+def _list_audits_response(audit_type, tenant_id):
+    """List a tenant's audits, answering If-None-Match with 304 from a projected read"""
+    model = AUDIT_MODELS[audit_type]
+    
+    if request.if_none_match:
+        etag = list_etag(model.find_versions_by_tenant(tenant_id))
+        if none_match(request.if_none_match, etag):
+            return _not_modified(etag)
+    
+    audits = model.find_by_tenant(tenant_id)
+    
+    response = jsonify({
+        'success': True,
+        'count': len(audits),
+        'audits': [model.to_dict(a) for a in audits]
+    })
+    response.set_etag(list_etag(audits))
+    return response, 200
+
+
+def _conditional_update(audit_type, audit_id, tenant_id, data):
+    """Update an audit, honoring If-Match atomically through the update filter
+    
+    Returns:
+        Tuple of (success, error response)
+    """
+    model = AUDIT_MODELS[audit_type]
+    
+    expected = None
+    if request.if_match and not request.if_match.star_tag:
+        # Strong comparison: weak tags never match (RFC 9110 13.1.1)
+        filters = [version_filter(identity_etag(etag), audit_id) for etag in request.if_match.as_set()]
+        filters = [f for f in filters if f is not None]
+        if len(filters) == 1:
+            expected = filters[0]
+        elif filters:
+            expected = {'$or': filters}
+        else:
+            return False, (jsonify({'success': False, 'message': 'Audit has been modified'}), 412)
+    
+    if model.update_audit(audit_id, tenant_id, data, expected):
+        return True, None
+    
+    if expected is not None:
+        version = model.find_version(audit_id, tenant_id)
+        if version:
+            response = jsonify({'success': False, 'message': 'Audit has been modified'})
+            response.set_etag(audit_etag(version))
+            return False, (response, 412)
+    
+    return False, (jsonify({'success': False, 'message': 'Audit not found or unauthorized'}), 404)
+
+
 # ==================== CARBON EMISSION AUDITS ====================
 
 @bp.route('/carbon/create', methods=['POST'])
+@batchable
 @jwt_required()
 def create_carbon_audit():
     """Create a new carbon emission audit"""
     try:
         user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         data = request.get_json()
         
         # Validate required fields
@@ -26,53 +141,207 @@ def create_carbon_audit():
             user_id,
             data['facility_name'],
             data['audit_period'],
-            data.get('audit_data', {})
+            data.get('audit_data', {}),
+            tenant_id
         )
         
-        audit = CarbonEmissionAudit.find_by_id(audit_id)
+        audit = CarbonEmissionAudit.find_by_id(audit_id, tenant_id)
+        RankingService.observe('carbon', audit)
+        DashboardService.invalidate(tenant_id)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'Carbon audit created successfully',
             'audit': CarbonEmissionAudit.to_dict(audit)
-        }), 201
+        })
+        response.set_etag(audit_etag(audit))
+        return response, 201
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/carbon/<audit_id>', methods=['GET'])
+@batchable
 @jwt_required()
 def get_carbon_audit(audit_id):
     """Get carbon audit by ID"""
     try:
-        user_id = get_jwt_identity()
-        audit = CarbonEmissionAudit.find_by_id(audit_id)
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        return _get_audit_response('carbon', audit_id, tenant_id)
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/carbon/list', methods=['GET'])
+@batchable
+@jwt_required()
+def list_carbon_audits():
+    """List carbon audits of the current tenant"""
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        return _list_audits_response('carbon', tenant_id)
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/carbon/trends', methods=['GET'])
+@batchable
+@jwt_required()
+def get_carbon_trends():
+    """Per-facility carbon footprint time series and period-over-period deltas
+    
+    Query parameters: facility_name (optional, exact match)
+    """
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         
-        if not audit or str(audit['user_id']) != str(user_id):
+        facility_name = request.args.get('facility_name')
+        if facility_name is not None:
+            facility_name = facility_name.strip()
+            if not facility_name:
+                return jsonify({'success': False, 'message': 'facility_name must not be empty'}), 400
+            if not CarbonEmissionAudit.has_facility(tenant_id, facility_name):
+                return jsonify({'success': False, 'message': 'Facility not found'}), 404
+        
+        facilities = CarbonEmissionAudit.facility_trends(tenant_id, facility_name)
+        
+        return jsonify({
+            'success': True,
+            'count': len(facilities),
+            'facilities': facilities
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/carbon/<audit_id>/scenarios', methods=['POST'])
+@batchable
+@jwt_required()
+def carbon_audit_scenarios(audit_id):
+    """Evaluate what-if scenarios for a carbon audit
+    
+    Request body:
+    {
+        "parameters": [
+            {"field": "renewable_energy_percentage", "start": 0, "stop": 100, "steps": 101},
+            {"field": "electricity_consumption", "mode": "percent_change", "values": [0, -10, -20]}
+        ]
+    }
+    """
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        data = request.get_json() or {}
+        audit = CarbonEmissionAudit.find_by_id(audit_id, tenant_id)
+        
+        if not audit:
             return jsonify({'success': False, 'message': 'Audit not found'}), 404
         
+        try:
+            scenarios = ScenarioService.sweep(
+                audit['input_data'],
+                data.get('parameters', []) if isinstance(data, dict) else None,
+                current_app.config['SCENARIO_MAX_POINTS'],
+                current_app.config['SCENARIO_MAX_DIMENSIONS']
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
         return jsonify({
             'success': True,
-            'audit': CarbonEmissionAudit.to_dict(audit)
+            'audit_id': audit_id,
+            'scenarios': scenarios
         }), 200
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
-@bp.route('/carbon/list', methods=['GET'])
+@bp.route('/carbon/uncertainty', methods=['POST'])
+@batchable
 @jwt_required()
-def list_carbon_audits():
-    """List all carbon audits for user"""
+def carbon_audit_uncertainty():
+    """Monte Carlo confidence intervals for one or more carbon audits
+    
+    Request body:
+    {
+        "audit_ids": ["..."],
+        "samples": 100000,
+        "seed": 42,
+        "confidence": 0.95,
+        "inputs": {"electricity_consumption": {"distribution": "normal", "sd_percent": 5}},
+        "factors": {"electricity": {"distribution": "triangular", "low": 0.7, "high": 0.9}}
+    }
+    
+    With several audits the intervals are for the portfolio total.
+    """
     try:
-        user_id = get_jwt_identity()
-        audits = CarbonEmissionAudit.find_by_user(user_id)
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        data = request.get_json() or {}
+        config = current_app.config
+        
+        audit_ids = data.get('audit_ids', [])
+        try:
+            samples = int(data.get('samples', 10000))
+            seed = data.get('seed')
+            seed = None if seed is None else int(seed)
+            confidence = float(data.get('confidence', 0.95))
+        except (TypeError, ValueError, OverflowError):
+            return jsonify({'success': False, 'message': 'samples, seed and confidence must be numbers'}), 400
+        if not audit_ids:
+            return jsonify({'success': False, 'message': 'audit_ids is required'}), 400
+        if not isinstance(audit_ids, list) or not all(
+            isinstance(audit_id, str) and ObjectId.is_valid(audit_id) for audit_id in audit_ids
+        ):
+            return jsonify({'success': False, 'message': 'audit_ids must be a list of audit IDs'}), 400
+        if len(audit_ids) > config['UNCERTAINTY_MAX_AUDITS']:
+            return jsonify({
+                'success': False,
+                'message': f"At most {config['UNCERTAINTY_MAX_AUDITS']} audits per run"
+            }), 400
+        if samples > config['UNCERTAINTY_MAX_SAMPLES']:
+            return jsonify({
+                'success': False,
+                'message': f"At most {config['UNCERTAINTY_MAX_SAMPLES']} samples per run"
+            }), 400
+        
+        audits = CarbonEmissionAudit.find_by_ids(audit_ids, tenant_id)
+        if len(audits) != len(set(audit_ids)):
+            return jsonify({'success': False, 'message': 'Audit not found'}), 404
+        
+        try:
+            results = UncertaintyService.simulate(
+                [audit['input_data'] for audit in audits],
+                data.get('inputs', {}),
+                data.get('factors', {}),
+                samples,
+                seed=seed,
+                confidence=confidence,
+                chunk_size=config['UNCERTAINTY_CHUNK_SIZE'],
+                chunk_cells=config['UNCERTAINTY_CHUNK_CELLS'],
+                max_workers=config['UNCERTAINTY_WORKERS']
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'count': len(audits),
-            'audits': [CarbonEmissionAudit.to_dict(a) for a in audits]
+            'audit_ids': [audit['_id'] for audit in audits],
+            'samples': samples,
+            'uncertainty': results
         }), 200
     
     except Exception as e:
@@ -80,42 +349,56 @@ def list_carbon_audits():
 
 
 @bp.route('/carbon/<audit_id>', methods=['PUT'])
+@batchable
 @jwt_required()
 def update_carbon_audit(audit_id):
     """Update carbon audit"""
     try:
-        user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         data = request.get_json()
         
-        success = CarbonEmissionAudit.update_audit(audit_id, user_id, data.get('audit_data', {}))
+        success, error = _conditional_update('carbon', audit_id, tenant_id, data.get('audit_data', {}))
         
         if not success:
-            return jsonify({'success': False, 'message': 'Audit not found or unauthorized'}), 404
+            return error
         
-        audit = CarbonEmissionAudit.find_by_id(audit_id)
+        audit = CarbonEmissionAudit.find_by_id(audit_id, tenant_id)
+        RankingService.observe('carbon', audit)
+        DashboardService.invalidate(tenant_id)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'Carbon audit updated successfully',
             'audit': CarbonEmissionAudit.to_dict(audit)
-        }), 200
+        })
+        response.set_etag(audit_etag(audit))
+        return response, 200
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/carbon/<audit_id>', methods=['DELETE'])
+@batchable
 @jwt_required()
 def delete_carbon_audit(audit_id):
     """Delete carbon audit"""
     try:
-        user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         
-        success = CarbonEmissionAudit.delete_audit(audit_id, user_id)
+        success = CarbonEmissionAudit.delete_audit(audit_id, tenant_id)
         
         if not success:
             return jsonify({'success': False, 'message': 'Audit not found or unauthorized'}), 404
         
+        RankingService.discard('carbon', audit_id)
+        ReportService.purge(current_app.config['REPORT_CACHE_DIR'], 'carbon', audit_id)
+        DashboardService.invalidate(tenant_id)
+        
         return jsonify({
             'success': True,
             'message': 'Carbon audit deleted successfully'
@@ -128,11 +411,15 @@ def delete_carbon_audit(audit_id):
 # ==================== IGBC GREEN BUILDING AUDITS ====================
 
 @bp.route('/igbc/create', methods=['POST'])
+@batchable
 @jwt_required()
 def create_igbc_audit():
     """Create a new IGBC Green Building audit"""
     try:
         user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         data = request.get_json()
         
         required_fields = ['building_name', 'audit_period']
@@ -143,96 +430,107 @@ def create_igbc_audit():
             user_id,
             data['building_name'],
             data['audit_period'],
-            data.get('audit_data', {})
+            data.get('audit_data', {}),
+            tenant_id
         )
         
-        audit = IGBCGreenBuildingAudit.find_by_id(audit_id)
+        audit = IGBCGreenBuildingAudit.find_by_id(audit_id, tenant_id)
+        RankingService.observe('igbc', audit)
+        DashboardService.invalidate(tenant_id)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'IGBC audit created successfully',
             'audit': IGBCGreenBuildingAudit.to_dict(audit)
-        }), 201
+        })
+        response.set_etag(audit_etag(audit))
+        return response, 201
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/igbc/<audit_id>', methods=['GET'])
+@batchable
 @jwt_required()
 def get_igbc_audit(audit_id):
     """Get IGBC audit by ID"""
     try:
-        user_id = get_jwt_identity()
-        audit = IGBCGreenBuildingAudit.find_by_id(audit_id)
-        
-        if not audit or str(audit['user_id']) != str(user_id):
-            return jsonify({'success': False, 'message': 'Audit not found'}), 404
-        
-        return jsonify({
-            'success': True,
-            'audit': IGBCGreenBuildingAudit.to_dict(audit)
-        }), 200
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        return _get_audit_response('igbc', audit_id, tenant_id)
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/igbc/list', methods=['GET'])
+@batchable
 @jwt_required()
 def list_igbc_audits():
-    """List all IGBC audits for user"""
+    """List IGBC audits of the current tenant"""
     try:
-        user_id = get_jwt_identity()
-        audits = IGBCGreenBuildingAudit.find_by_user(user_id)
-        
-        return jsonify({
-            'success': True,
-            'count': len(audits),
-            'audits': [IGBCGreenBuildingAudit.to_dict(a) for a in audits]
-        }), 200
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        return _list_audits_response('igbc', tenant_id)
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/igbc/<audit_id>', methods=['PUT'])
+@batchable
 @jwt_required()
 def update_igbc_audit(audit_id):
     """Update IGBC audit"""
     try:
-        user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         data = request.get_json()
         
-        success = IGBCGreenBuildingAudit.update_audit(audit_id, user_id, data.get('audit_data', {}))
+        success, error = _conditional_update('igbc', audit_id, tenant_id, data.get('audit_data', {}))
         
         if not success:
-            return jsonify({'success': False, 'message': 'Audit not found or unauthorized'}), 404
+            return error
         
-        audit = IGBCGreenBuildingAudit.find_by_id(audit_id)
+        audit = IGBCGreenBuildingAudit.find_by_id(audit_id, tenant_id)
+        RankingService.observe('igbc', audit)
+        DashboardService.invalidate(tenant_id)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'IGBC audit updated successfully',
             'audit': IGBCGreenBuildingAudit.to_dict(audit)
-        }), 200
+        })
+        response.set_etag(audit_etag(audit))
+        return response, 200
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/igbc/<audit_id>', methods=['DELETE'])
+@batchable
 @jwt_required()
 def delete_igbc_audit(audit_id):
     """Delete IGBC audit"""
     try:
-        user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         
-        success = IGBCGreenBuildingAudit.delete_audit(audit_id, user_id)
+        success = IGBCGreenBuildingAudit.delete_audit(audit_id, tenant_id)
         
         if not success:
             return jsonify({'success': False, 'message': 'Audit not found or unauthorized'}), 404
         
+        RankingService.discard('igbc', audit_id)
+        ReportService.purge(current_app.config['REPORT_CACHE_DIR'], 'igbc', audit_id)
+        DashboardService.invalidate(tenant_id)
+        
         return jsonify({
             'success': True,
             'message': 'IGBC audit deleted successfully'
@@ -245,11 +543,15 @@ def delete_igbc_audit(audit_id):
 # ==================== ESG AUDITS ====================
 
 @bp.route('/esg/create', methods=['POST'])
+@batchable
 @jwt_required()
 def create_esg_audit():
     """Create a new ESG audit"""
     try:
         user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         data = request.get_json()
         
         required_fields = ['organization_name', 'audit_period']
@@ -260,96 +562,107 @@ def create_esg_audit():
             user_id,
             data['organization_name'],
             data['audit_period'],
-            data.get('audit_data', {})
+            data.get('audit_data', {}),
+            tenant_id
         )
         
-        audit = ESGAudit.find_by_id(audit_id)
+        audit = ESGAudit.find_by_id(audit_id, tenant_id)
+        RankingService.observe('esg', audit)
+        DashboardService.invalidate(tenant_id)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'ESG audit created successfully',
             'audit': ESGAudit.to_dict(audit)
-        }), 201
+        })
+        response.set_etag(audit_etag(audit))
+        return response, 201
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/esg/<audit_id>', methods=['GET'])
+@batchable
 @jwt_required()
 def get_esg_audit(audit_id):
     """Get ESG audit by ID"""
     try:
-        user_id = get_jwt_identity()
-        audit = ESGAudit.find_by_id(audit_id)
-        
-        if not audit or str(audit['user_id']) != str(user_id):
-            return jsonify({'success': False, 'message': 'Audit not found'}), 404
-        
-        return jsonify({
-            'success': True,
-            'audit': ESGAudit.to_dict(audit)
-        }), 200
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        return _get_audit_response('esg', audit_id, tenant_id)
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/esg/list', methods=['GET'])
+@batchable
 @jwt_required()
 def list_esg_audits():
-    """List all ESG audits for user"""
+    """List ESG audits of the current tenant"""
     try:
-        user_id = get_jwt_identity()
-        audits = ESGAudit.find_by_user(user_id)
-        
-        return jsonify({
-            'success': True,
-            'count': len(audits),
-            'audits': [ESGAudit.to_dict(a) for a in audits]
-        }), 200
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        return _list_audits_response('esg', tenant_id)
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/esg/<audit_id>', methods=['PUT'])
+@batchable
 @jwt_required()
 def update_esg_audit(audit_id):
     """Update ESG audit"""
     try:
-        user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         data = request.get_json()
         
-        success = ESGAudit.update_audit(audit_id, user_id, data.get('audit_data', {}))
+        success, error = _conditional_update('esg', audit_id, tenant_id, data.get('audit_data', {}))
         
         if not success:
-            return jsonify({'success': False, 'message': 'Audit not found or unauthorized'}), 404
+            return error
         
-        audit = ESGAudit.find_by_id(audit_id)
+        audit = ESGAudit.find_by_id(audit_id, tenant_id)
+        RankingService.observe('esg', audit)
+        DashboardService.invalidate(tenant_id)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'message': 'ESG audit updated successfully',
             'audit': ESGAudit.to_dict(audit)
-        }), 200
+        })
+        response.set_etag(audit_etag(audit))
+        return response, 200
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @bp.route('/esg/<audit_id>', methods=['DELETE'])
+@batchable
 @jwt_required()
 def delete_esg_audit(audit_id):
     """Delete ESG audit"""
     try:
-        user_id = get_jwt_identity()
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
         
-        success = ESGAudit.delete_audit(audit_id, user_id)
+        success = ESGAudit.delete_audit(audit_id, tenant_id)
         
         if not success:
             return jsonify({'success': False, 'message': 'Audit not found or unauthorized'}), 404
         
+        RankingService.discard('esg', audit_id)
+        ReportService.purge(current_app.config['REPORT_CACHE_DIR'], 'esg', audit_id)
+        DashboardService.invalidate(tenant_id)
+        
         return jsonify({
             'success': True,
             'message': 'ESG audit deleted successfully'
@@ -357,3 +670,181 @@ def delete_esg_audit(audit_id):
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
+
+
+# ==================== ANALYTICS ====================
+
+@bp.route('/analytics/<any(carbon, igbc, esg):audit_type>/<audit_id>/percentile', methods=['GET'])
+@batchable
+@jwt_required()
+def get_audit_percentile(audit_type, audit_id):
+    """Get percentile rank of an audit against all audits of its type"""
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        audit = AUDIT_MODELS[audit_type].find_by_id(audit_id, tenant_id)
+        
+        if not audit:
+            return jsonify({'success': False, 'message': 'Audit not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'audit_type': audit_type,
+            'rankings': RankingService.percentile(audit_type, audit)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/analytics/<any(carbon, igbc, esg):audit_type>/leaderboard', methods=['GET'])
+@batchable
+@jwt_required()
+def get_audit_leaderboard(audit_type):
+    """Get top-k audits of a type, optionally within an industry or region
+    
+    Query parameters: k (default 10), industry, region
+    """
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        k = min(request.args.get('k', 10, type=int), current_app.config['LEADERBOARD_MAX_K'])
+        
+        segment = ALL_SEGMENT
+        for field in ('industry', 'region'):
+            if request.args.get(field):
+                segment = f"{field}:{request.args[field].strip().lower()}"
+        
+        entries, total = RankingService.leaderboard(audit_type, tenant_id, max(k, 0), segment)
+        
+        return jsonify({
+            'success': True,
+            'audit_type': audit_type,
+            'segment': segment,
+            'total': total,
+            'leaderboard': entries
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+# ==================== FEED ====================
+
+@bp.route('/feed', methods=['GET'])
+@batchable
+@jwt_required()
+def get_audit_feed():
+    """Get the current tenant's audits of all types, newest first
+    
+    Query parameters: limit (default 20), cursor (next_cursor of the
+    previous page), types (comma separated subset of carbon, igbc, esg)
+    """
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        limit = request.args.get('limit', current_app.config['FEED_DEFAULT_LIMIT'], type=int)
+        limit = min(max(limit, 1), current_app.config['FEED_MAX_LIMIT'])
+        
+        audit_types = None
+        if request.args.get('types'):
+            audit_types = [t.strip().lower() for t in request.args['types'].split(',') if t.strip()]
+            unknown = [t for t in audit_types if t not in AUDIT_MODELS]
+            if unknown:
+                return jsonify({'success': False, 'message': f"Unknown audit type: {unknown[0]}"}), 400
+            audit_types = list(dict.fromkeys(audit_types))
+        
+        try:
+            items, next_cursor = FeedService.get_feed(
+                tenant_id, limit, request.args.get('cursor'), audit_types
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'count': len(items),
+            'items': items,
+            'next_cursor': next_cursor
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@bp.route('/dashboard', methods=['GET'])
+@batchable
+@jwt_required()
+def get_audit_dashboard():
+    """Get counts, latest audits and rating distributions of all audit types"""
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        summary = DashboardService.get_summary(tenant_id)
+        
+        return jsonify({
+            'success': True,
+            'summary': summary
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+# ==================== REPORTS ====================
+
+@bp.route('/<any(carbon, igbc, esg):audit_type>/<audit_id>/report', methods=['GET'])
+@jwt_required()
+@read_preference(SECONDARY_PREFERRED)
+def get_audit_report(audit_type, audit_id):
+    """Download a rendered audit report
+    
+    Query parameters: format (html or pdf, default html)
+    """
+    try:
+        tenant_id = _current_tenant()
+        if tenant_id is None:
+            return _not_a_member()
+        fmt = request.args.get('format', 'html').lower()
+        
+        if fmt not in REPORT_FORMATS:
+            return jsonify({'success': False, 'message': 'Unsupported report format'}), 400
+        if not ReportService.is_supported(fmt):
+            return jsonify({'success': False, 'message': f'{fmt.upper()} reports are not available'}), 501
+        
+        model = AUDIT_MODELS[audit_type]
+        audit = model.find_by_id(audit_id, tenant_id)
+        
+        if not audit:
+            return jsonify({'success': False, 'message': 'Audit not found'}), 404
+        
+        try:
+            path = ReportService.get_report(
+                audit_type,
+                audit,
+                model.to_dict,
+                fmt,
+                current_app.config['REPORT_CACHE_DIR'],
+                max_workers=current_app.config['REPORT_WORKERS'],
+                timeout=current_app.config['REPORT_RENDER_TIMEOUT'],
+                stale_seconds=current_app.config['REPORT_STALE_SECONDS']
+            )
+        except RenderTimeoutError:
+            response = jsonify({'success': False, 'message': 'Report is still rendering, try again shortly'})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        
+        return send_file(
+            path,
+            mimetype='application/pdf' if fmt == 'pdf' else 'text/html',
+            as_attachment=request.args.get('download') == '1',
+            download_name=f'{audit_type}-audit-{audit_id}.{fmt}',
+            conditional=True
+        )
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
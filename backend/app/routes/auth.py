@@ -1,10 +1,11 @@
 """Authentication routes."""
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app.services.auth_service import AuthService
+from app.services.health_service import HealthService
 from app.models.user import User
-from app.db.mongo import MongoDB
+from app.routes.batch import batchable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,7 +44,7 @@ def register():
             return jsonify(result), 400
             
     except Exception as e:
-        logger.error(f"Registration error: {str(e)}")
+        logger.error("Registration error: %s", e)
         return jsonify({"success": False, "message": "Registration failed"}), 500
 
 
@@ -76,7 +77,7 @@ def verify_email():
             return jsonify(result), 400
             
     except Exception as e:
-        logger.error(f"Email verification error: {str(e)}")
+        logger.error("Email verification error: %s", e)
         return jsonify({"success": False, "message": "Email verification failed"}), 500
 
 
@@ -142,7 +143,7 @@ def login():
         }), 200
         
     except Exception as e:
-        logger.error(f"Login error: {str(e)}")
+        logger.error("Login error: %s", e)
         return jsonify({"success": False, "message": "Login failed"}), 500
 
 
@@ -173,7 +174,7 @@ def request_password_reset():
         return jsonify(result), 200
         
     except Exception as e:
-        logger.error(f"Password reset request error: {str(e)}")
+        logger.error("Password reset request error: %s", e)
         return jsonify({"success": False, "message": "Request failed"}), 500
 
 
@@ -210,11 +211,12 @@ def reset_password():
             return jsonify(result), 400
         
     except Exception as e:
-        logger.error(f"Password reset error: {str(e)}")
+        logger.error("Password reset error: %s", e)
         return jsonify({"success": False, "message": "Password reset failed"}), 500
 
 
 @bp.route('/me', methods=['GET'])
+@batchable
 @jwt_required()
 def get_current_user():
     """Get current user info (requires JWT token)."""
@@ -231,27 +233,28 @@ def get_current_user():
         }), 200
         
     except Exception as e:
-        logger.error(f"Get current user error: {str(e)}")
+        logger.error("Get current user error: %s", e)
         return jsonify({"success": False, "message": "Failed to get user info"}), 500
 
 
 @bp.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
-    try:
-        # Test MongoDB connection
-        MongoDB.get_db().command('ping')
+    """Health check endpoint, answered from the background health prober."""
+    HealthService.ensure_started(current_app._get_current_object())
+    checks = HealthService.snapshot(current_app.config['HEALTH_STALE_SECONDS'])
+    if HealthService.is_ready(checks):
         return jsonify({
             "status": "healthy",
-            "service": "auth-service"
-        }), 200
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return jsonify({
-            "status": "unhealthy",
             "service": "auth-service",
-            "error": str(e)
-        }), 503
+            "checks": checks
+        }), 200
+    mongo = checks.get('mongo', {})
+    return jsonify({
+        "status": "unhealthy",
+        "service": "auth-service",
+        "error": mongo.get('error', f"database {mongo.get('status', 'pending')}"),
+        "checks": checks
+    }), 503
 
 
 @bp.route('/2fa/setup', methods=['POST'])
@@ -282,7 +285,7 @@ def setup_2fa():
         }), 200
         
     except Exception as e:
-        logger.error(f"2FA setup error: {str(e)}")
+        logger.error("2FA setup error: %s", e)
         return jsonify({"success": False, "message": "2FA setup failed"}), 500
 
 
@@ -325,7 +328,7 @@ def verify_2fa_setup():
         }), 200
         
     except Exception as e:
-        logger.error(f"2FA verification error: {str(e)}")
+        logger.error("2FA verification error: %s", e)
         return jsonify({"success": False, "message": "2FA verification failed"}), 500
 
 
@@ -375,7 +378,7 @@ def verify_2fa_code():
                 return jsonify({"success": False, "message": "Invalid 2FA code"}), 400
         
     except Exception as e:
-        logger.error(f"2FA code verification error: {str(e)}")
+        logger.error("2FA code verification error: %s", e)
         return jsonify({"success": False, "message": "2FA verification failed"}), 500
 
 
@@ -397,5 +400,55 @@ def disable_2fa():
         }), 200
         
     except Exception as e:
-        logger.error(f"2FA disable error: {str(e)}")
+        logger.error("2FA disable error: %s", e)
         return jsonify({"success": False, "message": "2FA disable failed"}), 500
+
+
+@bp.route('/2fa/backup-codes', methods=['GET'])
+@jwt_required()
+def get_backup_codes_status():
+    """Get the number of unused backup codes."""
+    try:
+        from app.models.two_factor_auth import TwoFactorAuth
+        
+        user_id = get_jwt_identity()
+        remaining = TwoFactorAuth.count_backup_codes(user_id)
+        
+        if remaining is None:
+            return jsonify({"success": False, "message": "2FA is not enabled"}), 400
+        
+        return jsonify({
+            "success": True,
+            "remaining": remaining
+        }), 200
+        
+    except Exception as e:
+        logger.error("Backup code status error: %s", e)
+        return jsonify({"success": False, "message": "Failed to get backup codes"}), 500
+
+
+@bp.route('/2fa/backup-codes/regenerate', methods=['POST'])
+@jwt_required()
+def regenerate_backup_codes():
+    """Replace all backup codes with new ones.
+    
+    The new codes are only shown once; previous codes stop working.
+    """
+    try:
+        from app.models.two_factor_auth import TwoFactorAuth
+        
+        user_id = get_jwt_identity()
+        backup_codes = TwoFactorAuth.regenerate_backup_codes(user_id)
+        
+        if backup_codes is None:
+            return jsonify({"success": False, "message": "2FA is not enabled"}), 400
+        
+        return jsonify({
+            "success": True,
+            "backup_codes": backup_codes,
+            "message": "Backup codes regenerated. Store them securely."
+        }), 200
+        
+    except Exception as e:
+        logger.error("Backup code regeneration error: %s", e)
+        return jsonify({"success": False, "message": "Backup code regeneration failed"}), 500
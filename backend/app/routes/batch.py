@@ -0,0 +1,165 @@
+"""Batched dispatch of several API calls in one request.
+
+Only views marked @batchable can be batched. Each sub-request goes
+through the full request cycle in its own app and request context, with
+the batch request's Authorization header, so it is authenticated, hooked
+(metrics, profiling, error mapping, deferred work) and answered exactly
+like the same call made on its own. The JWT is thus verified once for
+the batch and again by each sub-request's view; that is intended, as
+views differ in what they require of it (e.g. fresh tokens), and the
+check costs an HMAC, not a round trip. Consecutive GET sub-requests are
+independent and run concurrently; any other method runs on its own, in
+order, so writes are seen by the sub-requests after them.
+"""
+
+import logging
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from werkzeug.test import EnvironBuilder
+from app.services.tenant_service import TENANT_HEADER
+from app.utils.concurrency import run_concurrently
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('batch', __name__, url_prefix='/api')
+
+CONCURRENT_METHODS = ('GET', 'HEAD')
+
+# Sub-request headers passed through to the dispatched view
+FORWARDED_HEADERS = ('If-Match', 'If-None-Match', TENANT_HEADER)
+
+# Batch request headers that sub-requests inherit unless they set their own
+INHERITED_HEADERS = ('Authorization', TENANT_HEADER)
+
+
+def batchable(view):
+    """Allow a view to be dispatched from POST /api/batch.
+
+    Place it directly under @bp.route, so it marks the registered view.
+    """
+    view.batchable = True
+    return view
+
+
+def _error(sub_id, status, message):
+    """Result of a sub-request that could not be dispatched."""
+    return {'id': sub_id, 'status': status, 'body': {'success': False, 'message': message}}
+
+
+def _environ(base_url, remote_addr, path, method, body, headers):
+    """WSGI environ of a sub-request."""
+    builder = EnvironBuilder(
+        path=path,
+        method=method,
+        json=body,
+        headers=headers,
+        base_url=base_url,
+        environ_base={'REMOTE_ADDR': remote_addr}
+    )
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _dispatch(app, base_url, remote_addr, sub_request, inherited_headers):
+    """Run one sub-request through the full request cycle.
+
+    Args:
+        app: Flask application
+        base_url: Host URL of the batch request
+        remote_addr: Client address of the batch request
+        sub_request: {'id', 'method', 'path', 'body', 'headers'}
+        inherited_headers: INHERITED_HEADERS set on the batch request
+
+    Returns:
+        {'id', 'status', 'body'} plus 'etag' when the view set one
+    """
+    sub_id = sub_request.get('id')
+    method = str(sub_request.get('method', 'GET')).upper()
+    path = sub_request.get('path')
+    if not isinstance(path, str) or not path.startswith('/api/'):
+        return _error(sub_id, 400, 'Invalid path')
+
+    headers = {'Accept': 'application/json', **inherited_headers}
+    for name in FORWARDED_HEADERS:
+        value = (sub_request.get('headers') or {}).get(name)
+        if value:
+            headers[name] = value
+
+    environ = _environ(base_url, remote_addr, path, method, sub_request.get('body'), headers)
+    # A fresh app context gives the sub-request its own g
+    with app.app_context(), app.request_context(environ):
+        if request.routing_exception is not None:
+            return _error(sub_id, request.routing_exception.code, request.routing_exception.description)
+        if not getattr(app.view_functions[request.url_rule.endpoint], 'batchable', False):
+            return _error(sub_id, 400, 'Endpoint cannot be batched')
+
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            logger.error("Batch sub-request %s %s failed: %s", method, path, e)
+            return _error(sub_id, 500, 'Internal server error')
+
+        result = {
+            'id': sub_id,
+            'status': response.status_code,
+            'body': response.get_json(silent=True)
+        }
+        etag = response.get_etag()[0]
+        if etag:
+            result['etag'] = etag
+        # Runs the sub-request's deferred work
+        response.close()
+        return result
+
+
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch():
+    """Dispatch several API calls in one request
+
+    Request body: {"requests": [{"id", "method", "path", "body", "headers"}]}
+    Results are returned in request order. The JWT checked here is
+    verified again by every sub-request's view (see the module docstring).
+    """
+    try:
+        data = request.get_json() or {}
+        sub_requests = data.get('requests')
+
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return jsonify({'success': False, 'message': 'requests must be a non-empty list'}), 400
+        if len(sub_requests) > current_app.config['BATCH_MAX_REQUESTS']:
+            return jsonify({'success': False, 'message': 'Too many requests in batch'}), 400
+        if not all(isinstance(sub_request, dict) for sub_request in sub_requests):
+            return jsonify({'success': False, 'message': 'Each request must be an object'}), 400
+
+        app = current_app._get_current_object()
+        base_url = request.host_url
+        remote_addr = request.remote_addr
+        inherited_headers = {name: request.headers[name] for name in INHERITED_HEADERS if name in request.headers}
+
+        # Group consecutive GETs into concurrent runs; other methods run alone
+        runs = []
+        for sub_request in sub_requests:
+            concurrent = str(sub_request.get('method', 'GET')).upper() in CONCURRENT_METHODS
+            if concurrent and runs and runs[-1][0]:
+                runs[-1][1].append(sub_request)
+            else:
+                runs.append((concurrent, [sub_request]))
+
+        # A separate pool: views may themselves wait on the shared I/O pool
+        results = []
+        for _, run in runs:
+            results.extend(run_concurrently([
+                (lambda sub_request=sub_request: _dispatch(app, base_url, remote_addr, sub_request, inherited_headers))
+                for sub_request in run
+            ], pool='batch'))
+
+        return jsonify({
+            'success': True,
+            'responses': results
+        }), 200
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
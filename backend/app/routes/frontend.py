@@ -0,0 +1,56 @@
+"""Serving of the built frontend assets."""
+
+import mimetypes
+import os
+from flask import Blueprint, abort, current_app, request, send_file
+from werkzeug.routing import PathConverter
+from werkzeug.security import safe_join
+from app.utils.assets import is_fingerprinted, precompressed_variant
+
+bp = Blueprint('frontend', __name__)
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class AssetPathConverter(PathConverter):
+    """Path outside /api, so unknown API calls get 404 rather than 405."""
+
+    regex = r'(?!api(?:/|$))[^/].*?'
+
+
+# Registered before the routes below, which are deferred in order
+bp.record_once(lambda state: state.app.url_map.converters.setdefault('asset', AssetPathConverter))
+
+
+@bp.route('/', methods=['GET'])
+@bp.route('/<asset:filename>', methods=['GET'])
+def serve_asset(filename='index.html'):
+    """Serve a built frontend asset
+
+    Fingerprinted JS/CSS is cached as immutable for a year; HTML pages are
+    revalidated on every visit so they pick up new fingerprints. A
+    precompressed variant is served when the client accepts one, and
+    files are sent with send_file so the WSGI server can use sendfile.
+    """
+    path = safe_join(current_app.config['ASSETS_DIR'], filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    immutable = is_fingerprinted(filename)
+    served_path, encoding = precompressed_variant(path, request.accept_encodings)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    # Without max_age, send_file marks the response no-cache
+    response = send_file(
+        served_path,
+        mimetype=mimetype,
+        conditional=True,
+        max_age=IMMUTABLE_MAX_AGE if immutable else None
+    )
+
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    if immutable:
+        response.cache_control.immutable = True
+    return response
@@ -0,0 +1,40 @@
+"""Liveness and readiness endpoints, answered from the health prober."""
+
+from flask import Blueprint, current_app, jsonify
+from app.services.health_service import HealthService
+
+bp = Blueprint('health', __name__)
+
+
+def _stale_after():
+    return current_app.config['HEALTH_STALE_SECONDS']
+
+
+@bp.route('/livez', methods=['GET'])
+def livez():
+    """Whether the process is alive, i.e. its prober is still cycling.
+
+    Never depends on the dependencies being up, so an orchestrator does
+    not restart workers during a database outage.
+    """
+    HealthService.ensure_started(current_app._get_current_object())
+    alive = HealthService.is_alive(_stale_after())
+    return jsonify({
+        "status": "alive" if alive else "stalled",
+        "uptime_seconds": HealthService.uptime(),
+        "checks": HealthService.snapshot(_stale_after())
+    }), 200 if alive else 503
+
+
+@bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Whether the critical dependencies are up, with each check's latency."""
+    HealthService.ensure_started(current_app._get_current_object())
+    checks = HealthService.snapshot(_stale_after())
+    if not checks:
+        return jsonify({"status": "starting", "checks": checks}), 503
+    ready = HealthService.is_ready(checks)
+    return jsonify({
+        "status": "ready" if ready else "unavailable",
+        "checks": checks
+    }), 200 if ready else 503
@@ -0,0 +1,25 @@
+"""Metrics endpoint, scraped by Prometheus."""
+
+import hmac
+from flask import Blueprint, current_app, request
+from app.utils.metrics import render
+
+bp = Blueprint('metrics', __name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """All metrics in the Prometheus text format.
+
+    When METRICS_TOKEN is set, scrapers must send it as a bearer token.
+    With METRICS_REQUIRE_TOKEN (the default outside development), metrics
+    are not served until it is set.
+    """
+    token = current_app.config['METRICS_TOKEN']
+    if not token and current_app.config['METRICS_REQUIRE_TOKEN']:
+        return current_app.response_class('Set METRICS_TOKEN to enable metrics\n', status=403, mimetype='text/plain')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return current_app.response_class('Unauthorized\n', status=401, mimetype='text/plain')
+    return current_app.response_class(render(), mimetype=CONTENT_TYPE)
@@ -0,0 +1,145 @@
+"""Organization routes.
+
+Audits are shared by the members of an organization; requests act on an
+organization by sending its id in the X-Tenant-ID header.
+"""
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.tenant_service import TenantService
+from app.routes.batch import batchable
+import logging
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('organizations', __name__, url_prefix='/api/organizations')
+
+
+@bp.route('', methods=['GET'])
+@batchable
+@jwt_required()
+def list_organizations():
+    """List the tenants the user can act on, personal tenant first."""
+    try:
+        user_id = get_jwt_identity()
+        roles = {
+            str(membership["tenant_id"]): membership["role"]
+            for membership in Organization.find_memberships_by_user(user_id)
+        }
+        organizations = Organization.find_by_ids(roles) if roles else []
+
+        return jsonify({
+            "success": True,
+            "organizations": [
+                {"id": user_id, "name": "Personal", "role": "owner", "personal": True, "created_at": None},
+                *(Organization.to_dict(org, roles[str(org["_id"])]) for org in organizations)
+            ]
+        }), 200
+
+    except Exception as e:
+        logger.error("List organizations error: %s", e)
+        return jsonify({"success": False, "message": "Failed to list organizations"}), 500
+
+
+@bp.route('', methods=['POST'])
+@jwt_required()
+def create_organization():
+    """Create an organization owned by the user."""
+    try:
+        user_id = get_jwt_identity()
+        name = ((request.get_json() or {}).get("name") or "").strip()
+
+        if not name:
+            return jsonify({"success": False, "message": "Organization name is required"}), 400
+
+        tenant_id = Organization.create_organization(name, user_id)
+
+        return jsonify({
+            "success": True,
+            "organization": Organization.to_dict(Organization.find_by_id(tenant_id), "owner")
+        }), 201
+
+    except Exception as e:
+        logger.error("Create organization error: %s", e)
+        return jsonify({"success": False, "message": "Failed to create organization"}), 500
+
+
+@bp.route('/<tenant_id>/members', methods=['GET'])
+@batchable
+@jwt_required()
+def list_members(tenant_id):
+    """List the members of an organization the user belongs to."""
+    try:
+        if not TenantService.get_role(tenant_id, get_jwt_identity()):
+            return jsonify({"success": False, "message": "Organization not found"}), 404
+
+        return jsonify({
+            "success": True,
+            "members": [
+                {
+                    "user_id": str(membership["user_id"]),
+                    "role": membership["role"],
+                    "created_at": membership["created_at"]
+                }
+                for membership in Organization.find_members(tenant_id)
+            ]
+        }), 200
+
+    except Exception as e:
+        logger.error("List members error: %s", e)
+        return jsonify({"success": False, "message": "Failed to list members"}), 500
+
+
+@bp.route('/<tenant_id>/members', methods=['POST'])
+@jwt_required()
+def add_member(tenant_id):
+    """Add a registered user to an organization (owners only)."""
+    try:
+        if TenantService.get_role(tenant_id, get_jwt_identity()) != "owner" or not Organization.find_by_id(tenant_id):
+            return jsonify({"success": False, "message": "Organization not found"}), 404
+
+        data = request.get_json() or {}
+        role = data.get("role", "member")
+        if role not in Organization.ROLES:
+            return jsonify({"success": False, "message": "Invalid role"}), 400
+
+        user = User.find_by_email(str(data.get("email", "")).strip())
+        if not user:
+            return jsonify({"success": False, "message": "User not found"}), 404
+
+        if not Organization.add_member(tenant_id, user["_id"], role):
+            return jsonify({"success": False, "message": "User is already a member"}), 409
+        TenantService.invalidate(tenant_id, user["_id"])
+
+        return jsonify({"success": True, "message": "Member added"}), 201
+
+    except Exception as e:
+        logger.error("Add member error: %s", e)
+        return jsonify({"success": False, "message": "Failed to add member"}), 500
+
+
+@bp.route('/<tenant_id>/members/<member_id>', methods=['DELETE'])
+@jwt_required()
+def remove_member(tenant_id, member_id):
+    """Remove a member from an organization (owners, or members leaving)."""
+    try:
+        user_id = get_jwt_identity()
+        role = TenantService.get_role(tenant_id, user_id)
+        if role != "owner" and not (role and member_id == user_id):
+            return jsonify({"success": False, "message": "Organization not found"}), 404
+
+        try:
+            removed = Organization.remove_member(tenant_id, member_id)
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 409
+        if not removed:
+            return jsonify({"success": False, "message": "Member not found"}), 404
+        TenantService.invalidate(tenant_id, member_id)
+
+        return jsonify({"success": True, "message": "Member removed"}), 200
+
+    except Exception as e:
+        logger.error("Remove member error: %s", e)
+        return jsonify({"success": False, "message": "Failed to remove member"}), 500
@@ -21,7 +21,7 @@ def logout():
     """
     try:
         user_id = get_jwt_identity()
-        logger.info(f"User {user_id} logged out")
+        logger.info("User %s logged out", user_id)
         
         return jsonify({
             "success": True,
@@ -29,7 +29,7 @@ def logout():
         }), 200
         
     except Exception as e:
-        logger.error(f"Logout error: {str(e)}")
+        logger.error("Logout error: %s", e)
         return jsonify({"success": False, "message": "Logout failed"}), 500
 
 
@@ -46,7 +46,7 @@ def refresh_token():
         user_id = get_jwt_identity()
         new_access_token = create_access_token(identity=user_id)
         
-        logger.info(f"Token refreshed for user {user_id}")
+        logger.info("Token refreshed for user %s", user_id)
         
         return jsonify({
             "success": True,
@@ -55,5 +55,5 @@ def refresh_token():
         }), 200
         
     except Exception as e:
-        logger.error(f"Token refresh error: {str(e)}")
+        logger.error("Token refresh error: %s", e)
         return jsonify({"success": False, "message": "Token refresh failed"}), 500
@@ -3,6 +3,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.user import User
+from app.routes.batch import batchable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +12,7 @@ bp = Blueprint('user', __name__, url_prefix='/api/user')
 
 
 @bp.route('/profile', methods=['GET'])
+@batchable
 @jwt_required()
 def get_profile():
     """Get user profile."""
@@ -27,5 +29,5 @@ def get_profile():
         }), 200
         
     except Exception as e:
-        logger.error(f"Get profile error: {str(e)}")
+        logger.error("Get profile error: %s", e)
         return jsonify({"success": False, "message": "Failed to get profile"}), 500
@@ -0,0 +1 @@
+"""Scoring specifications package."""
@@ -0,0 +1,140 @@
+"""Compile declarative scoring specs into weight matrices and thresholds."""
+
+from functools import lru_cache
+import numpy as np
+from app.scoring.specs import SCORING_SPECS, CURRENT_VERSIONS
+from app.utils.metrics import histogram
+
+# Scoring takes microseconds per audit, far below the default latency buckets
+SCORING_SECONDS = histogram(
+    'scoring_duration_seconds', 'Time to score a batch of audits', ('kind',),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+)
+
+
+class CompiledSpec:
+    """Scoring spec compiled for one (version, industry) pair.
+
+    Scoring a batch is one matrix multiply of the capped inputs against
+    `weights` followed by a `searchsorted` of the rated column against
+    `thresholds`.
+    """
+
+    def __init__(self, kind, version, industry, fields, caps, outputs,
+                 weights, rating_index, thresholds, labels):
+        self.kind = kind
+        self.version = version
+        self.industry = industry
+        self.fields = fields
+        self.caps = caps
+        self.outputs = outputs
+        self.weights = weights
+        self.rating_index = rating_index
+        self.thresholds = thresholds
+        self.labels = labels
+
+    def vectorize(self, rows):
+        """Build the (n_rows, n_fields) input matrix from input dicts."""
+        return np.array(
+            [[float(row.get(field, 0)) for field in self.fields] for row in rows],
+            dtype=float
+        ).reshape(len(rows), len(self.fields))
+
+    def score_batch(self, inputs):
+        """Score a batch of audits.
+
+        Args:
+            inputs: (n_rows, n_fields) array, columns ordered as `fields`
+
+        Returns:
+            Tuple of (capped inputs, (n_rows, n_outputs) scores, ratings)
+        """
+        capped = np.minimum(inputs, self.caps)
+        scores = capped @ self.weights
+        # Rate on the reported (rounded) score so score and rating agree
+        rated = np.round(scores[:, self.rating_index], 2)
+        ratings = self.labels[np.searchsorted(self.thresholds, rated, side='right')]
+        return capped, scores, ratings
+
+
+def _merge_industry(spec, industry):
+    """Apply an industry's weight overrides on top of the base spec."""
+    groups = {name: dict(weights) for name, weights in spec['groups'].items()}
+    composite = spec.get('composite')
+    composite_weights = dict(composite['weights']) if composite else None
+
+    override = spec.get('industries', {}).get(industry)
+    if override is None:
+        return groups, composite_weights, 'default'
+
+    for name, weights in override.get('groups', {}).items():
+        groups[name] = dict(weights)
+    if composite_weights is not None and 'composite' in override:
+        composite_weights = dict(override['composite'])
+    return groups, composite_weights, industry
+
+
+@lru_cache(maxsize=None)
+def _compile(version, industry):
+    """Compile a spec version for an industry (cached)."""
+    spec = SCORING_SPECS[version]
+    groups, composite_weights, industry = _merge_industry(spec, industry)
+
+    fields = tuple(field for weights in groups.values() for field in weights)
+    group_names = tuple(groups)
+    caps_spec = spec.get('caps', {})
+    caps = np.array([caps_spec.get(field, np.inf) for field in fields], dtype=float)
+
+    # One column per group, plus the composite column if any
+    group_matrix = np.zeros((len(fields), len(group_names)))
+    for col, name in enumerate(group_names):
+        for field, weight in groups[name].items():
+            group_matrix[fields.index(field), col] = weight
+
+    outputs = group_names
+    weights = group_matrix
+    if composite_weights is not None:
+        composite_vector = np.array([composite_weights.get(name, 0) for name in group_names])
+        weights = np.column_stack([group_matrix, group_matrix @ composite_vector])
+        outputs = group_names + (spec['composite']['name'],)
+
+    ratings = spec['ratings']
+    weights.setflags(write=False)
+    caps.setflags(write=False)
+    return CompiledSpec(
+        kind=spec['kind'],
+        version=version,
+        industry=industry,
+        fields=fields,
+        caps=caps,
+        outputs=outputs,
+        weights=weights,
+        rating_index=outputs.index(ratings['score']),
+        thresholds=np.array(ratings['thresholds'], dtype=float),
+        labels=np.array(ratings['labels'], dtype=object)
+    )
+
+
+def get_spec(kind, version=None, industry=None):
+    """Get the compiled scoring spec for an audit kind.
+
+    Args:
+        kind: Audit kind ('esg' or 'igbc')
+        version: Spec version (defaults to the current version for `kind`)
+        industry: Industry key; unknown industries use the default weights
+
+    Returns:
+        CompiledSpec instance
+
+    Raises:
+        ValueError: If the version is unknown or belongs to another kind
+    """
+    version = version or CURRENT_VERSIONS[kind]
+    spec = SCORING_SPECS.get(version)
+    if spec is None or spec['kind'] != kind:
+        raise ValueError(f"Unknown {kind} scoring spec version: {version}")
+
+    industry = str(industry or 'default').strip().lower()
+    if industry not in spec.get('industries', {}):
+        industry = 'default'
+    return _compile(version, industry)
@@ -0,0 +1,96 @@
+"""Declarative scoring specifications for ESG and IGBC audits.
+
+Each spec describes, per rating-scheme version:
+- groups: named sub-scores, each a weighted sum of input fields
+- composite: optional score built as a weighted sum of the groups
+- caps: optional upper bound applied to each input before weighting
+- ratings: ascending score thresholds and the labels between them
+- industries: optional per-industry overrides of groups/composite
+  weights, e.g. {'steel': {'composite': {...}}}; only add weights taken
+  from the rating scheme itself (esg-v1 defines none)
+
+Specs are plain data; they are compiled into weight matrices and
+threshold arrays by app.scoring.compiler.
+"""
+
+ESG_V1 = {
+    'kind': 'esg',
+    'version': 'esg-v1',
+    'groups': {
+        'environmental_score': {
+            'carbon_management': 0.3,
+            'water_management': 0.3,
+            'waste_management': 0.2,
+            'renewable_energy': 0.2
+        },
+        'social_score': {
+            'employee_satisfaction': 0.3,
+            'community_impact': 0.3,
+            'health_safety': 0.2,
+            'diversity_inclusion': 0.2
+        },
+        'governance_score': {
+            'ethics_compliance': 0.35,
+            'audit_controls': 0.35,
+            'board_diversity': 0.15,
+            'transparency': 0.15
+        }
+    },
+    'composite': {
+        'name': 'esg_score',
+        'weights': {
+            'environmental_score': 1 / 3,
+            'social_score': 1 / 3,
+            'governance_score': 1 / 3
+        }
+    },
+    'ratings': {
+        'score': 'esg_score',
+        'thresholds': [50, 60, 70, 80],
+        'labels': ['NEEDS IMPROVEMENT', 'ADEQUATE', 'GOOD', 'VERY GOOD', 'EXCELLENT']
+    }
+}
+
+IGBC_V1 = {
+    'kind': 'igbc',
+    'version': 'igbc-v1',
+    'groups': {
+        'total_score': {
+            'site_selection': 1,
+            'water_conservation': 1,
+            'energy_conservation': 1,
+            'environment_protection': 1,
+            'health_wellbeing': 1,
+            'construction_practices': 1,
+            'management_operations': 1,
+            'innovation': 1
+        }
+    },
+    'caps': {
+        'site_selection': 10,
+        'water_conservation': 10,
+        'energy_conservation': 15,
+        'environment_protection': 10,
+        'health_wellbeing': 10,
+        'construction_practices': 10,
+        'management_operations': 10,
+        'innovation': 5
+    },
+    'ratings': {
+        'score': 'total_score',
+        'thresholds': [40, 55, 70, 85],
+        'labels': ['NOT RATED', 'GREEN', 'SILVER', 'GOLD', 'PLATINUM']
+    }
+}
+
+# All known specs, keyed by version
+SCORING_SPECS = {
+    spec['version']: spec
+    for spec in (ESG_V1, IGBC_V1)
+}
+
+# Version used for new and re-scored audits of each kind
+CURRENT_VERSIONS = {
+    'esg': ESG_V1['version'],
+    'igbc': IGBC_V1['version']
+}
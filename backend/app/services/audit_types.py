@@ -0,0 +1,12 @@
+"""Registry of audit types and their models."""
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.igbc_green_building_audit import IGBCGreenBuildingAudit
+from app.models.esg_audit import ESGAudit
+
+
+AUDIT_MODELS = {
+    'carbon': CarbonEmissionAudit,
+    'igbc': IGBCGreenBuildingAudit,
+    'esg': ESGAudit
+}
@@ -1,5 +1,8 @@
 """Authentication service for user management."""
 
+import logging
+from pymongo.errors import DuplicateKeyError
+from app.db.mongo import MongoDB
 from app.models.user import User
 from app.models.otp import OTP
 from app.models.email_verification import EmailVerification
@@ -8,6 +11,9 @@ from app.utils.password import hash_password, verify_password
 from app.utils.email import send_otp_email, send_verification_email
 from app.utils.otp_generator import generate_otp
 from app.utils.validators import validate_email_format, validate_password, validate_otp
+from app.utils.deferred import defer
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
@@ -34,28 +40,16 @@ class AuthService:
         if not is_valid_password:
             return {"success": False, "message": message}
         
-        # Check if user already exists
-        existing_user = User.find_by_email(email)
-        if existing_user:
-            return {"success": False, "message": "User already exists"}
-        
-        # Hash password and create user (not verified yet)
+        # Hash password and create user (not verified yet); the unique
+        # email index rejects existing users in the same round trip
         hashed_password = hash_password(password)
-        user_id = User.create_user(email, hashed_password, is_verified=False)
-        
-        # Generate email verification token
-        verification_token = EmailVerification.create_verification(email)
+        try:
+            user_id = User.create_user(email, hashed_password, is_verified=False)
+        except DuplicateKeyError:
+            return {"success": False, "message": "User already exists"}
         
-        # Send verification email
-        email_sent = send_verification_email(email, verification_token)
-        
-        if not email_sent:
-            return {
-                "success": True,
-                "message": "User registered. Please check your email to verify (email system may be down)",
-                "user_id": user_id,
-                "email": email
-            }
+        # Write the verification token and send the email after responding
+        defer(AuthService.send_verification, email)
         
         return {
             "success": True,
@@ -64,6 +58,22 @@ class AuthService:
             "email": email
         }
     
+    @staticmethod
+    def send_verification(email: str) -> bool:
+        """Create an email verification token and email it to the user.
+        
+        Args:
+            email: User email
+            
+        Returns:
+            True if the email was sent
+        """
+        verification_token = EmailVerification.create_verification(email)
+        email_sent = send_verification_email(email, verification_token)
+        if not email_sent:
+            logger.warning("Verification email to %s could not be sent", email)
+        return email_sent
+    
     @staticmethod
     def verify_email(token: str) -> dict:
         """Verify user email with token.
@@ -74,20 +84,18 @@ class AuthService:
         Returns:
             Result dictionary with status
         """
-        # Find verification record
-        verification = EmailVerification.find_by_token(token)
-        if not verification:
-            return {"success": False, "message": "Invalid or expired verification token"}
-        
-        email = verification.get("email")
-        user = User.find_by_email(email)
-        
-        if not user:
-            return {"success": False, "message": "User not found"}
-        
-        # Mark email as verified
-        User.mark_verified(str(user["_id"]))
-        EmailVerification.mark_verified(token)
+        # Consume the token and verify the user together (in a
+        # transaction on replica sets)
+        with MongoDB.transaction() as session:
+            verification = EmailVerification.consume_token(token, session=session)
+            if not verification:
+                return {"success": False, "message": "Invalid or expired verification token"}
+            
+            if not User.mark_verified_by_email(verification["email"], session=session):
+                # Keep the token usable: leaving the block would commit
+                if session is not None:
+                    session.abort_transaction()
+                return {"success": False, "message": "User not found"}
         
         return {"success": True, "message": "Email verified successfully"}
     
@@ -183,8 +191,8 @@ class AuthService:
         if not is_valid_password:
             return {"success": False, "message": message}
         
-        # Find and verify OTP
-        otp_record = OTP.find_valid_otp(email, otp)
+        # Verify and consume OTP in a single atomic update
+        otp_record = OTP.consume_otp(email, otp)
         if not otp_record:
             return {"success": False, "message": "Invalid or expired OTP"}
         
@@ -198,8 +206,6 @@ class AuthService:
         success = User.update_password(str(user["_id"]), hashed_password)
         
         if success:
-            # Mark OTP as used
-            OTP.mark_as_used(str(otp_record["_id"]))
             return {
                 "success": True,
                 "message": "Password reset successfully"
@@ -0,0 +1,101 @@
+"""Dashboard summary of a tenant's audits across all audit types.
+
+Each collection is summarized by a single `$facet` aggregation and the
+three run concurrently. Summaries are cached per tenant for
+DASHBOARD_CACHE_SECONDS (for at most MAX_CACHED_TENANTS tenants, least
+recently used first out) and invalidated on audit writes in this
+process; the TTL bounds how stale a summary can be after writes made by
+other workers.
+"""
+
+import threading
+from flask import current_app
+from app.services.audit_types import AUDIT_MODELS
+from app.services.feed_service import FeedService
+from app.utils.concurrency import run_concurrently
+from app.utils.ttl_cache import TTLCache
+
+
+class DashboardService:
+    """Service for per-tenant dashboard summaries."""
+
+    MAX_CACHED_TENANTS = 10000
+
+    _lock = threading.Lock()
+    _cache = TTLCache(MAX_CACHED_TENANTS)
+    # Tenant -> token of the summary being computed; only that one is cached
+    _computing = {}
+
+    @staticmethod
+    def _summarize_type(audit_type, facets):
+        """Shape one collection's facet document."""
+        totals = dict(facets['totals'][0]) if facets['totals'] else {'count': 0}
+        totals.pop('_id', None)
+        for key, value in totals.items():
+            if isinstance(value, float):
+                totals[key] = round(value, 2)
+
+        summary = {
+            **totals,
+            'latest': FeedService._to_item(audit_type, facets['latest'][0]) if facets['latest'] else None
+        }
+        if 'ratings' in facets:
+            summary['ratings'] = {
+                entry['_id']: entry['count']
+                for entry in facets['ratings']
+                if entry['_id'] is not None
+            }
+        return summary
+
+    @classmethod
+    def get_summary(cls, tenant_id):
+        """Get the tenant's dashboard summary, from cache when fresh.
+
+        Returns:
+            Dictionary with 'total' and a summary per audit type
+        """
+        tenant_id = str(tenant_id)
+        cached = cls._cache.get(tenant_id)
+        if cached is not None:
+            return cached
+        token = object()
+        with cls._lock:
+            cls._computing[tenant_id] = token
+
+        summary = None
+        try:
+            summary = cls._compute(tenant_id)
+        finally:
+            with cls._lock:
+                # Cache unless an audit write (or a newer computation)
+                # raced with this one
+                if cls._computing.get(tenant_id) is token:
+                    del cls._computing[tenant_id]
+                    if summary is not None:
+                        cls._cache.set(tenant_id, summary, current_app.config['DASHBOARD_CACHE_SECONDS'])
+        return summary
+
+    @classmethod
+    def _compute(cls, tenant_id):
+        """Summarize the tenant's audits of every type concurrently."""
+        audit_types = list(AUDIT_MODELS)
+        results = run_concurrently([
+            (lambda model=AUDIT_MODELS[audit_type]: model.summarize_by_tenant(tenant_id))
+            for audit_type in audit_types
+        ])
+        by_type = {
+            audit_type: cls._summarize_type(audit_type, facets)
+            for audit_type, facets in zip(audit_types, results)
+        }
+        return {
+            'total': sum(entry['count'] for entry in by_type.values()),
+            **by_type
+        }
+
+    @classmethod
+    def invalidate(cls, tenant_id):
+        """Drop a tenant's cached summary after one of its audits changes."""
+        tenant_id = str(tenant_id)
+        with cls._lock:
+            cls._cache.pop(tenant_id)
+            cls._computing.pop(tenant_id, None)
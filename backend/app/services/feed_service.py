@@ -0,0 +1,96 @@
+"""Unified, paginated feed of a tenant's audits across all audit types."""
+
+from datetime import timedelta
+from heapq import merge
+from itertools import islice
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.services.audit_types import AUDIT_MODELS
+from app.utils.concurrency import run_concurrently
+from app.utils.etags import EPOCH
+
+
+# Audit type -> (name field, summary fields)
+FEED_FIELDS = {
+    'carbon': ('facility_name', ('total_carbon_footprint',)),
+    'igbc': ('building_name', ('total_score', 'rating')),
+    'esg': ('organization_name', ('esg_score', 'esg_rating'))
+}
+
+
+def encode_cursor(audit):
+    """Opaque keyset cursor pointing just after `audit`."""
+    millis = (audit['created_at'] - EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}_{audit['_id']}"
+
+
+def decode_cursor(cursor):
+    """Parse a feed cursor into (created_at, ObjectId).
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        millis, audit_id = cursor.split('_', 1)
+        return EPOCH + timedelta(milliseconds=int(millis)), ObjectId(audit_id)
+    except (ValueError, OverflowError, InvalidId):
+        # OverflowError: a timestamp beyond the datetime range
+        raise ValueError('Invalid cursor')
+
+
+class FeedService:
+    """Service for the cross-type audit feed."""
+
+    @staticmethod
+    def _to_item(audit_type, audit):
+        """Project an audit document into a feed item."""
+        name_field, summary_fields = FEED_FIELDS[audit_type]
+        return {
+            'type': audit_type,
+            'id': audit['_id'],
+            'name': audit[name_field],
+            'audit_period': audit['audit_period'],
+            'status': audit['status'],
+            'created_at': audit['created_at'],
+            'updated_at': audit['updated_at'],
+            'summary': {field: audit.get(field) for field in summary_fields}
+        }
+
+    @staticmethod
+    def get_feed(tenant_id, limit, cursor=None, audit_types=None):
+        """Get one page of the tenant's audits of all types, newest first.
+
+        Queries the collections concurrently, each for at most `limit`
+        audits, and k-way merges the sorted results by (created_at, _id).
+
+        Args:
+            tenant_id: Tenant ID
+            limit: Page size
+            cursor: Cursor from a previous page's `next_cursor`
+            audit_types: Optional subset of audit types
+
+        Returns:
+            Tuple of (items, next_cursor); next_cursor is None on the last page
+        """
+        before = decode_cursor(cursor) if cursor else None
+        audit_types = audit_types or list(AUDIT_MODELS)
+
+        # Fetch one extra audit to know whether another page exists
+        pages = run_concurrently([
+            (lambda model=AUDIT_MODELS[audit_type]:
+                model.find_page_by_tenant(tenant_id, limit + 1, before))
+            for audit_type in audit_types
+        ])
+
+        streams = [
+            [(audit_type, audit) for audit in page]
+            for audit_type, page in zip(audit_types, pages)
+        ]
+        merged = list(islice(
+            merge(*streams, key=lambda entry: (entry[1]['created_at'], entry[1]['_id']), reverse=True),
+            limit + 1
+        ))
+
+        next_cursor = encode_cursor(merged[limit - 1][1]) if len(merged) > limit else None
+        items = [FeedService._to_item(audit_type, audit) for audit_type, audit in merged[:limit]]
+        return items, next_cursor
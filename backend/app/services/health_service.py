@@ -0,0 +1,174 @@
+"""Background health probes of the app's dependencies.
+
+A daemon thread per worker process checks MongoDB, the SMTP server and
+the database indexes every HEALTH_PROBE_SECONDS and keeps the latest
+result of each in memory, so health endpoints answer without touching
+any dependency. Index reconciliation lists the indexes of every
+collection and recreates them only when one has gone missing (e.g. a
+collection was dropped or restored from a dump without them).
+"""
+
+import logging
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timezone
+from app.db.mongo import MongoDB
+from app.db.indexes import create_all_indexes, index_keys, missing_indexes
+from app.utils.concurrency import run_concurrently
+
+logger = logging.getLogger(__name__)
+
+UP = 'up'
+DOWN = 'down'
+STALE = 'stale'
+DISABLED = 'disabled'
+PENDING = 'pending'
+
+# Dependencies without which the app cannot serve requests
+CRITICAL = ('mongo',)
+
+
+def _check_mongo():
+    MongoDB.get_db().command('ping')
+
+
+def _check_smtp(config):
+    if not config['SMTP_EMAIL']:
+        return DISABLED, None
+    timeout = config['HEALTH_PROBE_TIMEOUT_SECONDS']
+    with smtplib.SMTP(config['SMTP_SERVER'], config['SMTP_PORT'], timeout=timeout) as server:
+        server.noop()
+    return UP, None
+
+
+class HealthService:
+    """Service holding the latest health of every dependency."""
+
+    _lock = threading.Lock()
+    _pid = None
+    _started_at = None
+    _last_cycle = None
+    _results = {}
+    _expected_indexes = None
+
+    @classmethod
+    def ensure_started(cls, app):
+        """Start the prober of this process unless it is running.
+
+        Checked per process id, so a worker forked from a parent that
+        already started one starts its own.
+        """
+        if cls._pid == os.getpid():
+            return
+        with cls._lock:
+            if cls._pid == os.getpid():
+                return
+            cls._pid = os.getpid()
+            cls._started_at = time.monotonic()
+            cls._last_cycle = None
+            cls._results = {}
+            cls._expected_indexes = None
+        threading.Thread(target=cls._probe_loop, args=(app,), name='health-prober', daemon=True).start()
+
+    @classmethod
+    def _probe_loop(cls, app):
+        """Run every check each HEALTH_PROBE_SECONDS, forever."""
+        with app.app_context():
+            interval = app.config['HEALTH_PROBE_SECONDS']
+            while True:
+                try:
+                    cls.probe(app.config)
+                except Exception as e:
+                    logger.error("Health probe failed: %s", e)
+                time.sleep(interval)
+
+    @classmethod
+    def probe(cls, config):
+        """Run all checks concurrently and store their results."""
+        checks = {
+            'mongo': _check_mongo,
+            'smtp': lambda: _check_smtp(config),
+            'indexes': cls._reconcile_indexes
+        }
+        results = run_concurrently([
+            (lambda check=check: cls._timed(check)) for check in checks.values()
+        ], pool='health')
+        with cls._lock:
+            cls._results = dict(zip(checks, results))
+            cls._last_cycle = time.monotonic()
+
+    @staticmethod
+    def _timed(check):
+        """Result of one check with its latency."""
+        started = time.perf_counter()
+        try:
+            status, detail = check() or (UP, None)
+            error = None
+        except Exception as e:
+            status, detail, error = DOWN, None, str(e)
+        result = {
+            'status': status,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 3),
+            'checked_at': datetime.now(timezone.utc).isoformat(),
+            'checked_monotonic': time.monotonic()
+        }
+        if detail:
+            result['detail'] = detail
+        if error:
+            result['error'] = error
+        return result
+
+    @classmethod
+    def _reconcile_indexes(cls):
+        """Recreate the indexes if any expected one is missing.
+
+        The first run in a process creates them all (as run.py does at
+        startup) and records the resulting index set as expected.
+        """
+        db = MongoDB.get_db()
+        detail = None
+        if cls._expected_indexes is not None:
+            missing = missing_indexes(cls._expected_indexes, index_keys(db))
+            if not missing:
+                return UP, None
+            logger.warning("Recreating missing indexes: %s", missing)
+            detail = f"recreated {len(missing)} missing indexes"
+        create_all_indexes()
+        cls._expected_indexes = index_keys(db)
+        return UP, detail
+
+    @classmethod
+    def snapshot(cls, stale_after):
+        """Latest result of every check, marking old ones stale.
+
+        Returns:
+            Dict of check name -> result
+        """
+        now = time.monotonic()
+        with cls._lock:
+            results = cls._results
+        checks = {}
+        for name, result in results.items():
+            result = {key: value for key, value in result.items() if key != 'checked_monotonic'}
+            if result['status'] != DISABLED and now - results[name]['checked_monotonic'] > stale_after:
+                result['status'] = STALE
+            checks[name] = result
+        return checks
+
+    @classmethod
+    def is_ready(cls, checks):
+        """Whether every critical dependency is up."""
+        return all(checks.get(name, {}).get('status') == UP for name in CRITICAL)
+
+    @classmethod
+    def is_alive(cls, stale_after):
+        """Whether the prober is still completing cycles."""
+        last = cls._last_cycle if cls._last_cycle is not None else cls._started_at
+        return last is None or time.monotonic() - last <= stale_after
+
+    @classmethod
+    def uptime(cls):
+        """Seconds since this process started probing."""
+        return round(time.monotonic() - cls._started_at, 3) if cls._started_at else 0
@@ -0,0 +1,248 @@
+"""Percentile ranks and leaderboards across all audits.
+
+Each ranked metric is kept in memory as a sorted index per segment
+(all audits, per industry, per region). Indexes are loaded once from
+MongoDB with a narrow projection, updated incrementally on audit writes
+in this process, and rebuilt after RANKING_REFRESH_SECONDS to pick up
+writes made by other workers. Rebuilds read from a secondary when one is
+available, so they may miss writes within its replication lag until the
+next rebuild.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+import threading
+import time
+from flask import current_app
+from app.db.mongo import SECONDARY_PREFERRED
+from app.services.audit_types import AUDIT_MODELS
+
+
+# Audit type -> (metric field, whether a higher value ranks better)
+RANKED_METRICS = {
+    'carbon': ('total_carbon_footprint', False),
+    'igbc': ('total_score', True),
+    'esg': ('esg_score', True)
+}
+
+# input_data fields audits can be segmented by
+SEGMENT_FIELDS = ('industry', 'region')
+
+ALL_SEGMENT = 'all'
+
+# Sorts after any audit ID (lowercase hex), so (value, _MAX_ID) bounds
+# every entry with that value from above, as (value,) does from below
+_MAX_ID = '~'
+
+
+def _owner(audit):
+    """Tenant owning an audit; its creator for audits from before tenants."""
+    return str(audit.get('tenant_id') or audit['user_id'])
+
+
+def _segment_keys(input_data):
+    """Segments an audit belongs to, e.g. ['all', 'industry:steel']."""
+    keys = [ALL_SEGMENT]
+    for field in SEGMENT_FIELDS:
+        value = (input_data or {}).get(field)
+        if value:
+            keys.append(f"{field}:{str(value).strip().lower()}")
+    return keys
+
+
+class MetricIndex:
+    """Sorted (value, audit_id) index of one metric within one segment."""
+
+    def __init__(self, higher_is_better):
+        self.higher_is_better = higher_is_better
+        self._entries = []
+        self._values = {}
+
+    @classmethod
+    def from_entries(cls, entries, higher_is_better):
+        """Build an index from unsorted (value, audit_id) pairs."""
+        index = cls(higher_is_better)
+        index._entries = sorted(entries)
+        index._values = {audit_id: value for value, audit_id in entries}
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def upsert(self, audit_id, value):
+        """Insert or move an audit's value."""
+        self.remove(audit_id)
+        insort(self._entries, (value, audit_id))
+        self._values[audit_id] = value
+
+    def remove(self, audit_id):
+        """Remove an audit from the index if present."""
+        value = self._values.pop(audit_id, None)
+        if value is not None:
+            pos = bisect_left(self._entries, (value, audit_id))
+            del self._entries[pos]
+
+    def rank(self, value):
+        """Rank and percentile of a value, O(log n).
+
+        Returns:
+            Tuple of (rank, percentile) where rank 1 is best and percentile
+            is the share of audits ranked strictly worse
+        """
+        total = len(self._entries)
+        if total == 0:
+            return None, None
+        if self.higher_is_better:
+            better = total - bisect_right(self._entries, (value, _MAX_ID))
+            worse = bisect_left(self._entries, (value,))
+        else:
+            better = bisect_left(self._entries, (value,))
+            worse = total - bisect_right(self._entries, (value, _MAX_ID))
+        return better + 1, round(100.0 * worse / total, 2)
+
+    def top(self, k):
+        """Best k (value, audit_id) entries, O(k)."""
+        if self.higher_is_better:
+            return self._entries[:-k - 1:-1] if k else []
+        return self._entries[:k]
+
+
+class RankingService:
+    """Service for percentile ranks and leaderboards."""
+
+    _lock = threading.Lock()
+    # Serializes rebuilds, so concurrent requests don't each scan the collection
+    _load_lock = threading.Lock()
+    _indexes = {}
+    _owners = {}
+    _loaded_at = {}
+
+    @classmethod
+    def _is_fresh(cls, audit_type):
+        loaded_at = cls._loaded_at.get(audit_type)
+        max_age = current_app.config['RANKING_REFRESH_SECONDS']
+        return loaded_at is not None and time.monotonic() - loaded_at < max_age
+
+    @classmethod
+    def _ensure_loaded(cls, audit_type):
+        """Load (or periodically rebuild) the indexes of one audit type."""
+        if cls._is_fresh(audit_type):
+            return
+        with cls._load_lock:
+            # Rebuilt by another thread while this one waited
+            if cls._is_fresh(audit_type):
+                return
+            cls._load(audit_type)
+
+    @classmethod
+    def _load(cls, audit_type):
+        field, higher_is_better = RANKED_METRICS[audit_type]
+        collection = AUDIT_MODELS[audit_type]._get_collection(SECONDARY_PREFERRED)
+        cursor = collection.find(
+            {field: {'$type': 'number'}},
+            {field: 1, 'tenant_id': 1, 'user_id': 1, 'input_data.industry': 1, 'input_data.region': 1}
+        )
+
+        # Collect entries in one pass, then sort once per segment
+        entries = {}
+        owners = {}
+        for doc in cursor:
+            audit_id = str(doc['_id'])
+            owners[audit_id] = _owner(doc)
+            for key in _segment_keys(doc.get('input_data')):
+                entries.setdefault(key, []).append((doc[field], audit_id))
+
+        indexes = {
+            key: MetricIndex.from_entries(values, higher_is_better)
+            for key, values in entries.items()
+        }
+
+        with cls._lock:
+            cls._indexes[audit_type] = indexes
+            cls._owners[audit_type] = owners
+            cls._loaded_at[audit_type] = time.monotonic()
+
+    @classmethod
+    def observe(cls, audit_type, audit):
+        """Record a created or updated audit in the indexes."""
+        if audit_type not in cls._loaded_at:
+            return
+
+        field, higher_is_better = RANKED_METRICS[audit_type]
+        audit_id = str(audit['_id'])
+        keys = set(_segment_keys(audit.get('input_data')))
+        with cls._lock:
+            indexes = cls._indexes[audit_type]
+            for key, index in indexes.items():
+                if key not in keys:
+                    index.remove(audit_id)
+            for key in keys:
+                indexes.setdefault(key, MetricIndex(higher_is_better)).upsert(
+                    audit_id, audit[field]
+                )
+            cls._owners[audit_type][audit_id] = _owner(audit)
+
+    @classmethod
+    def discard(cls, audit_type, audit_id):
+        """Remove a deleted audit from the indexes."""
+        if audit_type not in cls._loaded_at:
+            return
+
+        with cls._lock:
+            for index in cls._indexes[audit_type].values():
+                index.remove(audit_id)
+            cls._owners[audit_type].pop(audit_id, None)
+
+    @classmethod
+    def percentile(cls, audit_type, audit):
+        """Rank an audit against all audits and its segments.
+
+        Args:
+            audit_type: 'carbon', 'igbc' or 'esg'
+            audit: Audit document
+
+        Returns:
+            Dictionary of segment -> {rank, percentile, total}
+        """
+        cls._ensure_loaded(audit_type)
+        field, _ = RANKED_METRICS[audit_type]
+        value = audit[field]
+
+        rankings = {}
+        with cls._lock:
+            indexes = cls._indexes[audit_type]
+            for key in _segment_keys(audit.get('input_data')):
+                index = indexes.get(key)
+                if not index:
+                    continue
+                rank, percentile = index.rank(value)
+                rankings[key] = {
+                    'rank': rank,
+                    'percentile': percentile,
+                    'total': len(index)
+                }
+        return rankings
+
+    @classmethod
+    def leaderboard(cls, audit_type, tenant_id, k=10, segment=ALL_SEGMENT):
+        """Top-k audits of a type within a segment.
+
+        Other tenants' audits are anonymized: only the entries of the
+        caller's tenant include the audit ID.
+        """
+        cls._ensure_loaded(audit_type)
+
+        with cls._lock:
+            index = cls._indexes[audit_type].get(segment)
+            top = index.top(k) if index else []
+            owners = cls._owners[audit_type]
+            entries = []
+            for position, (value, audit_id) in enumerate(top, start=1):
+                is_own = owners.get(audit_id) == str(tenant_id)
+                entries.append({
+                    'rank': position,
+                    'value': value,
+                    'is_own': is_own,
+                    'audit_id': audit_id if is_own else None
+                })
+            total = len(index) if index else 0
+        return entries, total
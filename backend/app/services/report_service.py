@@ -0,0 +1,228 @@
+"""Server-side rendering of audit reports with an on-disk artifact cache.
+
+Artifacts are keyed by audit type, audit ID and `updated_at`, so a report
+is only rendered again after the audit changes. Rendering runs in a
+process pool off the request thread, and concurrent requests for the
+same artifact share one render.
+
+Artifacts of older versions are swept once a newer one is rendered, but
+only when none has been served for `stale_seconds`: a request may still
+be sending one. Serving a cached artifact touches its mtime.
+"""
+
+from html import escape
+import glob
+import os
+import tempfile
+import threading
+import time
+from app.utils.concurrency import new_process_pool
+
+try:
+    from weasyprint import HTML
+except ImportError:  # PDF output is optional
+    HTML = None
+
+
+REPORT_FORMATS = ('html', 'pdf')
+
+REPORT_TITLES = {
+    'carbon': 'Carbon Emission Audit Report',
+    'igbc': 'IGBC Green Building Audit Report',
+    'esg': 'ESG Audit Report'
+}
+
+NAME_FIELDS = {
+    'carbon': 'facility_name',
+    'igbc': 'building_name',
+    'esg': 'organization_name'
+}
+
+REPORT_STYLE = """
+body { font-family: Arial, sans-serif; color: #333; margin: 40px; }
+h1 { color: #2e7d32; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 24px; }
+th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+th { background: #f1f8e9; width: 40%; }
+"""
+
+
+def _label(key):
+    """Human readable label for a field name."""
+    return key.replace('_', ' ').title()
+
+
+def _table(rows):
+    """Render a dictionary as a two-column table."""
+    cells = ''.join(
+        f'<tr><th>{escape(_label(key))}</th><td>{escape(str(value))}</td></tr>'
+        for key, value in rows.items()
+        if not isinstance(value, dict)
+    )
+    return f'<table>{cells}</table>'
+
+
+def _sections(audit_type, audit):
+    """(heading, rows) sections of a report for each audit type."""
+    if audit_type == 'carbon':
+        return [
+            ('Total Carbon Footprint', {'total_carbon_footprint': f"{audit['total_carbon_footprint']} kg CO2"}),
+            ('Emissions (kg CO2)', audit['emissions']),
+            ('Input Data', audit['input_data'])
+        ]
+    if audit_type == 'igbc':
+        return [
+            ('Certification', {'total_score': audit['total_score'], 'rating': audit['rating']}),
+            ('Category Scores', {k: v for k, v in audit['scores'].items() if k not in ('total_score', 'rating')})
+        ]
+    scores = audit['scores']
+    return [
+        ('ESG Rating', {'esg_score': audit['esg_score'], 'esg_rating': audit['esg_rating']}),
+        ('Pillar Scores', {
+            'environmental_score': audit['environmental_score'],
+            'social_score': audit['social_score'],
+            'governance_score': audit['governance_score']
+        }),
+        ('Environmental Details', scores.get('environmental_details', {})),
+        ('Social Details', scores.get('social_details', {})),
+        ('Governance Details', scores.get('governance_details', {}))
+    ]
+
+
+def render_html(audit_type, audit):
+    """Render an audit (as returned by the model's to_dict) to HTML."""
+    overview = {
+        'name': audit[NAME_FIELDS[audit_type]],
+        'audit_period': audit['audit_period'],
+        'status': audit['status'],
+        'created_at': audit['created_at'].isoformat(),
+        'updated_at': audit['updated_at'].isoformat()
+    }
+    if audit.get('scoring_version'):
+        overview['scoring_version'] = audit['scoring_version']
+
+    body = ''.join(
+        f'<h2>{escape(heading)}</h2>{_table(rows)}'
+        for heading, rows in [('Overview', overview)] + _sections(audit_type, audit)
+    )
+    title = escape(REPORT_TITLES[audit_type])
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f'<title>{title}</title><style>{REPORT_STYLE}</style></head>'
+        f'<body><h1>{title}</h1>{body}</body></html>'
+    )
+
+
+def _render_to_file(audit_type, audit, fmt, path):
+    """Render a report and atomically write it to `path` (worker process)."""
+    html = render_html(audit_type, audit)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if fmt == 'pdf':
+                f.write(HTML(string=html).write_pdf())
+            else:
+                f.write(html.encode('utf-8'))
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class ReportService:
+    """Service for rendering and caching audit reports."""
+
+    _pool = None
+    _lock = threading.Lock()
+    _in_flight = {}
+
+    @classmethod
+    def _get_pool(cls, max_workers):
+        """Get the shared render pool."""
+        if cls._pool is None:
+            cls._pool = new_process_pool(max_workers)
+        return cls._pool
+
+    @staticmethod
+    def is_supported(fmt):
+        """Whether a report format can be rendered in this environment."""
+        return fmt == 'html' or (fmt == 'pdf' and HTML is not None)
+
+    @staticmethod
+    def artifact_path(cache_dir, audit_type, audit_id, updated_at, fmt):
+        """Cache path of a report, keyed on audit ID and updated_at."""
+        version = int(updated_at.timestamp() * 1000000)
+        return os.path.join(cache_dir, f'{audit_type}-{audit_id}-{version}.{fmt}')
+
+    @classmethod
+    def get_report(cls, audit_type, audit, to_dict, fmt, cache_dir,
+                   max_workers=None, timeout=None, stale_seconds=300):
+        """Get the path of a rendered report, rendering it if needed.
+
+        Args:
+            audit_type: 'carbon', 'igbc' or 'esg'
+            audit: Audit document
+            to_dict: The model's to_dict, applied only on a cache miss
+            fmt: 'html' or 'pdf'
+            cache_dir: Directory holding rendered artifacts
+            max_workers: Size of the render pool
+            timeout: Seconds to wait for a render
+            stale_seconds: How long an artifact of an older version is
+                kept after it was last served
+
+        Returns:
+            Path of the rendered artifact
+
+        Raises:
+            concurrent.futures.TimeoutError: If rendering takes too long
+        """
+        audit_id = str(audit['_id'])
+        path = cls.artifact_path(cache_dir, audit_type, audit_id, audit['updated_at'], fmt)
+
+        with cls._lock:
+            # Under the lock, so a sweep cannot delete it after the touch
+            try:
+                os.utime(path)
+                return path
+            except FileNotFoundError:
+                pass
+            future = cls._in_flight.get(path)
+            submitted = future is None
+            if submitted:
+                os.makedirs(cache_dir, exist_ok=True)
+                future = cls._get_pool(max_workers).submit(
+                    _render_to_file, audit_type, to_dict(audit), fmt, path
+                )
+                cls._in_flight[path] = future
+
+        # Outside the lock: the callback runs immediately if already done
+        if submitted:
+            future.add_done_callback(
+                lambda _: cls._forget(path, audit_type, audit_id, fmt, stale_seconds)
+            )
+
+        return future.result(timeout=timeout)
+
+    @classmethod
+    def _forget(cls, path, audit_type, audit_id, fmt, stale_seconds):
+        """Drop a finished render and sweep older artifacts of the same audit."""
+        pattern = os.path.join(os.path.dirname(path), f'{audit_type}-{audit_id}-*.{fmt}')
+        served_before = time.time() - stale_seconds
+        with cls._lock:
+            cls._in_flight.pop(path, None)
+            for stale in glob.glob(pattern):
+                try:
+                    if stale != path and os.path.getmtime(stale) < served_before:
+                        os.unlink(stale)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def purge(cache_dir, audit_type, audit_id):
+        """Delete all cached reports of an audit."""
+        for path in glob.glob(os.path.join(cache_dir, f'{audit_type}-{audit_id}-*')):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,127 @@
+"""What-if scenario sweeps over the carbon emissions model."""
+
+import numpy as np
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+
+
+# How a swept parameter's values are applied to the audit's input
+SWEEP_MODES = ('absolute', 'percent_change')
+
+# Valid ranges of the model inputs after a sweep is applied
+INPUT_BOUNDS = {
+    'renewable_energy_percentage': (0, 100)
+}
+
+
+class ScenarioService:
+    """Service for evaluating grids of emission scenarios."""
+
+    @staticmethod
+    def _axis_size(parameter):
+        """Count the values of one swept parameter without building them.
+
+        Accepts either explicit `values` or `start`/`stop`/`steps`.
+        """
+        if 'values' in parameter:
+            values = parameter['values']
+            if not isinstance(values, list) or not values:
+                raise ValueError(f"values for {parameter['field']} must be a non-empty list")
+            return len(values)
+
+        try:
+            float(parameter['start'])
+            float(parameter['stop'])
+            steps = int(parameter['steps'])
+        except (KeyError, TypeError, ValueError, OverflowError):
+            raise ValueError(
+                f"{parameter['field']} needs either values or start, stop and steps"
+            )
+        if steps < 1:
+            raise ValueError(f"steps for {parameter['field']} must be at least 1")
+        return steps
+
+    @staticmethod
+    def _axis(parameter, size):
+        """Build the `size` values of one swept parameter."""
+        if 'values' in parameter:
+            try:
+                return np.asarray(parameter['values'], dtype=float).reshape(size)
+            except (TypeError, ValueError):
+                raise ValueError(f"values for {parameter['field']} must be numbers")
+        return np.linspace(float(parameter['start']), float(parameter['stop']), size)
+
+    @staticmethod
+    def sweep(input_data, parameters, max_points, max_dimensions):
+        """Evaluate the emissions model over the grid of swept parameters.
+
+        Each parameter becomes one grid axis; unswept inputs keep the
+        audit's value. The whole grid is evaluated in one broadcast pass.
+
+        Args:
+            input_data: Audit input data (the base scenario)
+            parameters: List of {'field', 'mode', 'values' | 'start'/'stop'/'steps'};
+                mode 'absolute' sets the input, 'percent_change' scales it
+            max_points: Maximum number of grid points
+            max_dimensions: Maximum number of swept parameters
+
+        Returns:
+            Dictionary with 'axes', 'shape' and per-metric 'results' arrays
+            (a curve for one parameter, a surface for two)
+
+        Raises:
+            ValueError: If the parameters are invalid or the grid is too large
+        """
+        if not parameters:
+            raise ValueError('At least one parameter is required')
+        if not isinstance(parameters, list) or not all(isinstance(p, dict) for p in parameters):
+            raise ValueError('parameters must be a list of objects')
+        if len(parameters) > max_dimensions:
+            raise ValueError(f'At most {max_dimensions} parameters can be swept')
+
+        fields = [parameter.get('field') for parameter in parameters]
+        for field in fields:
+            if field not in CarbonEmissionAudit.INPUT_FIELDS:
+                raise ValueError(f'Unknown parameter: {field}')
+        if len(set(fields)) != len(fields):
+            raise ValueError('Each parameter can only be swept once')
+
+        # Check the grid size before allocating any axis
+        shape = tuple(ScenarioService._axis_size(parameter) for parameter in parameters)
+        points = 1
+        for size in shape:
+            points *= size
+            if points > max_points:
+                raise ValueError(f'Scenario grid exceeds the maximum of {max_points} points')
+        axes = [ScenarioService._axis(parameter, size) for parameter, size in zip(parameters, shape)]
+
+        inputs = {
+            field: float(input_data.get(field, 0))
+            for field in CarbonEmissionAudit.INPUT_FIELDS
+        }
+        axes_out = []
+        for dim, (parameter, axis) in enumerate(zip(parameters, axes)):
+            mode = parameter.get('mode', 'absolute')
+            if mode not in SWEEP_MODES:
+                raise ValueError(f'Unknown mode: {mode}')
+
+            field = parameter['field']
+            # Orient the axis along its own grid dimension for broadcasting
+            oriented = axis.reshape([-1 if i == dim else 1 for i in range(len(axes))])
+            if mode == 'percent_change':
+                values = inputs[field] * (1 + oriented / 100)
+            else:
+                values = oriented
+            low, high = INPUT_BOUNDS.get(field, (0, np.inf))
+            inputs[field] = np.clip(values, low, high)
+            axes_out.append({'field': field, 'mode': mode, 'values': axis.tolist()})
+
+        emissions = CarbonEmissionAudit.emissions_model(**inputs)
+
+        return {
+            'axes': axes_out,
+            'shape': list(shape),
+            'results': {
+                key: np.broadcast_to(np.round(value, 2), shape).tolist()
+                for key, value in emissions.items()
+            }
+        }
@@ -0,0 +1,67 @@
+"""Tenant resolution and membership checks for audit requests.
+
+A request acts on the tenant named by its X-Tenant-ID header, or on the
+user's personal tenant without one. Memberships found are cached per
+process for TENANT_CACHE_SECONDS and invalidated on membership changes in
+this process; the TTL bounds how long a member removed through another
+worker keeps access. Non-members are never cached, so a member added
+through another worker has access at once.
+"""
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app
+from app.models.organization import Organization
+from app.utils.ttl_cache import TTLCache
+
+TENANT_HEADER = 'X-Tenant-ID'
+
+
+class TenantService:
+    """Service for resolving the tenant of a request."""
+
+    MAX_CACHED_MEMBERSHIPS = 100000
+
+    _roles = TTLCache(MAX_CACHED_MEMBERSHIPS)
+
+    @classmethod
+    def get_role(cls, tenant_id, user_id):
+        """Role of a user in a tenant, or None if not a member."""
+        tenant_id, user_id = str(tenant_id), str(user_id)
+        if tenant_id == user_id:
+            return 'owner'
+
+        key = (user_id, tenant_id)
+        role = cls._roles.get(key)
+        if role is not None:
+            return role
+
+        membership = Organization.find_membership(tenant_id, user_id)
+        if membership is None:
+            return None
+        cls._roles.set(key, membership['role'], current_app.config['TENANT_CACHE_SECONDS'])
+        return membership['role']
+
+    @classmethod
+    def resolve(cls, user_id, requested=None):
+        """Tenant a user's request acts on.
+
+        Args:
+            user_id: User ID
+            requested: Tenant ID from the request, if any
+
+        Returns:
+            Tenant ID, or None if the user is not a member of `requested`
+        """
+        if not requested:
+            return str(user_id)
+        try:
+            tenant_id = str(ObjectId(requested))
+        except (InvalidId, TypeError):
+            return None
+        return tenant_id if cls.get_role(tenant_id, user_id) else None
+
+    @classmethod
+    def invalidate(cls, tenant_id, user_id):
+        """Drop a cached membership after it changes."""
+        cls._roles.pop((str(user_id), str(tenant_id)))
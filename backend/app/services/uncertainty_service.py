@@ -0,0 +1,238 @@
+"""Monte Carlo uncertainty analysis of carbon footprints.
+
+Consumption inputs and emission factors can each be given a probability
+distribution. Samples are drawn fully vectorized with NumPy; runs larger
+than one chunk are split into chunks seeded from a single SeedSequence
+and evaluated across a process pool, so results depend only on the seed,
+chunk size and number of audits, never on the number of workers.
+"""
+
+import math
+import threading
+import numpy as np
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.utils.concurrency import new_process_pool
+
+
+DISTRIBUTIONS = ('fixed', 'normal', 'lognormal', 'uniform', 'triangular')
+
+# Distribution -> its numeric parameters
+PARAMETERS = {
+    'fixed': (),
+    'normal': ('mean', 'sd', 'sd_percent'),
+    'lognormal': ('mean', 'sd_percent'),
+    'uniform': ('low', 'high', 'low_percent', 'high_percent'),
+    'triangular': ('low', 'high', 'low_percent', 'high_percent', 'mode')
+}
+
+NON_NEGATIVE_PARAMETERS = ('sd', 'sd_percent')
+
+
+def _bounds(spec, point):
+    """(low, high, mode) of a uniform or triangular spec around `point`."""
+    low = spec['low'] if 'low' in spec else point * (1 + spec['low_percent'] / 100)
+    high = spec['high'] if 'high' in spec else point * (1 + spec['high_percent'] / 100)
+    mode = spec.get('mode', point)
+    return (np.asarray(low, dtype=float), np.asarray(high, dtype=float), np.asarray(mode, dtype=float))
+
+
+def _draw(rng, spec, point, size):
+    """Draw samples of one quantity.
+
+    Args:
+        rng: numpy Generator
+        spec: Distribution spec, e.g. {'distribution': 'normal', 'sd_percent': 5}
+        point: Point estimate(s) broadcastable to `size`, the default
+            mean/mode; `*_percent` bounds are relative to it
+        size: Output shape
+    """
+    point = np.asarray(point, dtype=float)
+    distribution = spec.get('distribution', 'fixed')
+    if distribution == 'fixed':
+        return np.broadcast_to(point, size)
+
+    mean = np.asarray(spec.get('mean', point), dtype=float)
+    if distribution == 'normal':
+        sd = spec['sd'] if 'sd' in spec else np.abs(mean) * spec.get('sd_percent', 0) / 100
+        # Quantities are physical amounts, so truncate at zero
+        return np.maximum(rng.normal(mean, sd, size), 0)
+    if distribution == 'lognormal':
+        # sd_percent is the coefficient of variation of the samples
+        cv = spec.get('sd_percent', 0) / 100
+        sigma = np.sqrt(np.log1p(cv ** 2))
+        safe_mean = np.where(mean > 0, mean, 1)
+        return np.where(mean > 0, rng.lognormal(np.log(safe_mean) - sigma ** 2 / 2, sigma, size), 0)
+
+    low, high, mode = _bounds(spec, point)
+    if distribution == 'uniform':
+        return rng.uniform(low, high, size)
+    if distribution == 'triangular':
+        # Inverse CDF rather than rng.triangular, which rejects zero-width
+        # ranges (e.g. a facility with no waste)
+        u = rng.random(size)
+        width = high - low
+        split = (mode - low) / np.where(width > 0, width, 1)
+        return np.where(
+            u < split,
+            low + np.sqrt(u * width * (mode - low)),
+            high - np.sqrt((1 - u) * width * (high - mode))
+        )
+    raise ValueError(f'Unknown distribution: {distribution}')
+
+
+def _simulate_chunk(points, input_specs, factor_specs, seed_sequence, samples):
+    """Simulate one chunk of portfolio samples (runs in a worker process).
+
+    Args:
+        points: List of per-audit input dicts (point estimates)
+        input_specs: Field -> distribution spec, applied to every audit
+        factor_specs: Factor name -> distribution spec, shared by all audits
+        seed_sequence: numpy SeedSequence for this chunk
+        samples: Number of samples in this chunk
+
+    Returns:
+        Dictionary of emission source -> (samples,) portfolio totals
+    """
+    rng = np.random.default_rng(seed_sequence)
+    size = (len(points), samples)
+
+    # One row per audit, one column per sample
+    inputs = {}
+    for field in CarbonEmissionAudit.INPUT_FIELDS:
+        column = np.array([[float(point.get(field, 0))] for point in points])
+        spec = input_specs.get(field)
+        inputs[field] = column if spec is None else _draw(rng, spec, column, size)
+    inputs['renewable_energy_percentage'] = np.clip(inputs['renewable_energy_percentage'], 0, 100)
+
+    # Factors are shared across facilities, so draw one row per sample
+    factors = {
+        name: _draw(rng, factor_specs[name], value, (1, samples))
+        for name, value in CarbonEmissionAudit.EMISSION_FACTORS.items()
+        if name in factor_specs
+    }
+
+    emissions = CarbonEmissionAudit.emissions_model(factors=factors, **inputs)
+    return {
+        key: np.broadcast_to(value, size).sum(axis=0)
+        for key, value in emissions.items()
+    }
+
+
+class UncertaintyService:
+    """Service for Monte Carlo uncertainty analysis."""
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    @classmethod
+    def _get_pool(cls, max_workers):
+        """Get the shared process pool."""
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = new_process_pool(max_workers)
+            return cls._pool
+
+    @staticmethod
+    def _validate(specs, points, kind):
+        """Check distribution specs and the bounds they give each point.
+
+        Args:
+            specs: Name -> distribution spec
+            points: Name -> point estimate(s) of every valid name
+            kind: What the names are, for error messages
+        """
+        if not isinstance(specs, dict) or not all(isinstance(spec, dict) for spec in specs.values()):
+            raise ValueError(f'{kind} distributions must be an object of objects')
+        for name, spec in specs.items():
+            if name not in points:
+                raise ValueError(f'Unknown {kind}: {name}')
+            distribution = spec.get('distribution', 'fixed')
+            if distribution not in DISTRIBUTIONS:
+                raise ValueError(f'Unknown distribution for {name}: {distribution}')
+            for parameter in PARAMETERS[distribution]:
+                if parameter not in spec:
+                    continue
+                value = spec[parameter]
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                    raise ValueError(f'{parameter} of the {distribution} distribution for {name} must be a number')
+                if parameter in NON_NEGATIVE_PARAMETERS and value < 0:
+                    raise ValueError(f'{parameter} of the {distribution} distribution for {name} must not be negative')
+            if distribution not in ('uniform', 'triangular'):
+                continue
+            for bound in ('low', 'high'):
+                if bound not in spec and f'{bound}_percent' not in spec:
+                    raise ValueError(
+                        f'{distribution} distribution for {name} needs {bound} or {bound}_percent'
+                    )
+            try:
+                low, high, mode = _bounds(spec, points[name])
+            except (TypeError, ValueError):
+                raise ValueError(f'Bounds of the {distribution} distribution for {name} must be numbers')
+            if np.any(low > high) or (distribution == 'triangular' and np.any((mode < low) | (mode > high))):
+                raise ValueError(f'{distribution} distribution for {name} needs low <= mode <= high')
+
+    @classmethod
+    def simulate(cls, points, input_specs, factor_specs, samples, seed=None,
+                 confidence=0.95, chunk_size=100000, chunk_cells=1000000, max_workers=None):
+        """Run a Monte Carlo simulation of a portfolio of carbon audits.
+
+        Args:
+            points: List of audit input dicts (point estimates)
+            input_specs: Field -> distribution spec for consumption inputs
+            factor_specs: Factor name -> distribution spec for emission factors
+            samples: Number of samples
+            seed: Seed for reproducible results (random if None)
+            confidence: Confidence level of the reported intervals
+            chunk_size: Samples per chunk; more than one chunk uses the pool
+            chunk_cells: Bound on audits x samples per chunk, each chunk
+                holding about ten float arrays of that size
+            max_workers: Size of the process pool
+
+        Returns:
+            Dictionary of emission source -> {mean, std, median, ci_low, ci_high}
+
+        Raises:
+            ValueError: If the specs are invalid
+        """
+        cls._validate(input_specs, {
+            field: np.array([float(point.get(field, 0)) for point in points])
+            for field in CarbonEmissionAudit.INPUT_FIELDS
+        }, 'input')
+        cls._validate(factor_specs, CarbonEmissionAudit.EMISSION_FACTORS, 'emission factor')
+        if samples < 1:
+            raise ValueError('samples must be at least 1')
+        if not 0 < confidence < 1:
+            raise ValueError('confidence must be between 0 and 1')
+
+        chunk_size = max(1, min(chunk_size, chunk_cells // len(points)))
+        sizes = [chunk_size] * (samples // chunk_size)
+        if samples % chunk_size:
+            sizes.append(samples % chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        if len(sizes) == 1:
+            chunks = [_simulate_chunk(points, input_specs, factor_specs, seeds[0], sizes[0])]
+        else:
+            pool = cls._get_pool(max_workers)
+            chunks = list(pool.map(
+                _simulate_chunk,
+                [points] * len(sizes),
+                [input_specs] * len(sizes),
+                [factor_specs] * len(sizes),
+                seeds,
+                sizes
+            ))
+
+        tail = (1 - confidence) / 2 * 100
+        results = {}
+        for key in chunks[0]:
+            values = np.concatenate([chunk[key] for chunk in chunks])
+            low, median, high = np.percentile(values, [tail, 50, 100 - tail])
+            results[key] = {
+                'mean': round(float(values.mean()), 2),
+                'std': round(float(values.std()), 2),
+                'median': round(float(median), 2),
+                'ci_low': round(float(low), 2),
+                'ci_high': round(float(high), 2)
+            }
+        return results
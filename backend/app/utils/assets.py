@@ -0,0 +1,117 @@
+"""Build step and serving helpers for the frontend's static assets.
+
+`build_assets` copies `frontend/public` to an output directory, renames
+the shared JS/CSS files to content-hashed names, rewrites the HTML pages
+to reference them, and writes precompressed `.gz` (and `.br`, when
+brotli is installed) variants next to every text asset. Fingerprinted
+files never change under a given name, so they are served as immutable.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:  # Optional, .gz variants are always written
+    brotli = None
+
+
+# Assets renamed to <name>.<hash><ext> and served as immutable
+FINGERPRINTED = ('api.js', 'audit-api.js', 'app.js', 'styles.css')
+
+PRECOMPRESSED_EXTENSIONS = ('.html', '.js', '.css', '.json', '.svg', '.txt')
+
+MANIFEST_NAME = 'manifest.json'
+
+# Encoding -> file suffix of its precompressed variant, in preference order
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+_FINGERPRINT_PATTERN = re.compile(r'^.+\.[0-9a-f]{10}\.(?:js|css)$')
+
+
+def _fingerprint(name, content):
+    """Content-hashed file name, e.g. api.js -> api.3f2a9c1b0d.js"""
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:10]}{ext}'
+
+
+def _write(path, content):
+    """Write a file and its precompressed variants."""
+    with open(path, 'wb') as f:
+        f.write(content)
+    if not path.endswith(PRECOMPRESSED_EXTENSIONS):
+        return
+    # mtime=0 keeps the .gz output reproducible across builds
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+
+
+def _rewrite_references(html, manifest):
+    """Point src/href attributes of an HTML page at fingerprinted assets."""
+    def replace(match):
+        return f'{match.group(1)}="{manifest.get(match.group(2), match.group(2))}"'
+    return re.sub(r'\b(src|href)="([^"]+)"', replace, html)
+
+
+def build_assets(source_dir, output_dir):
+    """Build the frontend into `output_dir`.
+
+    Args:
+        source_dir: Directory of source assets (frontend/public)
+        output_dir: Directory to write the build to; replaced if it exists
+
+    Returns:
+        Manifest dictionary of original name -> fingerprinted name
+    """
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+
+    manifest = {}
+    for name in FINGERPRINTED:
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            content = f.read()
+        manifest[name] = _fingerprint(name, content)
+        _write(os.path.join(output_dir, manifest[name]), content)
+
+    for name in sorted(os.listdir(source_dir)):
+        source = os.path.join(source_dir, name)
+        if name in FINGERPRINTED or not os.path.isfile(source):
+            continue
+        with open(source, 'rb') as f:
+            content = f.read()
+        if name.endswith('.html'):
+            content = _rewrite_references(content.decode('utf-8'), manifest).encode('utf-8')
+        _write(os.path.join(output_dir, name), content)
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def is_fingerprinted(filename):
+    """Whether a built asset has a content-hashed (immutable) name."""
+    return bool(_FINGERPRINT_PATTERN.match(os.path.basename(filename)))
+
+
+def precompressed_variant(path, accept_encodings):
+    """Best precompressed variant of `path` the client accepts.
+
+    Args:
+        path: Path of the uncompressed asset
+        accept_encodings: The request's parsed Accept-Encoding header
+
+    Returns:
+        Tuple of (path, encoding); encoding is None for the original file
+    """
+    for encoding, suffix in ENCODING_SUFFIXES:
+        if accept_encodings[encoding] and os.path.isfile(path + suffix):
+            return path + suffix, encoding
+    return path, None
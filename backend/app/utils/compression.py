@@ -0,0 +1,72 @@
+"""Negotiated gzip/brotli compression of large responses."""
+
+import gzip
+from flask import current_app, request
+from app.utils.etags import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/msgpack', 'text/html', 'text/plain')
+
+
+def _choose_encoding():
+    """Best encoding the client accepts, or None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _encode_not_modified(response):
+    """Give a 304 the ETag of the encoded representation the client holds.
+
+    The identity ETag is kept unless the client validated with the ETag
+    of the encoding negotiated for this request.
+    """
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    encoding = _choose_encoding()
+    if etag and encoding and request.if_none_match.contains_weak(encoded_etag(etag, encoding)):
+        response.set_etag(encoded_etag(etag, encoding), weak=weak)
+    return response
+
+
+def compress_response(response):
+    """Compress a response body if large enough and accepted by the client.
+
+    Registered as an after_request hook. Streamed and file responses
+    (direct passthrough) are left alone; a 304 only has its ETag encoded.
+    """
+    if response.status_code == 304:
+        return _encode_not_modified(response)
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.content_length is None
+            or response.content_length < current_app.config['COMPRESS_MIN_SIZE']):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if encoding == 'br':
+        data = brotli.compress(data, quality=current_app.config['COMPRESS_BROTLI_QUALITY'])
+    else:
+        data = gzip.compress(data, compresslevel=current_app.config['COMPRESS_GZIP_LEVEL'])
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak=weak)
+    return response
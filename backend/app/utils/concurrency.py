@@ -0,0 +1,47 @@
+"""Shared thread pools for running independent I/O concurrently."""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import contextvars
+import multiprocessing
+import threading
+
+_executors = {}
+_lock = threading.Lock()
+
+MAX_WORKERS = 16
+
+
+def get_executor(name='io'):
+    """Get a shared thread pool by name.
+
+    Work that itself waits on the 'io' pool (e.g. batched requests) must
+    use a different pool, so it can never starve the tasks it waits for.
+    """
+    with _lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix=name)
+        return _executors[name]
+
+
+def run_concurrently(calls, pool='io'):
+    """Run zero-argument callables concurrently and return their results in order.
+
+    Each call runs in a copy of the caller's context, so the Flask app
+    context (current_app) is available to it. Exceptions raised by a call
+    are re-raised in the caller.
+    """
+    if len(calls) == 1:
+        return [calls[0]()]
+    futures = [get_executor(pool).submit(contextvars.copy_context().run, call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def new_process_pool(max_workers=None):
+    """Process pool for CPU-bound work, its workers not forked from here.
+
+    A forked worker would inherit the server's threads' locks mid-use;
+    forkserver (spawn where unavailable) starts workers from a clean
+    process instead.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
@@ -0,0 +1,40 @@
+"""Work deferred until after the response has been sent."""
+
+from functools import partial
+from flask import current_app, g
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def defer(func, *args, **kwargs):
+    """Run func(*args, **kwargs) once the current response has been sent.
+
+    Deferred work runs in an application context after the WSGI server
+    closes the response, so it adds nothing to the client's latency.
+    Exceptions are logged, never raised.
+    """
+    g.setdefault('_deferred', []).append(partial(func, *args, **kwargs))
+
+
+def run_deferred(response):
+    """Attach the request's deferred work to the response.
+
+    Registered as an after_request hook.
+    """
+    tasks = g.pop('_deferred', None)
+    if not tasks:
+        return response
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            for task in tasks:
+                try:
+                    task()
+                except Exception:
+                    logger.exception("Deferred task %r failed", task.func)
+
+    response.call_on_close(run)
+    return response
@@ -4,10 +4,13 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from flask import current_app
+from app.utils.metrics import histogram
 import logging
 
 logger = logging.getLogger(__name__)
 
+SMTP_SEND_SECONDS = histogram('smtp_send_seconds', 'Time to send an email over SMTP, failures included', ('kind',))
+
 
 def send_otp_email(recipient_email: str, otp_code: str) -> bool:
     """Send OTP to email address.
@@ -64,16 +67,16 @@ Best regards,
         message.attach(part2)
         
         # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
+        with SMTP_SEND_SECONDS.time(kind='otp'), smtplib.SMTP(smtp_server, smtp_port) as server:
             server.starttls()
             server.login(sender_email, sender_password)
             server.sendmail(sender_email, recipient_email, message.as_string())
         
-        logger.info(f"OTP email sent to {recipient_email}")
+        logger.info("OTP email sent to %s", recipient_email)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to send OTP email: {str(e)}")
+        logger.error("Failed to send OTP email: %s", e)
         return False
 
 
@@ -140,14 +143,14 @@ Best regards,
         message.attach(part2)
         
         # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
+        with SMTP_SEND_SECONDS.time(kind='verification'), smtplib.SMTP(smtp_server, smtp_port) as server:
             server.starttls()
             server.login(sender_email, sender_password)
             server.sendmail(sender_email, recipient_email, message.as_string())
         
-        logger.info(f"Verification email sent to {recipient_email}")
+        logger.info("Verification email sent to %s", recipient_email)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to send verification email: {str(e)}")
+        logger.error("Failed to send verification email: %s", e)
         return False
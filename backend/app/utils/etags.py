@@ -0,0 +1,91 @@
+"""ETag utilities for conditional audit requests."""
+
+from datetime import datetime, timedelta
+import hashlib
+
+EPOCH = datetime(1970, 1, 1)
+
+# Projection of the fields that identify an audit's version
+VERSION_PROJECTION = {'user_id': 1, 'updated_at': 1, 'revision': 1}
+
+# Content codings whose representations carry their own ETag
+CONTENT_CODINGS = ('br', 'gzip')
+
+
+def audit_version(audit):
+    """Version token of an audit document.
+
+    Uses the per-document revision counter, falling back to `updated_at`
+    (microseconds since epoch, prefixed with 't') for audits written
+    before revisions existed.
+    """
+    if audit.get('revision') is not None:
+        return str(audit['revision'])
+    return f"t{(audit['updated_at'] - EPOCH) // timedelta(microseconds=1)}"
+
+
+def audit_etag(audit):
+    """Strong ETag (unquoted) of an audit document."""
+    return f"{audit['_id']}-{audit_version(audit)}"
+
+
+def list_etag(audits):
+    """Strong ETag (unquoted) of an ordered list of audit documents."""
+    digest = hashlib.sha1()
+    for audit in audits:
+        digest.update(audit_etag(audit).encode('utf-8'))
+        digest.update(b',')
+    return digest.hexdigest()
+
+
+def version_filter(etag, audit_id):
+    """MongoDB filter matching an audit only at the version in `etag`.
+
+    Args:
+        etag: Unquoted ETag from an If-Match header
+        audit_id: ID of the audit being updated
+
+    Returns:
+        Filter dictionary, or None if the ETag is not for this audit
+    """
+    prefix = f"{audit_id}-"
+    if not etag.startswith(prefix):
+        return None
+
+    version = etag[len(prefix):]
+    if version.startswith('t') and version[1:].isdigit():
+        return {
+            'revision': {'$exists': False},
+            'updated_at': EPOCH + timedelta(microseconds=int(version[1:]))
+        }
+    if version.isdigit():
+        return {'revision': int(version)}
+    return None
+
+
+def encoded_etag(etag, encoding):
+    """Strong ETag (unquoted) of a content-coded representation.
+
+    The compressed bytes differ from the identity representation's, so
+    they get a validator of their own rather than a weakened one.
+    """
+    return f"{etag}-{encoding}"
+
+
+def identity_etag(etag):
+    """ETag of the identity representation an encoded_etag() came from."""
+    for encoding in CONTENT_CODINGS:
+        suffix = f"-{encoding}"
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)]
+    return etag
+
+
+def none_match(if_none_match, etag):
+    """Whether an If-None-Match header lists `etag` in any content coding.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    return if_none_match.star_tag or any(
+        identity_etag(tag) == etag for tag in if_none_match.as_set(include_weak=True)
+    )
@@ -0,0 +1,75 @@
+"""JSON provider with native ObjectId/datetime handling.
+
+Uses orjson when installed, falling back to the standard library, and
+negotiates MessagePack responses (when msgpack is installed) for clients
+that prefer `application/msgpack`.
+"""
+
+from datetime import date, datetime
+from bson import ObjectId
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional MessagePack responses
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(o):
+    """Serialize types JSON does not support natively."""
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+def _wants_msgpack():
+    """Whether the current client prefers MessagePack over JSON."""
+    if msgpack is None or not has_request_context():
+        return False
+    best = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """JSON provider serializing ObjectId and datetime (as ISO 8601) natively."""
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        """Serialize to a JSON string."""
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """Build a JSON (or negotiated MessagePack) response."""
+        obj = self._prepare_response_obj(args, kwargs)
+
+        if _wants_msgpack():
+            response = self._app.response_class(
+                msgpack.packb(obj, default=_default), mimetype=MSGPACK_MIMETYPE
+            )
+        elif orjson is None:
+            response = super().response(obj)
+        else:
+            response = self._app.response_class(
+                orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS),
+                mimetype=self.mimetype
+            )
+
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
@@ -0,0 +1,167 @@
+"""Non-blocking structured logging.
+
+configure_logging() replaces logging.basicConfig(). Logging calls only
+put the record on an in-memory queue; a QueueListener thread formats it
+(as one JSON object per line by default) and writes it, so handler I/O
+never runs on the calling thread. Records are formatted lazily: pass
+arguments separately, as in logger.info("Token refreshed for user %s",
+user_id), and the message is only built by the listener, for records
+that are kept.
+
+High-volume loggers can be sampled: with a rate of 0.1 for a logger (and
+its children), one in ten of its records below WARNING is kept.
+Warnings and errors are always kept.
+
+A process forked after configure_logging() (e.g. a gunicorn worker
+with --preload) gets a listener thread of its own.
+
+Settings (arguments override the environment):
+    LOG_LEVEL         root level (default INFO)
+    LOG_FORMAT        json (default) or text
+    LOG_SAMPLE_RATES  e.g. "app.routes.session=0.1,werkzeug=0.01"
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed in `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_fork_hook = False
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records below WARNING of some loggers."""
+
+    def __init__(self, rates):
+        """
+        Args:
+            rates: Dict of logger name -> fraction of records to keep;
+                the most specific name applies to child loggers
+        """
+        super().__init__()
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + '.'):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler leaving formatting to the listener thread.
+
+    The stock prepare() formats every record in the calling thread so it
+    can be pickled; the queue here never leaves the process.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def parse_sample_rates(value):
+    """Parse "name=rate,name=rate" into a dict."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        name, _, rate = item.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """Drain the queue from a forked child; the parent's thread is gone."""
+    global _listener
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(_listener.queue, *_listener.handlers)
+        _listener.start()
+
+
+def configure_logging(level=None, json_lines=None, sample_rates=None, stream=None):
+    """Route all logging through a queue drained by a background thread.
+
+    Replaces the root logger's handlers; calling it again replaces the
+    previous configuration.
+
+    Args:
+        level: Root level name or number
+        json_lines: Write JSON lines (True) or TEXT_FORMAT lines (False)
+        sample_rates: Dict of logger name -> fraction of records to keep
+        stream: Output stream (default stderr)
+
+    Returns:
+        The running QueueListener (stopped at exit)
+    """
+    global _listener, _fork_hook
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    if json_lines is None:
+        json_lines = os.getenv('LOG_FORMAT', 'json').lower() == 'json'
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(os.getenv('LOG_SAMPLE_RATES'))
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JSONFormatter() if json_lines else logging.Formatter(TEXT_FORMAT))
+
+    records = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    stop_logging()
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+    # Hooks cannot be unregistered, so register once
+    if not _fork_hook:
+        os.register_at_fork(after_in_child=_restart_after_fork)
+        _fork_hook = True
+    return _listener
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,356 @@
+"""In-process metrics registry, rendered in the Prometheus text format.
+
+Metrics are module-level singletons created with counter(), gauge() or
+histogram() and updated with keyword labels, e.g.
+
+    REQUESTS = counter('http_requests_total', 'Requests served', ('status',))
+    REQUESTS.inc(status=200)
+
+    LATENCY = histogram('work_seconds', 'Time spent working', ('kind',))
+    with LATENCY.time(kind='batch'):
+        ...
+
+Updates only touch an in-memory dict. With several worker processes,
+enable_multiprocess() makes each process write its values to a shared
+directory every few seconds; render() then sums counters and histograms
+over all files (dead workers included, so totals never go backwards) and
+reports gauges of live workers per pid, the way prometheus_client's
+multiprocess mode does. Worker processes forked after
+enable_multiprocess() start from empty totals in a file of their own;
+process pools (concurrency.new_process_pool) don't fork from the server,
+so their workers never write one.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Directory and file of this process, when aggregating across processes
+_multiprocess = {'directory': None, 'path': None, 'interval': None, 'fork_hook': False}
+
+
+def _escape(value):
+    """Escape a label value for the text format."""
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names, values):
+    """Render {name="value",...}, or nothing without labels."""
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value):
+    """Render a sample value (integers without a trailing .0)."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Labelled values of one metric."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """Label values in labelnames order."""
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def values(self):
+        """Copy of the value of every series."""
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self, values=None):
+        """(name suffix, label names, label values, value) of every series."""
+        values = self.values() if values is None else values
+        return [('', self.labelnames, key, value) for key, value in values.items()]
+
+    def merge(self, dumps):
+        """Combine the values dumped by several processes.
+
+        Args:
+            dumps: List of (pid, alive, values) per process file
+
+        Returns:
+            Dict of label values -> value
+        """
+        merged = {}
+        for _, _, values in dumps:
+            for key, value in values.items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down.
+
+    Across processes, each live worker's value is reported with a `pid`
+    label; values of exited workers are dropped.
+    """
+
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def merge(self, dumps):
+        return {
+            key + (str(pid),): value
+            for pid, alive, values in dumps if alive
+            for key, value in values.items()
+        }
+
+    def samples(self, values=None):
+        if values is None:
+            return super().samples()
+        return [('', self.labelnames + ('pid',), key, value) for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (e.g. latencies) over fixed buckets.
+
+    Each series holds one count per bucket (the last is +Inf) and the sum
+    of all observations.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in a with block (or decorated function)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def values(self):
+        with self._lock:
+            return {key: [list(counts), total] for key, (counts, total) in self._values.items()}
+
+    def merge(self, dumps):
+        merged = {}
+        for _, _, values in dumps:
+            for key, (counts, total) in values.items():
+                series = merged.setdefault(key, [[0] * len(counts), 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+        return merged
+
+    def samples(self, values=None):
+        values = self.values() if values is None else values
+        names = self.labelnames + ('le',)
+        samples = []
+        for key, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format_value(float(bound))
+                samples.append(('_bucket', names, key + (le,), cumulative))
+            samples.append(('_sum', self.labelnames, key, total))
+            samples.append(('_count', self.labelnames, key, cumulative))
+        return samples
+
+
+def _register(cls, name, documentation, labelnames, **kwargs):
+    """Get or create the metric called `name`."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = cls(name, documentation, labelnames, **kwargs)
+        return _registry[name]
+
+
+def counter(name, documentation, labelnames=()):
+    """Get or create a counter."""
+    return _register(Counter, name, documentation, labelnames)
+
+
+def gauge(name, documentation, labelnames=()):
+    """Get or create a gauge."""
+    return _register(Gauge, name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Get or create a histogram."""
+    return _register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+def _metrics():
+    with _registry_lock:
+        return sorted(_registry.values(), key=lambda metric: metric.name)
+
+
+def _process_file(directory):
+    """File of this process; the start time keeps a reused pid's totals apart."""
+    return os.path.join(directory, f'metrics_{os.getpid()}_{time.time_ns()}.json')
+
+
+def write_snapshot():
+    """Write this process's values to its file in the shared directory."""
+    path = _multiprocess['path']
+    if path is None:
+        return
+    snapshot = {
+        metric.name: [[list(key), value] for key, value in metric.values().items()]
+        for metric in _metrics()
+    }
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(temporary, path)
+
+
+def _write_periodically(path):
+    """Write snapshots until this process's file changes (i.e. after a fork)."""
+    while _multiprocess['path'] == path:
+        time.sleep(_multiprocess['interval'])
+        try:
+            write_snapshot()
+        except OSError:
+            pass
+
+
+def _start_writer():
+    _multiprocess['path'] = _process_file(_multiprocess['directory'])
+    threading.Thread(
+        target=_write_periodically, args=(_multiprocess['path'],), name='metrics-writer', daemon=True
+    ).start()
+
+
+def enable_multiprocess(directory, interval=5):
+    """Aggregate metrics of all worker processes sharing `directory`.
+
+    The directory should be emptied when the service (re)starts, as
+    files of exited workers keep counting towards the totals.
+    """
+    if _multiprocess['directory'] == directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _multiprocess.update(directory=directory, interval=interval)
+    # Hooks cannot be unregistered, so register once
+    if not _multiprocess['fork_hook']:
+        os.register_at_fork(after_in_child=_after_fork)
+        _multiprocess['fork_hook'] = True
+    _start_writer()
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshots(directory):
+    """(pid, alive, {metric name: values}) of every process file."""
+    files = []
+    for filename in os.listdir(directory):
+        if not (filename.startswith('metrics_') and filename.endswith('.json')):
+            continue
+        _, pid, started = filename[:-len('.json')].split('_')
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        files.append((int(started), int(pid), snapshot))
+
+    # Only the newest file of a pid can belong to a live process
+    newest = {pid: started for started, pid, _ in sorted(files)}
+    return [
+        (pid, newest[pid] == started and _is_alive(pid), {
+            name: {tuple(key): value for key, value in values}
+            for name, values in snapshot.items()
+        })
+        for started, pid, snapshot in files
+    ]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    directory = _multiprocess['directory']
+    snapshots = None
+    if directory:
+        write_snapshot()
+        snapshots = _read_snapshots(directory)
+
+    lines = []
+    for metric in _metrics():
+        values = None
+        if snapshots is not None:
+            values = metric.merge([
+                (pid, alive, snapshot.get(metric.name, {})) for pid, alive, snapshot in snapshots
+            ])
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for suffix, names, label_values, value in metric.samples(values):
+            lines.append(f'{metric.name}{suffix}{_format_labels(names, label_values)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _after_fork():
+    """Start a forked worker from empty totals and its own file.
+
+    Registered by enable_multiprocess(). The parent's counts stay in its
+    own file; gauges keep their last value, as they describe state the
+    child inherited.
+    """
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    for metric in _registry.values():
+        metric._lock = threading.Lock()
+        if not isinstance(metric, Gauge):
+            metric._values = {}
+    if _multiprocess['directory']:
+        _start_writer()
+
+
+atexit.register(write_snapshot)
@@ -1,6 +1,9 @@
 """Password hashing and verification utilities."""
 
 import bcrypt
+from app.utils.metrics import histogram
+
+PASSWORD_HASH_SECONDS = histogram('password_hash_seconds', 'bcrypt hashing and verification time', ('operation',))
 
 
 def hash_password(password: str) -> str:
@@ -13,7 +16,8 @@ def hash_password(password: str) -> str:
         Hashed password
     """
     salt = bcrypt.gensalt(rounds=12)
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    with PASSWORD_HASH_SECONDS.time(operation='hash'):
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
@@ -26,4 +30,5 @@ def verify_password(password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    with PASSWORD_HASH_SECONDS.time(operation='verify'):
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
@@ -0,0 +1,192 @@
+"""On-demand profiling of single requests.
+
+A request is profiled when it carries PROFILE_HEADER with the
+PROFILING_TOKEN, or at random with probability PROFILE_SAMPLE_RATE. A
+sampler thread then records the request thread's stack every
+PROFILE_INTERVAL_MS until the response is ready, and the stacks are
+saved to PROFILE_DIR in the collapsed format ("outer;inner;leaf count"
+per line) read by flamegraph.pl and speedscope, once the response has
+been sent. The profiled response carries the profile's id in
+PROFILE_ID_HEADER.
+
+The hooks are only registered when profiling is configured; otherwise
+requests pay nothing. Work the request hands to thread pools is not
+sampled, and CPU-bound code is sampled at most every switch interval
+(5 ms by default), as the sampler needs the GIL.
+"""
+
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from bson import ObjectId
+from flask import current_app, g, request
+from app.utils.deferred import defer
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_HEADER = 'X-Profile-ID'
+
+
+def _frame_name(frame):
+    """Stack entry of a frame: function (file:first line)."""
+    code = frame.f_code
+    path = os.path.join(*code.co_filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(';', ':')
+
+
+def _collapse(frame):
+    """Stack of a frame, outermost first, joined with semicolons."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class RequestProfiler:
+    """Sampler of one thread's stack."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.duration = None
+        self._started = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            # Stopped while waiting for the GIL: the frame is stop() itself
+            if frame is None or self._stopped.is_set():
+                return
+            self.stacks[_collapse(frame)] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def collapsed(self):
+        """Samples in the collapsed stack format."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _requested():
+    """Whether the current request asks to be profiled (or is sampled)."""
+    config = current_app.config
+    token = config['PROFILING_TOKEN']
+    header = request.headers.get(PROFILE_HEADER)
+    if header and token and hmac.compare_digest(header, token):
+        return True
+    rate = config['PROFILE_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def start_profiling():
+    """Start sampling the request if it is to be profiled.
+
+    Registered as a before_request hook.
+    """
+    if not _requested():
+        return
+    profiler = RequestProfiler(current_app.config['PROFILE_INTERVAL_MS'] / 1000)
+    profiler.start()
+    g.profiler = profiler
+
+
+def stop_profiling(response):
+    """Stop sampling and save the profile once the response is sent.
+
+    Registered as an after_request hook.
+    """
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.stop()
+
+    profile_id = str(ObjectId())
+    metadata = {
+        'id': profile_id,
+        'method': request.method,
+        'path': request.path,
+        'route': request.url_rule.rule if request.url_rule else None,
+        'status': response.status_code,
+        'duration_ms': round(profiler.duration * 1000, 3),
+        'samples': sum(profiler.stacks.values()),
+        'interval_ms': current_app.config['PROFILE_INTERVAL_MS'],
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+    defer(save_profile, current_app.config['PROFILE_DIR'], metadata, profiler.collapsed(),
+          current_app.config['PROFILE_MAX_FILES'])
+    response.headers[PROFILE_ID_HEADER] = profile_id
+    return response
+
+
+def _paths(profile_dir, profile_id):
+    """(metadata, collapsed stacks) file paths of a profile."""
+    base = os.path.join(profile_dir, profile_id)
+    return f'{base}.json', f'{base}.collapsed'
+
+
+def save_profile(profile_dir, metadata, collapsed, max_files):
+    """Write a profile, keeping only the newest max_files."""
+    os.makedirs(profile_dir, exist_ok=True)
+    metadata_path, stacks_path = _paths(profile_dir, metadata['id'])
+    with open(stacks_path, 'w') as f:
+        f.write(collapsed)
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+    logger.info("Saved profile %s of %s %s", metadata['id'], metadata['method'], metadata['path'])
+
+    # ObjectId strings sort by creation time
+    for profile_id in sorted(_profile_ids(profile_dir))[:-max_files]:
+        for path in _paths(profile_dir, profile_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _profile_ids(profile_dir):
+    try:
+        filenames = os.listdir(profile_dir)
+    except FileNotFoundError:
+        return []
+    return [name[:-len('.json')] for name in filenames if name.endswith('.json')]
+
+
+def list_profiles(profile_dir):
+    """Metadata of the stored profiles, newest first."""
+    profiles = []
+    for profile_id in sorted(_profile_ids(profile_dir), reverse=True):
+        try:
+            with open(_paths(profile_dir, profile_id)[0]) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_profile(profile_dir, profile_id):
+    """Collapsed stacks of a profile, or None if there is no such profile."""
+    if not ObjectId.is_valid(profile_id):
+        return None
+    try:
+        with open(_paths(profile_dir, profile_id)[1]) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
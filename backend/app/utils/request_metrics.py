@@ -0,0 +1,31 @@
+"""Per-route request latency and status counts."""
+
+import time
+from flask import g, request
+from app.utils.metrics import counter, histogram
+
+REQUEST_LATENCY = histogram(
+    'http_request_duration_seconds', 'Request latency by route', ('method', 'route')
+)
+REQUESTS = counter('http_requests_total', 'Requests served by route and status', ('method', 'route', 'status'))
+
+
+def start_request_timer():
+    """Note when the request started; registered as a before_request hook."""
+    g.request_started = time.perf_counter()
+
+
+def record_request(response):
+    """Record the request's latency and status.
+
+    Registered as an after_request hook. Routes are labelled by their URL
+    rule (e.g. /api/audits/<audit_id>), so paths do not blow up the number
+    of series.
+    """
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUEST_LATENCY.observe(time.perf_counter() - started, method=request.method, route=route)
+    REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+    return response
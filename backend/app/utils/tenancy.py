@@ -0,0 +1,35 @@
+"""Tenant scoping of audit queries.
+
+Every audit belongs to a tenant: an organization, or the personal tenant
+of the user who created it, whose id is that user's id. Audit queries are
+filtered by tenant, and the audit collections are sharded on SHARD_KEY,
+so each tenant-scoped operation targets a single shard.
+"""
+
+from bson import ObjectId
+from flask import current_app
+
+# Hashed, so tenants spread evenly across shards whatever their ids
+SHARD_KEY = {'tenant_id': 'hashed'}
+
+
+def tenant_filter(tenant_id):
+    """MongoDB filter selecting a tenant's documents.
+
+    Until TENANT_BACKFILL_COMPLETE is set, documents written before
+    tenants existed (no tenant_id yet) are matched through their creator,
+    whose personal tenant they belong to.
+    """
+    tenant_id = ObjectId(tenant_id)
+    if current_app.config['TENANT_BACKFILL_COMPLETE']:
+        return {'tenant_id': tenant_id}
+    return {'$or': [
+        {'tenant_id': tenant_id},
+        {'tenant_id': {'$exists': False}, 'user_id': tenant_id}
+    ]}
+
+
+def tenant_scoped(tenant_id, *filters):
+    """Combine a tenant's filter with further (possibly empty) filters."""
+    clauses = [tenant_filter(tenant_id), *(f for f in filters if f)]
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
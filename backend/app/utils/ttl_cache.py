@@ -0,0 +1,51 @@
+"""Bounded in-process cache whose entries expire."""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe mapping of key -> value with a time to live per entry.
+
+    Beyond max_entries, the least recently used entry is evicted, so the
+    cache stays bounded however many keys pass through it.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Value of a fresh entry, or default."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= now:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        """Store a value for ttl seconds."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        """Drop an entry, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
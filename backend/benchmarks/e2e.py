@@ -0,0 +1,388 @@
+"""End-to-end HTTP benchmarks of the API, with saved baselines.
+
+`run` serves the app on a local port (werkzeug, threaded, keep-alive)
+and drives each scenario over HTTP from --concurrency client threads,
+reporting throughput and p50/p95/p99 latency. State a scenario needs
+(verified users, audits, users with 2FA enabled) is seeded through the
+models beforehand and not timed. Results can be saved as a JSON
+baseline; `compare` checks a run against a baseline and exits non-zero
+if any scenario regressed by more than --threshold.
+
+The database is the MongoDB at MONGODB_URI (a scratch
+<MONGODB_DB_NAME>_bench database, dropped afterwards) or, with
+--db memory, an in-memory mongomock stand-in (pip install mongomock).
+Timings against mongomock are only comparable with each other.
+
+Scenarios: register, login, audit_create, audit_read, audit_update,
+audit_delete, audit_list, 2fa_setup, 2fa_verify. Register validates the
+email domain, so it needs working DNS.
+
+Usage (from backend/):
+    python benchmarks/e2e.py run --concurrency 8 --requests 500 --save benchmarks/baselines/local.json
+    python benchmarks/e2e.py run --db memory --scenarios login,audit_list --save current.json
+    python benchmarks/e2e.py compare benchmarks/baselines/local.json current.json --threshold 0.1
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pyotp
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import WSGIRequestHandler, make_server
+from app import create_app
+from app.db.indexes import create_all_indexes
+from app.db.mongo import MongoDB
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.two_factor_auth import TwoFactorAuth
+from app.models.user import User
+from app.utils.password import hash_password
+from verify_email import percentiles
+
+try:
+    import mongomock
+except ImportError:  # Only needed for --db memory
+    mongomock = None
+
+PASSWORD = 'BenchPass123!'
+
+# Distinct users/audits that repeatable scenarios cycle through
+POOL_SIZE = 100
+
+# Scenarios that can repeat requests, and so are warmed up before timing
+WARM_UP = ('login', 'audit_read', 'audit_update', 'audit_list', '2fa_setup')
+
+AUDIT_DATA = {
+    'electricity_consumption': 12000,
+    'natural_gas_consumption': 800,
+    'water_consumption': 450,
+    'waste_generated': 900,
+    'renewable_energy_percentage': 20
+}
+
+
+class KeepAliveHandler(WSGIRequestHandler):
+    """HTTP/1.1 handler, so clients reuse connections; no access log."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+# ==================== SCENARIOS ====================
+# Each scenario has a setup(ctx, requests) returning its state, run in an
+# app context, and a build(state, i) returning request i as
+# (method, path, json body, headers, expected status).
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _seed_users(count, hashed_password, prefix):
+    """Verified users sharing one password hash; returns (email, id) pairs."""
+    users = []
+    for i in range(count):
+        email = f'{prefix}-{i}@example.com'
+        users.append((email, User.create_user(email, hashed_password, is_verified=True)))
+    return users
+
+
+def _seed_audits(user_id, count):
+    return [
+        CarbonEmissionAudit.create_audit(user_id, f'Facility {i}', '2026-Q1', AUDIT_DATA)
+        for i in range(count)
+    ]
+
+
+def setup_register(ctx, requests):
+    return {'run': ctx['run']}
+
+
+def build_register(state, i):
+    body = {'email': f"bench-{state['run']}-new-{i}@example.com", 'password': PASSWORD}
+    return 'POST', '/api/auth/register', body, {}, 201
+
+
+def setup_login(ctx, requests):
+    return {'users': _seed_users(min(requests, POOL_SIZE), ctx['hashed_password'], f"bench-{ctx['run']}-login")}
+
+
+def build_login(state, i):
+    email, _ = state['users'][i % len(state['users'])]
+    return 'POST', '/api/auth/login', {'email': email, 'password': PASSWORD}, {}, 200
+
+
+def setup_audit_create(ctx, requests):
+    return {'headers': ctx['headers']}
+
+
+def build_audit_create(state, i):
+    body = {'facility_name': f'Plant {i}', 'audit_period': '2026-Q1', 'audit_data': AUDIT_DATA}
+    return 'POST', '/api/audits/carbon/create', body, state['headers'], 201
+
+
+def setup_audits(ctx, requests):
+    return {'headers': ctx['headers'], 'audit_ids': _seed_audits(ctx['user_id'], min(requests, POOL_SIZE))}
+
+
+def build_audit_read(state, i):
+    audit_id = state['audit_ids'][i % len(state['audit_ids'])]
+    return 'GET', f'/api/audits/carbon/{audit_id}', None, state['headers'], 200
+
+
+def build_audit_update(state, i):
+    audit_id = state['audit_ids'][i % len(state['audit_ids'])]
+    body = {'audit_data': dict(AUDIT_DATA, electricity_consumption=10000 + i)}
+    return 'PUT', f'/api/audits/carbon/{audit_id}', body, state['headers'], 200
+
+
+def setup_audit_delete(ctx, requests):
+    # Every request deletes its own audit
+    return {'headers': ctx['headers'], 'audit_ids': _seed_audits(ctx['user_id'], requests)}
+
+
+def build_audit_delete(state, i):
+    return 'DELETE', f"/api/audits/carbon/{state['audit_ids'][i]}", None, state['headers'], 200
+
+
+def build_audit_list(state, i):
+    return 'GET', '/api/audits/carbon/list?limit=20', None, state['headers'], 200
+
+
+def setup_2fa_setup(ctx, requests):
+    return {'headers': ctx['headers']}
+
+
+def build_2fa_setup(state, i):
+    return 'POST', '/api/auth/2fa/setup', {}, state['headers'], 200
+
+
+def setup_2fa_verify(ctx, requests):
+    # A TOTP code is accepted once per time step, so each request gets its own user
+    users = []
+    for _, user_id in _seed_users(requests, ctx['hashed_password'], f"bench-{ctx['run']}-2fa"):
+        secret = pyotp.random_base32()
+        TwoFactorAuth.create_2fa(user_id, secret, TwoFactorAuth.generate_backup_codes())
+        TwoFactorAuth.enable_2fa(user_id)
+        User.enable_2fa(user_id)
+        users.append((create_access_token(identity=user_id), pyotp.TOTP(secret)))
+    return {'users': users}
+
+
+def build_2fa_verify(state, i):
+    token, totp = state['users'][i]
+    return 'POST', '/api/auth/2fa/verify-code', {'access_token': token, 'code': totp.now()}, {}, 200
+
+
+SCENARIOS = {
+    'register': (setup_register, build_register),
+    'login': (setup_login, build_login),
+    'audit_create': (setup_audit_create, build_audit_create),
+    'audit_read': (setup_audits, build_audit_read),
+    'audit_update': (setup_audits, build_audit_update),
+    'audit_delete': (setup_audit_delete, build_audit_delete),
+    'audit_list': (setup_audits, build_audit_list),
+    '2fa_setup': (setup_2fa_setup, build_2fa_setup),
+    '2fa_verify': (setup_2fa_verify, build_2fa_verify)
+}
+
+
+# ==================== RUNNING ====================
+
+def drive(port, build, state, requests, concurrency):
+    """Send `requests` requests from `concurrency` threads.
+
+    Returns:
+        Dict of throughput, latency percentiles and error count
+    """
+    next_index = iter(range(requests))
+    index_lock = threading.Lock()
+    latencies, errors = [], []
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        own_latencies = []
+        while True:
+            with index_lock:
+                i = next(next_index, None)
+            if i is None:
+                break
+            method, path, body, headers, expected = build(state, i)
+            payload = json.dumps(body) if body is not None else None
+            headers = dict(headers, **{'Content-Type': 'application/json'}) if payload else headers
+            started = time.perf_counter()
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+            own_latencies.append((time.perf_counter() - started) * 1000)
+            if response.status != expected:
+                errors.append(f'{method} {path} -> {response.status}: {content[:200]!r}')
+        connection.close()
+        latencies.extend(own_latencies)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = {'requests': requests, 'errors': len(errors), 'throughput_rps': round(requests / elapsed, 2)}
+    result.update({name: round(value, 3) for name, value in percentiles(latencies).items()})
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+def use_database(app, db):
+    """Point MongoDB at a scratch database; returns a cleanup callable."""
+    name = f"{app.config['MONGODB_DB_NAME']}_bench"
+    if db == 'memory':
+        if mongomock is None:
+            sys.exit('--db memory needs mongomock (pip install mongomock)')
+        MongoDB._client = mongomock.MongoClient()
+        MongoDB._db = MongoDB._client[name]
+        return lambda: None
+
+    app.config['MONGODB_DB_NAME'] = name
+    with app.app_context():
+        db = MongoDB.get_db()
+        MongoDB._client.drop_database(db.name)
+    return lambda: MongoDB._client.drop_database(name)
+
+
+def run(args):
+    scenarios = args.scenarios.split(',')
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    app = create_app()
+    cleanup = use_database(app, args.db)
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = {}
+    try:
+        with app.app_context():
+            create_all_indexes()
+            run_id = uuid.uuid4().hex[:8]
+            hashed_password = hash_password(PASSWORD)
+            user_id = User.create_user(f'bench-{run_id}@example.com', hashed_password, is_verified=True)
+            ctx = {
+                'run': run_id,
+                'hashed_password': hashed_password,
+                'user_id': user_id,
+                'headers': _bearer(create_access_token(identity=user_id))
+            }
+
+        for name in scenarios:
+            setup, build = SCENARIOS[name]
+            with app.app_context():
+                state = setup(ctx, args.requests)
+            if name in WARM_UP:
+                drive(server.server_port, build, state, min(args.concurrency, args.requests), args.concurrency)
+            results[name] = drive(server.server_port, build, state, args.requests, args.concurrency)
+            r = results[name]
+            print(f"{name:>13}: {r['throughput_rps']:8.1f} req/s  p50={r['p50']:.2f}ms  "
+                  f"p95={r['p95']:.2f}ms  p99={r['p99']:.2f}ms  errors={r['errors']}")
+            if r['errors']:
+                print(f"{'':>15}{r['first_error']}")
+    finally:
+        server.shutdown()
+        cleanup()
+
+    if args.save:
+        baseline = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'db': args.db,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'python': platform.python_version(),
+            'machine': platform.node(),
+            'scenarios': results
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved results to {args.save}")
+    return 1 if any(r['errors'] for r in results.values()) else 0
+
+
+# ==================== COMPARING ====================
+
+def compare_results(baseline, current, threshold):
+    """Scenario-by-scenario changes of current vs. baseline.
+
+    Returns:
+        List of (scenario, metric, baseline value, current value, change,
+        regressed) for every metric of the scenarios both runs have
+    """
+    rows = []
+    for name, base in baseline['scenarios'].items():
+        now = current['scenarios'].get(name)
+        if now is None:
+            continue
+        # Lower throughput or higher latency is worse
+        for metric, sign in (('throughput_rps', -1), ('p50', 1), ('p95', 1), ('p99', 1)):
+            change = (now[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+            rows.append((name, metric, base[metric], now[metric], change, sign * change > threshold))
+        if now['errors'] > base['errors']:
+            rows.append((name, 'errors', base['errors'], now['errors'], None, True))
+    return rows
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    for key in ('db', 'concurrency'):
+        if baseline.get(key) != current.get(key):
+            print(f"Warning: {key} differs ({baseline.get(key)} vs {current.get(key)})")
+
+    rows = compare_results(baseline, current, args.threshold)
+    for name, metric, base, now, change, regressed in rows:
+        delta = f"{change:+.1%}" if change is not None else ''
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{name:>13} {metric:>14}: {base:>10.2f} -> {now:<10.2f} {delta:>8}{flag}")
+
+    regressions = [row for row in rows if row[-1]]
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run scenarios and optionally save the results')
+    run_parser.add_argument('--db', choices=('mongodb', 'memory'), default='mongodb')
+    run_parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    run_parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--save', help='JSON file to save the results to')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions of a run against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='relative change counted as a regression (default 0.1)')
+
+    args = parser.parse_args()
+    sys.exit(run(args) if args.command == 'run' else compare(args))
+
+
+if __name__ == '__main__':
+    main()
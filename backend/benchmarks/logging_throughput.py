@@ -0,0 +1,97 @@
+"""Benchmark request throughput with logging off, synchronous and queued.
+
+Sends authenticated POST /api/session/refresh requests (each logs "Token
+refreshed for user ...") through the Flask test client from several
+threads, once per logging setup:
+
+- off: logging disabled
+- sync: logging.basicConfig-style StreamHandler writing text lines to a
+  file on the request thread (the previous setup)
+- queue: configure_logging(), JSON lines written by the listener thread
+- sampled: configure_logging() keeping 10% of app.routes.session records
+
+Usage (from backend/, no database needed):
+    python benchmarks/logging_throughput.py --requests 20000 --threads 8 --repeat 3
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.utils.logging_config import TEXT_FORMAT, configure_logging, stop_logging
+
+
+def use_logging(mode, log_file):
+    """Configure the root logger for one benchmark mode."""
+    logging.disable(logging.NOTSET)
+    if mode == 'off':
+        logging.disable(logging.CRITICAL)
+    elif mode == 'sync':
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        handler = logging.StreamHandler(log_file)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    else:
+        rates = {'app.routes.session': 0.1} if mode == 'sampled' else {}
+        configure_logging(level='INFO', sample_rates=rates, stream=log_file)
+
+
+def run(app, token, requests, threads):
+    """Requests per second over `requests` refreshes from `threads` threads."""
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def worker(count):
+        client = app.test_client()
+        for _ in range(count):
+            response = client.post('/api/session/refresh', headers=headers)
+            assert response.status_code == 200, response.get_json()
+
+    per_thread = requests // threads
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, [per_thread] * threads))
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--modes', default='off,sync,queue,sampled')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per mode; the best is reported')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity='0' * 24)
+    run(app, token, args.threads * 50, args.threads)  # warm up
+
+    results = {}
+    for _ in range(args.repeat):
+        for mode in args.modes.split(','):
+            with tempfile.NamedTemporaryFile('w', suffix='.log') as log_file:
+                use_logging(mode, log_file)
+                throughput = run(app, token, args.requests, args.threads)
+                stop_logging()  # write out the queued records before closing
+                logging.getLogger().handlers.clear()
+            results[mode] = max(results.get(mode, 0), throughput)
+
+    baseline = results.get('off')
+    for mode, throughput in results.items():
+        relative = f" ({throughput / baseline:.0%} of off)" if baseline else ''
+        print(f"{mode:>8}: {throughput:8.0f} req/s{relative}")
+
+
+if __name__ == '__main__':
+    main()
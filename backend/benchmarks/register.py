@@ -0,0 +1,74 @@
+"""Benchmark /api/auth/register latency.
+
+Registers users through the Flask test client and reports two latencies
+per request:
+
+- response: until the response is returned to the client (current
+  behaviour, with the verification token and email deferred)
+- response + deferred: until the deferred work has also finished, i.e.
+  what the client waited for when registration sent the email inline
+
+Usage (from backend/, needs a running MongoDB at MONGODB_URI; point
+SMTP_SERVER/SMTP_PORT at a local sink such as
+`python -m aiosmtpd -n -l localhost:1025` to include email delivery):
+    python benchmarks/register.py --requests 500
+
+Email validation also resolves the example.com domain, so run with
+working DNS.
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app
+from app.db.mongo import MongoDB
+from app.models.user import User
+from app.models.email_verification import EmailVerification
+from verify_email import percentiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch database')
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config['MONGODB_DB_NAME'] = f"{app.config['MONGODB_DB_NAME']}_bench"
+    client = app.test_client()
+
+    with app.app_context():
+        db = MongoDB.get_db()
+        MongoDB._client.drop_database(db.name)
+        User.create_indexes()
+        EmailVerification.create_indexes()
+
+    responded, completed = [], []
+    run = uuid.uuid4().hex[:8]
+    for i in range(args.requests):
+        started = time.perf_counter()
+        response = client.post('/api/auth/register', json={
+            'email': f"bench-{run}-{i}@example.com",
+            'password': 'BenchPass123!'
+        })
+        responded.append((time.perf_counter() - started) * 1000)
+        response.close()  # Runs the deferred work
+        completed.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 201, response.get_json()
+
+    for label, samples in (('response', responded), ('response + deferred', completed)):
+        print(f"{label:>20} (n={len(samples)}): "
+              + ', '.join(f"{k}={v:.2f}ms" for k, v in percentiles(samples).items()))
+
+    if not args.keep:
+        with app.app_context():
+            MongoDB._client.drop_database(MongoDB.get_db().name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark email verification latency with many outstanding tokens.
+
+Seeds a scratch database with outstanding verification tokens, then times
+AuthService.verify_email for a sample of them and, for comparison, the
+same token lookup forced to scan the collection as it did before the
+token index existed.
+
+Usage (from backend/, needs a running MongoDB at MONGODB_URI):
+    python benchmarks/verify_email.py --tokens 1000000 --samples 1000
+"""
+
+import argparse
+import os
+import random
+import secrets
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app
+from app.db.mongo import MongoDB
+from app.models.user import User
+from app.models.email_verification import EmailVerification
+from app.services.auth_service import AuthService
+
+SEED_BATCH_SIZE = 10000
+
+
+def percentiles(samples_ms):
+    """p50/p95/p99 of latencies in milliseconds."""
+    cuts = statistics.quantiles(samples_ms, n=100)
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def seed(tokens, samples):
+    """Insert outstanding tokens; return the plaintext tokens to verify."""
+    collection = EmailVerification.get_collection()
+    expires_at = datetime.utcnow() + timedelta(hours=24)
+    sampled = []
+    for start in range(0, tokens, SEED_BATCH_SIZE):
+        batch = []
+        for i in range(start, min(start + SEED_BATCH_SIZE, tokens)):
+            token = secrets.token_urlsafe(EmailVerification.TOKEN_LENGTH)
+            email = f"bench-{i}@example.com"
+            if i % max(tokens // samples, 1) == 0 and len(sampled) < samples:
+                sampled.append((email, token))
+            batch.append({
+                "email": email,
+                "token_hash": EmailVerification.hash_token(token),
+                "is_verified": False,
+                "created_at": datetime.utcnow(),
+                "expires_at": expires_at
+            })
+        collection.insert_many(batch, ordered=False)
+
+    # Only the sampled tokens need an account to verify
+    User.get_collection().insert_many([
+        {"email": email, "password": "x", "is_active": True, "is_verified": False}
+        for email, _ in sampled
+    ])
+    return sampled
+
+
+def time_calls(call, args):
+    """Latency in milliseconds of call(arg) for each arg."""
+    latencies = []
+    for arg in args:
+        started = time.perf_counter()
+        call(arg)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tokens', type=int, default=1000000)
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--scan-samples', type=int, default=20,
+                        help='lookups to time with a forced collection scan')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch database')
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config['MONGODB_DB_NAME'] = f"{app.config['MONGODB_DB_NAME']}_bench"
+
+    with app.app_context():
+        db = MongoDB.get_db()
+        MongoDB._client.drop_database(db.name)
+        User.create_indexes()
+        EmailVerification.create_indexes()
+
+        started = time.perf_counter()
+        sampled = seed(args.tokens, args.samples)
+        print(f"Seeded {args.tokens} tokens in {time.perf_counter() - started:.1f}s")
+
+        collection = EmailVerification.get_collection()
+        scan_tokens = [token for _, token in random.sample(sampled, min(args.scan_samples, len(sampled)))]
+        scan = time_calls(
+            lambda token: collection.find_one(
+                {"token_hash": EmailVerification.hash_token(token)},
+                hint=[("$natural", 1)]
+            ),
+            scan_tokens
+        )
+        verify = time_calls(AuthService.verify_email, [token for _, token in sampled])
+
+        print(f"Collection scan lookup (previous behaviour, n={len(scan)}): "
+              + ', '.join(f"{k}={v:.2f}ms" for k, v in percentiles(scan).items()))
+        print(f"verify_email (n={len(verify)}, transactions={MongoDB.supports_transactions()}): "
+              + ', '.join(f"{k}={v:.2f}ms" for k, v in percentiles(verify).items()))
+
+        if not args.keep:
+            MongoDB._client.drop_database(db.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""Build the frontend assets served by the backend."""
+
+from app.config import Config
+from app.utils.assets import build_assets
+
+
+if __name__ == '__main__':
+    manifest = build_assets(Config.ASSETS_SOURCE_DIR, Config.ASSETS_DIR)
+    for name, fingerprinted in sorted(manifest.items()):
+        print(f"{name} -> {fingerprinted}")
+    print(f"Assets written to {Config.ASSETS_DIR}")
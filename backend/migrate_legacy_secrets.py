@@ -0,0 +1,122 @@
+"""Hash secrets stored in plain text by older versions.
+
+- Email verification tokens used to be stored as they were emailed; they
+  are now stored as token_hash only
+- 2FA backup codes used to be stored in plain text next to a list of
+  used ones; they are now keyed hashes, removed when used
+
+The migration walks each collection's _id index in batches, rewrites the
+plaintext records of a batch in one bulk write, and pauses between
+batches to bound the load. New records are written hashed, so it can be
+interrupted and rerun at any time. Run it once after upgrading; until
+then, links emailed and backup codes issued by older versions are
+rejected.
+
+Usage (from backend/):
+    python migrate_legacy_secrets.py --batch-size 1000 --pause 0.1
+"""
+
+import argparse
+import time
+from pymongo import UpdateOne
+from app import create_app
+from app.db.mongo import MongoDB
+from app.models.email_verification import EmailVerification
+from app.models.two_factor_auth import TwoFactorAuth
+
+
+def _migrate(collection, query, projection, update, batch_size, pause):
+    """Apply update(record) to every record matching query, in batches.
+
+    Returns:
+        Number of records updated
+    """
+    updated = 0
+    last_id = None
+    while True:
+        batch_query = dict(query)
+        if last_id is not None:
+            batch_query['_id'] = {'$gt': last_id}
+        records = list(collection.find(batch_query, projection).sort('_id', 1).limit(batch_size))
+        if not records:
+            return updated
+
+        # Matching the query again skips records migrated meanwhile
+        result = collection.bulk_write([
+            UpdateOne({**query, '_id': record['_id']}, update(record)) for record in records
+        ], ordered=False)
+        updated += result.modified_count
+        last_id = records[-1]['_id']
+        if pause:
+            time.sleep(pause)
+
+
+def hash_legacy_tokens(collection, batch_size, pause=0):
+    """Replace plaintext verification tokens with their hashes.
+
+    Returns:
+        Number of records updated
+    """
+    return _migrate(
+        collection,
+        {'token': {'$exists': True}},
+        {'token': 1},
+        lambda record: {
+            '$set': {'token_hash': EmailVerification.hash_token(record['token'])},
+            '$unset': {'token': ''}
+        },
+        batch_size,
+        pause
+    )
+
+
+def hash_legacy_backup_codes(collection, batch_size, pause=0):
+    """Replace plaintext backup codes with their hashes, dropping used ones.
+
+    Returns:
+        Number of records updated
+    """
+    def update(record):
+        used = set(record.get('used_backup_codes', []))
+        return {
+            '$set': {
+                'backup_codes': [
+                    TwoFactorAuth.hash_backup_code(record['user_id'], code)
+                    for code in record.get('backup_codes', [])
+                    if code not in used
+                ],
+                'backup_codes_hashed': True
+            },
+            '$unset': {'used_backup_codes': ''}
+        }
+
+    return _migrate(
+        collection,
+        {'backup_codes_hashed': {'$ne': True}},
+        {'user_id': 1, 'backup_codes': 1, 'used_backup_codes': 1},
+        update,
+        batch_size,
+        pause
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between batches')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db = MongoDB.get_db()
+        for name, migrate in (
+            (EmailVerification.COLLECTION_NAME, hash_legacy_tokens),
+            (TwoFactorAuth.COLLECTION_NAME, hash_legacy_backup_codes)
+        ):
+            started = time.perf_counter()
+            updated = migrate(db[name], args.batch_size, args.pause)
+            print(f"{name}: hashed secrets of {updated} records in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Backfill tenant ids and shard the audit collections.
+
+Documents written before tenants existed belong to their creator's
+personal tenant. The backfill runs against the live database: it walks
+each collection's _id index in batches, sets tenant_id on documents that
+lack it with one update per batch, and pauses between batches to bound
+the load. New documents are written with a tenant_id, so it can be
+interrupted and rerun at any time.
+
+Once it reports nothing left to backfill, set TENANT_BACKFILL_COMPLETE=true
+so audit queries stop matching untagged documents. On a sharded cluster,
+then run it with --shard to shard the audit collections on SHARD_KEY.
+
+Usage (from backend/):
+    python migrate_tenants.py --batch-size 1000 --pause 0.1 [--shard]
+"""
+
+import argparse
+import time
+from app import create_app
+from app.db.mongo import MongoDB
+from app.models.user import User
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.igbc_green_building_audit import IGBCGreenBuildingAudit
+from app.models.esg_audit import ESGAudit
+from app.utils.tenancy import SHARD_KEY
+
+# Collection -> field holding the personal tenant id of a document
+BACKFILL_SOURCES = {
+    User.COLLECTION_NAME: '_id',
+    CarbonEmissionAudit.COLLECTION_NAME: 'user_id',
+    IGBCGreenBuildingAudit.COLLECTION_NAME: 'user_id',
+    ESGAudit.COLLECTION_NAME: 'user_id'
+}
+
+# Users stay unsharded: their unique email index cannot include the shard key
+SHARDED_COLLECTIONS = (
+    CarbonEmissionAudit.COLLECTION_NAME,
+    IGBCGreenBuildingAudit.COLLECTION_NAME,
+    ESGAudit.COLLECTION_NAME
+)
+
+
+def backfill(collection, source_field, batch_size, pause=0):
+    """Set tenant_id from source_field on documents without one.
+
+    Returns:
+        Number of documents updated
+    """
+    updated = 0
+    last_id = None
+    while True:
+        query = {'tenant_id': {'$exists': False}}
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        ids = [doc['_id'] for doc in collection.find(query, {'_id': 1}).sort('_id', 1).limit(batch_size)]
+        if not ids:
+            return updated
+
+        result = collection.update_many(
+            {'_id': {'$in': ids}, 'tenant_id': {'$exists': False}},
+            [{'$set': {'tenant_id': f'${source_field}'}}]
+        )
+        updated += result.modified_count
+        last_id = ids[-1]
+        if pause:
+            time.sleep(pause)
+
+
+def shard_collections(client, db_name):
+    """Shard the audit collections on SHARD_KEY.
+
+    Returns:
+        False if not connected to a sharded cluster
+    """
+    if client.admin.command('hello').get('msg') != 'isdbgrid':
+        return False
+    client.admin.command('enableSharding', db_name)
+    for name in SHARDED_COLLECTIONS:
+        client.admin.command('shardCollection', f'{db_name}.{name}', key=SHARD_KEY)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between batches')
+    parser.add_argument('--shard', action='store_true', help='shard the audit collections afterwards')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db = MongoDB.get_db()
+        CarbonEmissionAudit.create_indexes()
+        IGBCGreenBuildingAudit.create_indexes()
+        ESGAudit.create_indexes()
+
+        for name, source_field in BACKFILL_SOURCES.items():
+            started = time.perf_counter()
+            updated = backfill(db[name], source_field, args.batch_size, args.pause)
+            print(f"{name}: backfilled {updated} documents in {time.perf_counter() - started:.1f}s")
+
+        remaining = sum(db[name].count_documents({'tenant_id': {'$exists': False}}) for name in BACKFILL_SOURCES)
+        if remaining:
+            print(f"{remaining} documents written without a tenant_id meanwhile; run again")
+            return
+        print("Nothing left to backfill; set TENANT_BACKFILL_COMPLETE=true")
+
+        if args.shard:
+            if shard_collections(MongoDB._client, db.name):
+                print(f"Sharded {', '.join(SHARDED_COLLECTIONS)} on {SHARD_KEY}")
+            else:
+                print("Not connected to a sharded cluster (mongos); skipped sharding")
+
+
+if __name__ == '__main__':
+    main()
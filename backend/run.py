@@ -3,33 +3,18 @@
 import os
 import logging
 from app import create_app
-from app.models.user import User
-from app.models.otp import OTP
-from app.models.email_verification import EmailVerification
-from app.models.two_factor_auth import TwoFactorAuth
-from app.models.carbon_emission_audit import CarbonEmissionAudit
-from app.models.igbc_green_building_audit import IGBCGreenBuildingAudit
-from app.models.esg_audit import ESGAudit
-from app.db.mongo import MongoDB
+from app.db.indexes import create_all_indexes
+from app.utils.logging_config import configure_logging
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Setup logging (JSON lines written by a background thread)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
 def init_db():
     """Initialize database indexes."""
     try:
-        User.create_indexes()
-        OTP.create_indexes()
-        EmailVerification.create_indexes()
-        TwoFactorAuth.create_indexes()
-        CarbonEmissionAudit.create_indexes()
-        IGBCGreenBuildingAudit.create_indexes()
-        ESGAudit.create_indexes()
+        create_all_indexes()
         logger.info("Database indexes created successfully")
     except Exception as e:
         logger.error(f"Failed to create indexes: {str(e)}")
@@ -0,0 +1,72 @@
+"""Shared fixtures for the backend tests.
+
+`app` binds the app to an in-memory mongomock database, so most tests
+need no server. Tests that need a real deployment (e.g. replica-set read
+preferences) use `live_app`, a scratch database on MONGODB_URI (default
+mongodb://localhost:27017), skipped when no server is reachable.
+"""
+
+import os
+from bson import ObjectId
+import mongomock
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app import create_app
+from app.db.mongo import MongoDB
+from app.services.health_service import HealthService
+
+MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
+
+
+def _bind(client, db_name):
+    """Point MongoDB at `db_name` on `client`, with fresh routing state."""
+    MongoDB._client = client
+    MongoDB._db = client[db_name]
+    MongoDB._breaker = None
+    MongoDB._recent_writes = {}
+    # Requests must not start the background prober against the test database
+    HealthService._pid = os.getpid()
+
+
+def _unbind():
+    MongoDB._client = None
+    MongoDB._db = None
+    MongoDB._breaker = None
+
+
+@pytest.fixture
+def app():
+    """App bound to an empty in-memory database."""
+    app = create_app()
+    app.config['TESTING'] = True
+    _bind(mongomock.MongoClient(), 'test')
+    with app.app_context():
+        yield app
+    _unbind()
+
+
+@pytest.fixture(scope='session')
+def live_client():
+    """MongoDB client on MONGODB_URI, skipping when no server is reachable."""
+    client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        pytest.skip(f"MongoDB not reachable at {MONGODB_URI}")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def live_app(live_client):
+    """App bound to a scratch database on MONGODB_URI, dropped afterwards."""
+    app = create_app()
+    app.config['TESTING'] = True
+    db_name = f"test_{ObjectId()}"
+    _bind(live_client, db_name)
+    with app.app_context():
+        yield app
+    live_client.drop_database(db_name)
+    _unbind()
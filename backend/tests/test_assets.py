@@ -0,0 +1,112 @@
+"""Tests for the frontend asset build and its serving."""
+
+import gzip
+import json
+import pytest
+
+from app.utils import assets
+from app.utils.assets import FINGERPRINTED, MANIFEST_NAME, build_assets, is_fingerprinted
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = tmp_path / 'public'
+    source.mkdir()
+    for name in FINGERPRINTED:
+        (source / name).write_text(f'/* {name} */\n' * 50)
+    (source / 'index.html').write_text(
+        '<link href="styles.css"><script src="api.js"></script><a href="https://example.com">x</a>'
+    )
+    (source / 'logo.png').write_bytes(b'\x89PNG')
+    return source
+
+
+@pytest.fixture
+def built(app, source, tmp_path):
+    output = tmp_path / 'dist'
+    manifest = build_assets(str(source), str(output))
+    app.config['ASSETS_DIR'] = str(output)
+    return output, manifest
+
+
+def test_build_fingerprints_and_rewrites_references(source, built):
+    output, manifest = built
+
+    assert set(manifest) == set(FINGERPRINTED)
+    assert all(is_fingerprinted(name) for name in manifest.values())
+    assert json.loads((output / MANIFEST_NAME).read_text()) == manifest
+    assert not (output / 'api.js').exists()
+
+    html = (output / 'index.html').read_text()
+    assert f'href="{manifest["styles.css"]}"' in html
+    assert f'src="{manifest["api.js"]}"' in html
+    assert 'href="https://example.com"' in html
+
+
+def test_build_writes_precompressed_text_variants(source, built):
+    output, manifest = built
+    name = manifest['app.js']
+
+    assert gzip.decompress((output / f'{name}.gz').read_bytes()) == (source / 'app.js').read_bytes()
+    assert (output / 'index.html.gz').exists()
+    assert not (output / 'logo.png.gz').exists()
+    assert (output / f'{name}.br').exists() == (assets.brotli is not None)
+
+
+def test_fingerprint_follows_content(source, tmp_path):
+    first = build_assets(str(source), str(tmp_path / 'first'))
+    (source / 'app.js').write_text('changed')
+    second = build_assets(str(source), str(tmp_path / 'second'))
+
+    assert first['app.js'] != second['app.js']
+    assert first['api.js'] == second['api.js']
+
+
+def test_fingerprinted_assets_are_immutable(app, built):
+    _, manifest = built
+    response = app.test_client().get(f'/{manifest["app.js"]}')
+
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+    response.close()
+
+
+def test_pages_are_revalidated(app, built):
+    response = app.test_client().get('/')
+
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    assert not response.cache_control.immutable
+    response.close()
+
+
+@pytest.mark.parametrize('accept_encoding, encoding', [
+    ('gzip', 'gzip'),
+    ('br, gzip', 'br' if assets.brotli is not None else 'gzip'),
+    ('identity', None),
+])
+def test_precompressed_variant_is_served(app, source, built, accept_encoding, encoding):
+    _, manifest = built
+    response = app.test_client().get(f'/{manifest["app.js"]}', headers={'Accept-Encoding': accept_encoding})
+
+    assert response.content_encoding == encoding
+    assert response.mimetype == 'text/javascript'
+    assert 'Accept-Encoding' in response.vary
+    if encoding == 'gzip':
+        assert gzip.decompress(response.get_data()) == (source / 'app.js').read_bytes()
+    elif encoding is None:
+        assert response.get_data() == (source / 'app.js').read_bytes()
+    response.close()
+
+
+@pytest.mark.parametrize('method, path, status', [
+    ('POST', '/api/unknown', 404),
+    ('DELETE', '/api/audits/carbon/a/b/c', 404),
+    ('POST', '/api', 404),
+    ('PATCH', '/api/audits/carbon/list', 405),
+    ('POST', '/index.html', 405),
+    ('GET', '/missing.js', 404),
+])
+def test_unknown_api_paths_are_not_found(app, built, method, path, status):
+    assert app.test_client().open(path, method=method).status_code == status
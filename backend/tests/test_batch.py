@@ -0,0 +1,57 @@
+"""Tests for batched API calls."""
+
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+import pytest
+
+from app.utils.request_metrics import REQUESTS
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def headers(app):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(ObjectId()))}'}
+
+
+def batch(client, headers, *sub_requests):
+    response = client.post('/api/batch', json={'requests': list(sub_requests)}, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['responses']
+
+
+def test_sub_requests_run_in_order_with_the_callers_token(client, headers):
+    created, listed = batch(
+        client, headers,
+        {'id': 1, 'method': 'POST', 'path': '/api/audits/carbon/create',
+         'body': {'facility_name': 'Plant', 'audit_period': '2026', 'input_data': {'electricity_consumption': 100}}},
+        {'id': 2, 'method': 'GET', 'path': '/api/audits/carbon/list'}
+    )
+
+    assert created['status'] == 201
+    assert listed['status'] == 200
+    assert [audit['facility_name'] for audit in listed['body']['audits']] == ['Plant']
+
+
+def test_only_batchable_endpoints_are_dispatched(client, headers):
+    results = batch(
+        client, headers,
+        {'id': 1, 'method': 'POST', 'path': '/api/session/refresh'},
+        {'id': 2, 'method': 'POST', 'path': '/api/batch', 'body': {'requests': []}},
+        {'id': 3, 'method': 'PATCH', 'path': '/api/audits/carbon/list'},
+        {'id': 4, 'method': 'GET', 'path': '/metrics'}
+    )
+
+    assert [result['status'] for result in results] == [400, 400, 405, 400]
+
+
+def test_sub_requests_go_through_request_hooks(client, headers):
+    labels = ('GET', '/api/audits/carbon/list', '200')
+    before = REQUESTS.values().get(labels, 0)
+
+    batch(client, headers, *[{'method': 'GET', 'path': '/api/audits/carbon/list'}] * 3)
+
+    assert REQUESTS.values().get(labels, 0) == before + 3
@@ -0,0 +1,99 @@
+"""Tests for the MongoDB circuit breaker (no database needed)."""
+
+import threading
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.db.circuit_breaker import (
+    CLOSED, OPEN, CircuitBreaker, DatabaseUnavailable, GuardedCollection
+)
+
+
+class FlakyCollection:
+    """Collection stand-in whose operations fail while `down` is set."""
+
+    name = 'flaky'
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+
+    def find_one(self, query):
+        self.calls += 1
+        if self.down:
+            raise ServerSelectionTimeoutError('down')
+        return query
+
+
+@pytest.fixture
+def probe_ok():
+    return threading.Event()
+
+
+@pytest.fixture
+def breaker(probe_ok):
+    def probe():
+        if not probe_ok.is_set():
+            raise ServerSelectionTimeoutError('still down')
+
+    breaker = CircuitBreaker(failure_threshold=3, probe_interval=0.01, probe=probe)
+    yield breaker
+    breaker.stop()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    collection = FlakyCollection()
+    guarded = GuardedCollection(collection, breaker)
+    collection.down = True
+
+    for _ in range(3):
+        with pytest.raises(ServerSelectionTimeoutError):
+            guarded.find_one({})
+
+    assert breaker.state == OPEN
+    with pytest.raises(DatabaseUnavailable):
+        guarded.find_one({})
+    assert collection.calls == 3
+
+
+def test_success_resets_failure_count(breaker):
+    collection = FlakyCollection()
+    guarded = GuardedCollection(collection, breaker)
+
+    for down in (True, True, False, True, True):
+        collection.down = down
+        try:
+            guarded.find_one({})
+        except ServerSelectionTimeoutError:
+            pass
+
+    assert breaker.state == CLOSED
+
+
+def test_probe_closes_breaker_on_recovery(breaker, probe_ok):
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state != CLOSED
+
+    probe_ok.set()
+    for _ in range(200):
+        if breaker.state == CLOSED:
+            break
+        threading.Event().wait(0.01)
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+def test_success_resets_failures_under_the_lock(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+
+    with breaker._lock:
+        reset = threading.Thread(target=breaker.record_success)
+        reset.start()
+        reset.join(0.05)
+        assert reset.is_alive()
+        assert breaker.failures == 2
+    reset.join()
+    assert breaker.failures == 0
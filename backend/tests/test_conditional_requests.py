@@ -0,0 +1,109 @@
+"""Tests for ETags of compressed responses and conditional audit requests."""
+
+from bson import ObjectId
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+import pytest
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.user import User
+from app.services.audit_types import AUDIT_MODELS
+from app.utils.etags import list_etag
+
+
+@pytest.fixture
+def client(app):
+    app.config['COMPRESS_MIN_SIZE'] = 0
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id():
+    return str(User.get_collection().insert_one({'email': 'alice@example.com'}).inserted_id)
+
+
+@pytest.fixture
+def audit_id(user_id):
+    return CarbonEmissionAudit.create_audit(user_id, 'Plant', '2026', {})
+
+
+def auth(user_id, **headers):
+    return {'Authorization': f'Bearer {create_access_token(identity=user_id)}', **headers}
+
+
+@pytest.mark.parametrize('path', ['/api/audits/carbon/list', '/api/audits/carbon/{audit_id}'])
+def test_compressed_responses_carry_a_strong_etag_per_encoding(client, user_id, audit_id, path):
+    path = path.format(audit_id=audit_id)
+    identity = client.get(path, headers=auth(user_id))
+    gzipped = client.get(path, headers=auth(user_id, **{'Accept-Encoding': 'gzip'}))
+
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    etag, weak = identity.get_etag()
+    assert gzipped.get_etag() == (f"{etag}-gzip", False)
+    assert not weak
+
+
+@pytest.mark.parametrize('path', ['/api/audits/carbon/list', '/api/audits/carbon/{audit_id}'])
+def test_if_none_match_accepts_either_etag(client, user_id, audit_id, path):
+    path = path.format(audit_id=audit_id)
+    headers = auth(user_id, **{'Accept-Encoding': 'gzip'})
+    etag, _ = client.get(path, headers=headers).get_etag()
+
+    for tag in (etag, etag[:-len('-gzip')], f'W/"{etag}"'):
+        tag = tag if tag.startswith('W/') else f'"{tag}"'
+        assert client.get(path, headers={**headers, 'If-None-Match': tag}).status_code == 304
+
+    CarbonEmissionAudit.update_audit(audit_id, user_id, {'notes': 'changed'})
+    assert client.get(path, headers={**headers, 'If-None-Match': f'"{etag}"'}).status_code == 200
+
+
+def test_if_match_compares_strongly(client, user_id, audit_id):
+    path = f'/api/audits/carbon/{audit_id}'
+    headers = auth(user_id, **{'Accept-Encoding': 'gzip'})
+    etag, _ = client.get(path, headers=headers).get_etag()
+    body = {'audit_data': {'notes': 'changed'}}
+
+    weak = client.put(path, json=body, headers={**headers, 'If-Match': f'W/"{etag}"'})
+    assert weak.status_code == 412
+
+    response = client.put(path, json=body, headers={**headers, 'If-Match': f'"{etag}"'})
+    assert response.status_code == 200
+
+    stale = client.put(path, json=body, headers={**headers, 'If-Match': f'"{etag}"'})
+    assert stale.status_code == 412
+
+
+@pytest.mark.parametrize('audit_type', ['carbon', 'esg', 'igbc'])
+def test_list_etag_follows_body_order_on_tied_timestamps(app, user_id, audit_type):
+    model = AUDIT_MODELS[audit_type]
+    collection = model._get_collection()
+    created_at = datetime(2026, 1, 1)
+    ids = collection.insert_many([
+        {'tenant_id': ObjectId(user_id), 'user_id': ObjectId(user_id), 'revision': 1,
+         'created_at': created_at, 'updated_at': created_at}
+        for _ in range(3)
+    ]).inserted_ids
+
+    audits = model.find_by_tenant(user_id)
+    assert [audit['_id'] for audit in audits] == sorted(ids, reverse=True)
+    assert list_etag(model.find_versions_by_tenant(user_id)) == list_etag(audits)
+
+
+
+@pytest.mark.parametrize('path', ['/api/audits/carbon/list', '/api/audits/carbon/{audit_id}'])
+def test_not_modified_carries_the_etag_the_client_holds(client, user_id, audit_id, path):
+    path = path.format(audit_id=audit_id)
+    identity, _ = client.get(path, headers=auth(user_id)).get_etag()
+    gzipped, _ = client.get(path, headers=auth(user_id, **{'Accept-Encoding': 'gzip'})).get_etag()
+
+    for accept_encoding, tag, expected in [
+        ('gzip', gzipped, gzipped),
+        ('gzip', identity, identity),
+        ('identity', identity, identity),
+    ]:
+        response = client.get(path, headers=auth(user_id, **{
+            'Accept-Encoding': accept_encoding, 'If-None-Match': f'"{tag}"'
+        }))
+        assert response.status_code == 304
+        assert response.get_etag() == (expected, False)
+        assert 'Accept-Encoding' in response.vary
@@ -0,0 +1,64 @@
+"""Tests for the dashboard summary cache."""
+
+import pytest
+
+from app.services.dashboard_service import DashboardService
+from app.utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def computations(app, monkeypatch):
+    """Count summary computations, which run `during` when set."""
+    DashboardService._cache.clear()
+    calls = []
+    during = []
+
+    def compute(tenant_id):
+        calls.append(tenant_id)
+        if during:
+            during.pop()()
+        return {'total': len(calls)}
+
+    monkeypatch.setattr(DashboardService, '_compute', compute)
+    return calls, during
+
+
+def test_summary_is_cached_until_invalidated(computations):
+    calls, _ = computations
+
+    assert DashboardService.get_summary('t1') == DashboardService.get_summary('t1')
+    DashboardService.invalidate('t1')
+    DashboardService.get_summary('t1')
+
+    assert calls == ['t1', 't1']
+
+
+def test_write_during_computation_is_not_cached(computations):
+    calls, during = computations
+    during.append(lambda: DashboardService.invalidate('t1'))
+
+    DashboardService.get_summary('t1')
+    DashboardService.get_summary('t1')
+
+    assert len(calls) == 2
+
+
+def test_invalidating_unread_tenants_keeps_no_state(computations):
+    for i in range(1000):
+        DashboardService.invalidate(f't{i}')
+
+    assert len(DashboardService._cache) == 0
+    assert DashboardService._computing == {}
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = TTLCache(max_entries=2)
+    cache.set('a', 1, ttl=60)
+    cache.set('b', 2, ttl=60)
+    cache.get('a')
+    cache.set('c', 3, ttl=60)
+
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+    cache.set('d', 4, ttl=0)
+    assert cache.get('d') is None
@@ -0,0 +1,57 @@
+"""Tests for email verification tokens."""
+
+from datetime import datetime, timedelta
+import pytest
+
+from app.db.mongo import MongoDB
+from app.models.email_verification import EmailVerification
+from app.models.user import User
+from app.services.auth_service import AuthService
+from migrate_legacy_secrets import hash_legacy_tokens
+
+
+def create_user(email):
+    User.get_collection().insert_one({'email': email, 'is_verified': False})
+
+
+def test_token_verifies_once(app):
+    create_user('a@example.com')
+    token = EmailVerification.create_verification('a@example.com')
+
+    assert AuthService.verify_email(token)['success']
+    assert User.get_collection().find_one({'email': 'a@example.com'})['is_verified']
+    assert not AuthService.verify_email(token)['success']
+
+
+def test_only_the_token_hash_is_stored(app):
+    token = EmailVerification.create_verification('a@example.com')
+
+    record = EmailVerification.get_collection().find_one({'email': 'a@example.com'})
+
+    assert record['token_hash'] == EmailVerification.hash_token(token)
+    assert token not in record.values()
+
+
+def test_token_of_missing_user_is_not_consumed(live_app):
+    if not MongoDB.supports_transactions():
+        pytest.skip('needs a replica set')
+    token = EmailVerification.create_verification('gone@example.com')
+
+    assert AuthService.verify_email(token)['message'] == 'User not found'
+
+    create_user('gone@example.com')
+    assert AuthService.verify_email(token)['success']
+
+
+def test_migration_hashes_plaintext_tokens(live_app):
+    collection = EmailVerification.get_collection()
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    collection.insert_many([
+        {'email': f'{i}@example.com', 'token': f'token-{i}', 'is_verified': False, 'expires_at': expires_at}
+        for i in range(5)
+    ])
+
+    assert hash_legacy_tokens(collection, batch_size=2) == 5
+    assert hash_legacy_tokens(collection, batch_size=2) == 0
+    assert collection.count_documents({'token': {'$exists': True}}) == 0
+    assert EmailVerification.consume_token('token-3')['email'] == '3@example.com'
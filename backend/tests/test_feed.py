@@ -0,0 +1,89 @@
+"""Tests for the cross-type audit feed and its cursors."""
+
+from datetime import datetime
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+import pytest
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.esg_audit import ESGAudit
+from app.models.igbc_green_building_audit import IGBCGreenBuildingAudit
+from app.services.feed_service import FeedService, decode_cursor, encode_cursor
+
+CREATED_AT = datetime(2026, 3, 1, 12, 0, 0, 123000)
+
+
+@pytest.fixture
+def user_id():
+    return str(ObjectId())
+
+
+def create_audits(user_id, created_at=CREATED_AT):
+    """One audit of each type, all created at the same millisecond."""
+    audits = {
+        'carbon': (CarbonEmissionAudit, CarbonEmissionAudit.create_audit(user_id, 'Plant', '2026', {})),
+        'igbc': (IGBCGreenBuildingAudit, IGBCGreenBuildingAudit.create_audit(user_id, 'Tower', '2026', {})),
+        'esg': (ESGAudit, ESGAudit.create_audit(user_id, 'Acme', '2026', {}))
+    }
+    for model, audit_id in audits.values():
+        model._get_collection().update_one({'_id': ObjectId(audit_id)}, {'$set': {'created_at': created_at}})
+    return {audit_type: audit_id for audit_type, (_, audit_id) in audits.items()}
+
+
+def test_cursor_round_trip():
+    audit = {'created_at': CREATED_AT, '_id': ObjectId()}
+    assert decode_cursor(encode_cursor(audit)) == (CREATED_AT, audit['_id'])
+
+
+@pytest.mark.parametrize('cursor', [
+    'nonsense',
+    '12_notanobjectid',
+    f'abc_{ObjectId()}',
+    f'99999999999999999999_{ObjectId()}',
+])
+def test_invalid_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_equal_timestamps_are_ordered_by_id_across_types(app, user_id):
+    ids = create_audits(user_id)
+
+    items, next_cursor = FeedService.get_feed(user_id, 10)
+
+    expected = sorted(ids.items(), key=lambda item: ObjectId(item[1]), reverse=True)
+    assert [(item['type'], str(item['id'])) for item in items] == expected
+    assert next_cursor is None
+
+
+def test_pages_continue_after_the_cursor(app, user_id):
+    ids = create_audits(user_id)
+    seen = []
+    cursor = None
+    while True:
+        items, cursor = FeedService.get_feed(user_id, 2, cursor)
+        seen.extend(str(item['id']) for item in items)
+        if cursor is None:
+            break
+        assert len(items) == 2
+
+    assert sorted(seen) == sorted(ids.values())
+    assert len(seen) == 3
+
+
+def test_exactly_limit_audits_leave_no_next_page(app, user_id):
+    create_audits(user_id)
+    items, next_cursor = FeedService.get_feed(user_id, 3)
+    assert len(items) == 3
+    assert next_cursor is None
+
+
+@pytest.mark.parametrize('query', [
+    'cursor=nonsense',
+    f'cursor=99999999999999999999_{ObjectId()}',
+    'types=carbon,water',
+])
+def test_feed_rejects_bad_parameters(app, user_id, query):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    response = app.test_client().get(f'/api/audits/feed?{query}', headers=headers)
+    assert response.status_code == 400
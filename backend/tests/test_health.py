@@ -0,0 +1,35 @@
+"""Tests for the cached health checks (no database needed)."""
+
+import time
+
+from app.services.health_service import DOWN, STALE, UP, HealthService
+
+
+def failing_check():
+    raise ConnectionError('refused')
+
+
+def test_timed_check_records_latency_and_error():
+    result = HealthService._timed(failing_check)
+
+    assert result['status'] == DOWN
+    assert result['error'] == 'refused'
+    assert result['latency_ms'] >= 0
+
+
+def test_old_results_are_stale_and_not_ready():
+    HealthService._results = {'mongo': HealthService._timed(lambda: None)}
+    assert HealthService.snapshot(stale_after=60)['mongo']['status'] == UP
+    assert HealthService.is_ready(HealthService.snapshot(stale_after=60))
+
+    HealthService._results['mongo']['checked_monotonic'] = time.monotonic() - 120
+    checks = HealthService.snapshot(stale_after=60)
+
+    assert checks['mongo']['status'] == STALE
+    assert not HealthService.is_ready(checks)
+
+
+def test_not_ready_before_first_probe():
+    HealthService._results = {}
+
+    assert not HealthService.is_ready(HealthService.snapshot(stale_after=60))
@@ -0,0 +1,76 @@
+"""Tests for logging_config module."""
+
+import io
+import json
+import logging
+import os
+import pytest
+
+from app.utils.logging_config import configure_logging, parse_sample_rates, stop_logging
+
+
+@pytest.fixture(autouse=True)
+def root_logger():
+    """Restore the root logger's handlers and level configure_logging() replaces."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    stop_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_records_are_written_as_json_lines():
+    """Test that records reach the stream as JSON, with extra fields."""
+    stream = io.StringIO()
+    configure_logging(level="INFO", json_lines=True, sample_rates={}, stream=stream)
+    logging.getLogger("bench.test").info("Token refreshed for user %s", "u1", extra={"route": "/refresh"})
+    stop_logging()
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "Token refreshed for user u1"
+    assert entry["logger"] == "bench.test"
+    assert entry["route"] == "/refresh"
+
+
+def test_sampling_keeps_warnings():
+    """Test that sampled loggers drop info records but keep warnings."""
+    stream = io.StringIO()
+    configure_logging(level="INFO", json_lines=True, sample_rates={"noisy": 0}, stream=stream)
+    logging.getLogger("noisy.child").info("dropped")
+    logging.getLogger("noisy").warning("kept")
+    logging.getLogger("quiet").info("kept too")
+    stop_logging()
+
+    messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+    assert messages == ["kept", "kept too"]
+
+
+def test_parse_sample_rates():
+    """Test parsing of LOG_SAMPLE_RATES."""
+    assert parse_sample_rates("werkzeug=0.01, app.routes.session=0.1") == {
+        "werkzeug": 0.01,
+        "app.routes.session": 0.1,
+    }
+    assert parse_sample_rates(None) == {}
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_gets_its_own_listener(tmp_path):
+    """Test that a process forked after configuration still writes its records."""
+    path = tmp_path / 'log.jsonl'
+    with open(path, 'w') as stream:
+        configure_logging(level="INFO", json_lines=True, sample_rates={}, stream=stream)
+        pid = os.fork()
+        if pid == 0:
+            logging.getLogger("child").info("from child")
+            stop_logging()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        stop_logging()
+
+    messages = [json.loads(line)["message"] for line in path.read_text().splitlines()]
+    assert messages == ["from child"]
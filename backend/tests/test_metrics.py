@@ -0,0 +1,92 @@
+"""Tests for the metrics registry (no database needed)."""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+from app.utils import metrics
+
+REQUESTS = metrics.counter('test_requests_total', 'Test requests', ('status',))
+LATENCY = metrics.histogram('test_latency_seconds', 'Test latency', buckets=(0.1, 1))
+STATE = metrics.gauge('test_state', 'Test state')
+
+# pid that cannot belong to a live process
+DEAD_PID = 2 ** 22 + 1
+
+
+def sample_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram('latency_seconds', 'Latency', buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    samples = {(suffix, values): value for suffix, _, values, value in histogram.samples()}
+
+    assert samples[('_bucket', ('0.1',))] == 2
+    assert samples[('_bucket', ('1',))] == 3
+    assert samples[('_bucket', ('+Inf',))] == 4
+    assert samples[('_count', ())] == 4
+    assert samples[('_sum', ())] == 3.65
+
+
+def test_histogram_times_block():
+    histogram = metrics.Histogram('block_seconds', 'Block time', ('kind',))
+
+    with histogram.time(kind='test'):
+        pass
+
+    assert histogram.values()[('test',)][0][0] == 1
+
+
+def test_processes_are_aggregated(tmp_path, monkeypatch):
+    monkeypatch.setitem(metrics._multiprocess, 'directory', str(tmp_path))
+    monkeypatch.setitem(metrics._multiprocess, 'path', str(tmp_path / f'metrics_{os.getpid()}_2.json'))
+    (tmp_path / f'metrics_{DEAD_PID}_1.json').write_text(json.dumps({
+        'test_requests_total': [[['200'], 5]],
+        'test_latency_seconds': [[[], [[1, 1, 0], 0.6]]],
+        'test_state': [[[], 7]]
+    }))
+    REQUESTS.inc(status=200)
+    LATENCY.observe(0.05)
+    STATE.set(1)
+
+    text = metrics.render()
+
+    assert 'test_requests_total{status="200"} 6' in sample_lines(text, 'test_requests_total')
+    assert 'test_latency_seconds_count 3' in sample_lines(text, 'test_latency_seconds')
+    # Gauges of exited processes are dropped
+    assert sample_lines(text, 'test_state') == [f'test_state{{pid="{os.getpid()}"}} 1']
+
+
+# Enables multiprocess mode, then runs a task in a process pool
+POOL_SCRIPT = """
+import os, sys
+from app.utils import metrics
+from app.utils.concurrency import new_process_pool
+metrics.enable_multiprocess(sys.argv[1], interval=0.01)
+with new_process_pool(1) as pool:
+    assert pool.submit(os.getpid).result() != os.getpid()
+"""
+
+
+def test_pool_workers_write_no_metrics_file(tmp_path):
+    assert not metrics._multiprocess['fork_hook']
+    subprocess.run([sys.executable, '-c', POOL_SCRIPT, str(tmp_path)], check=True,
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert len(list(tmp_path.glob('metrics_*.json'))) == 1
+
+
+@pytest.mark.parametrize('token, require, headers, status', [
+    (None, False, {}, 200),
+    (None, True, {}, 403),
+    ('secret', True, {}, 401),
+    ('secret', True, {'Authorization': 'Bearer secret'}, 200),
+])
+def test_metrics_endpoint_token(app, token, require, headers, status):
+    app.config.update(METRICS_TOKEN=token, METRICS_REQUIRE_TOKEN=require)
+    assert app.test_client().get('/metrics', headers=headers).status_code == status
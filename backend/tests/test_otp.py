@@ -0,0 +1,85 @@
+"""Tests for password reset OTPs."""
+
+import threading
+import pytest
+
+from app.models.otp import OTP
+
+EMAIL = 'alice@example.com'
+CODE = '123456'
+
+
+@pytest.fixture(autouse=True)
+def indexes(app):
+    OTP.create_indexes()
+    app.config['OTP_MAX_ATTEMPTS'] = 3
+
+
+def attempts():
+    return OTP.get_collection().find_one({'email': EMAIL})['attempts']
+
+
+def test_wrong_code_uses_up_an_attempt(app):
+    OTP.create_otp(EMAIL, CODE)
+
+    assert OTP.consume_otp(EMAIL, '000000') is None
+    assert attempts() == 1
+    assert OTP.consume_otp(EMAIL, CODE)['is_used']
+
+
+def test_code_is_rejected_after_max_attempts(app):
+    OTP.create_otp(EMAIL, CODE)
+    for _ in range(3):
+        assert OTP.consume_otp(EMAIL, '000000') is None
+
+    assert OTP.consume_otp(EMAIL, CODE) is None
+    assert attempts() == 3
+
+
+def test_code_is_single_use(app):
+    OTP.create_otp(EMAIL, CODE)
+
+    assert OTP.consume_otp(EMAIL, CODE) is not None
+    assert OTP.consume_otp(EMAIL, CODE) is None
+
+
+def test_concurrent_guesses_cannot_exceed_max_attempts(app):
+    OTP.create_otp(EMAIL, CODE)
+    guesses = [f'{n:06d}' for n in range(20)]
+    barrier = threading.Barrier(len(guesses))
+    results = []
+
+    def guess(code):
+        with app.app_context():
+            barrier.wait()
+            results.append(OTP.consume_otp(EMAIL, code))
+
+    threads = [threading.Thread(target=guess, args=(code,)) for code in guesses]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [None] * len(guesses)
+    assert attempts() == 3
+    assert OTP.consume_otp(EMAIL, CODE) is None
+
+
+def test_concurrent_use_of_the_right_code_succeeds_once(app):
+    app.config['OTP_MAX_ATTEMPTS'] = 10
+    OTP.create_otp(EMAIL, CODE)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def use():
+        with app.app_context():
+            barrier.wait()
+            results.append(OTP.consume_otp(EMAIL, CODE))
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(result is not None for result in results) == 1
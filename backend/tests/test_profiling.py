@@ -0,0 +1,31 @@
+"""Tests for request profiling (no database needed)."""
+
+import time
+
+from app.utils.profiling import RequestProfiler, list_profiles, load_profile, save_profile
+
+
+def wait_for_io():
+    time.sleep(0.05)
+
+
+def test_profiler_samples_the_calling_thread():
+    profiler = RequestProfiler(interval=0.001)
+    profiler.start()
+    wait_for_io()
+    profiler.stop()
+
+    assert profiler.stacks
+    assert all('wait_for_io (tests/test_profiling.py' in stack for stack in profiler.stacks)
+    assert profiler.collapsed().endswith('\n')
+
+
+def test_only_newest_profiles_are_kept(tmp_path):
+    ids = ['000000000000000000000001', '000000000000000000000002', '000000000000000000000003']
+    for profile_id in ids:
+        save_profile(str(tmp_path), {'id': profile_id, 'method': 'GET', 'path': '/'}, 'main;leaf 1\n', max_files=2)
+
+    assert [profile['id'] for profile in list_profiles(str(tmp_path))] == ids[:0:-1]
+    assert load_profile(str(tmp_path), ids[0]) is None
+    assert load_profile(str(tmp_path), ids[2]) == 'main;leaf 1\n'
+    assert load_profile(str(tmp_path), '../etc/passwd') is None
@@ -0,0 +1,160 @@
+"""Tests for percentile ranks and leaderboards."""
+
+import threading
+import time
+import pytest
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.ranking_service import MetricIndex, RankingService
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes(app):
+    RankingService._indexes = {}
+    RankingService._owners = {}
+    RankingService._loaded_at = {}
+    yield
+    RankingService._indexes = {}
+    RankingService._owners = {}
+    RankingService._loaded_at = {}
+
+
+def create_user(email):
+    return str(User.get_collection().insert_one({'email': email}).inserted_id)
+
+
+def create_audit(user_id, footprint, tenant_id=None, industry=None):
+    data = {'industry': industry} if industry else {}
+    audit_id = CarbonEmissionAudit.create_audit(user_id, 'Plant', '2026', data, tenant_id=tenant_id)
+    CarbonEmissionAudit._get_collection().update_one(
+        {'_id': CarbonEmissionAudit.find_by_id(audit_id)['_id']},
+        {'$set': {'total_carbon_footprint': footprint}}
+    )
+    return audit_id
+
+
+def test_leaderboard_reveals_the_tenants_audits(app):
+    alice, bob = create_user('alice@example.com'), create_user('bob@example.com')
+    org = Organization.create_organization('Acme', alice)
+    personal = create_audit(alice, 1.0)
+    shared = create_audit(bob, 2.0, tenant_id=org)
+    create_audit(bob, 3.0)
+
+    entries, total = RankingService.leaderboard('carbon', org)
+    assert total == 3
+    assert [entry['audit_id'] for entry in entries] == [None, shared, None]
+
+    entries, _ = RankingService.leaderboard('carbon', alice)
+    assert [entry['audit_id'] for entry in entries] == [personal, None, None]
+
+
+def test_concurrent_requests_load_the_indexes_once(app, monkeypatch):
+    create_audit(create_user('alice@example.com'), 1.0)
+    loads = []
+    load = RankingService._load.__func__
+
+    def counting_load(cls, audit_type):
+        loads.append(audit_type)
+        time.sleep(0.05)  # a slow scan, so the other requests arrive meanwhile
+        load(cls, audit_type)
+
+    monkeypatch.setattr(RankingService, '_load', classmethod(counting_load))
+
+    def request():
+        with app.app_context():
+            RankingService.leaderboard('carbon', None)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == ['carbon']
+
+
+def audit(audit_id):
+    return CarbonEmissionAudit.find_by_id(audit_id)
+
+
+def top_values(k=10, segment='all'):
+    entries, _ = RankingService.leaderboard('carbon', None, k, segment)
+    return [entry['value'] for entry in entries]
+
+
+def test_ties_share_a_rank():
+    index = MetricIndex.from_entries([(1.0, 'a'), (2.0, 'b'), (2.0, 'c'), (3.0, 'd')], higher_is_better=False)
+    assert index.rank(2.0) == (2, 25.0)
+    assert index.rank(1.0) == (1, 75.0)
+    assert index.rank(3.0) == (4, 0.0)
+
+    index = MetricIndex.from_entries([(1.0, 'a'), (2.0, 'b'), (2.0, 'c'), (3.0, 'd')], higher_is_better=True)
+    assert index.rank(2.0) == (2, 25.0)
+    assert [value for value, _ in index.top(3)] == [3.0, 2.0, 2.0]
+
+
+def test_empty_index():
+    index = MetricIndex(higher_is_better=True)
+    assert index.rank(1.0) == (None, None)
+    assert index.top(5) == []
+    assert MetricIndex.from_entries([(1.0, 'a')], True).top(0) == []
+
+
+def test_percentile_within_segments(app):
+    user = create_user('alice@example.com')
+    create_audit(user, 1.0, industry='Steel')
+    tied = create_audit(user, 2.0, industry='Steel')
+    create_audit(user, 2.0)
+    create_audit(user, 3.0, industry='Cement')
+
+    rankings = RankingService.percentile('carbon', audit(tied))
+
+    assert rankings == {
+        'all': {'rank': 2, 'percentile': 25.0, 'total': 4},
+        'industry:steel': {'rank': 2, 'percentile': 0.0, 'total': 2}
+    }
+
+
+def test_writes_update_the_loaded_indexes(app):
+    user = create_user('alice@example.com')
+    create_audit(user, 2.0)
+    create_audit(user, 3.0, industry='Steel')
+    assert top_values() == [2.0, 3.0]
+
+    # Created
+    created = create_audit(user, 1.0, industry='Steel')
+    RankingService.observe('carbon', audit(created))
+    assert top_values() == [1.0, 2.0, 3.0]
+    assert top_values(segment='industry:steel') == [1.0, 3.0]
+    assert RankingService.percentile('carbon', audit(created))['all'] == {'rank': 1, 'percentile': 66.67, 'total': 3}
+
+    # Updated: new score, and out of its industry segment
+    CarbonEmissionAudit._get_collection().update_one(
+        {'_id': audit(created)['_id']},
+        {'$set': {'total_carbon_footprint': 5.0, 'input_data': {}}}
+    )
+    RankingService.observe('carbon', audit(created))
+    assert top_values() == [2.0, 3.0, 5.0]
+    assert top_values(segment='industry:steel') == [3.0]
+
+    # Deleted
+    RankingService.discard('carbon', created)
+    entries, total = RankingService.leaderboard('carbon', None)
+    assert [entry['value'] for entry in entries] == [2.0, 3.0]
+    assert total == 2
+
+
+def test_unknown_segment_is_empty(app):
+    create_audit(create_user('alice@example.com'), 1.0)
+    assert RankingService.leaderboard('carbon', None, 10, 'industry:none') == ([], 0)
+
+
+def test_writes_before_loading_are_ignored(app):
+    user = create_user('alice@example.com')
+    audit_id = create_audit(user, 1.0)
+    RankingService.observe('carbon', audit(audit_id))
+    RankingService.discard('carbon', audit_id)
+    assert RankingService._indexes == {}
+    # The first read loads everything from the database
+    assert top_values() == [1.0]
@@ -0,0 +1,63 @@
+"""Tests for read-preference routing.
+
+Run from backend/ with `python -m pytest tests`. The routing tests use
+the in-memory database; the last one reads through secondaryPreferred
+from a real deployment: point MONGODB_URI at a single-host replica set
+(see README "Read Routing"). It is skipped when no server is reachable.
+"""
+
+from bson import ObjectId
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+from app.db.mongo import MongoDB, PRIMARY, SECONDARY_PREFERRED, read_preference
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+
+
+def test_reads_default_to_primary(app):
+    assert isinstance(MongoDB.get_collection('audits').read_preference, Primary)
+
+
+def test_secondary_reads_tolerate_configured_staleness(app):
+    collection = MongoDB.get_collection('audits', SECONDARY_PREFERRED)
+
+    assert isinstance(collection.read_preference, SecondaryPreferred)
+    assert collection.read_preference.max_staleness == app.config['MONGODB_MAX_STALENESS_SECONDS']
+
+
+def test_writer_reads_own_writes_from_primary(app):
+    tenant_id = str(ObjectId())
+    assert isinstance(MongoDB.get_collection('audits', SECONDARY_PREFERRED, writer=tenant_id).read_preference,
+                      SecondaryPreferred)
+
+    MongoDB.note_write(tenant_id)
+
+    assert isinstance(MongoDB.get_collection('audits', SECONDARY_PREFERRED, writer=tenant_id).read_preference,
+                      Primary)
+    assert isinstance(MongoDB.get_collection('audits', SECONDARY_PREFERRED, writer='other').read_preference,
+                      SecondaryPreferred)
+
+
+def test_route_declaration_overrides_method(app):
+    @read_preference(PRIMARY)
+    def primary_view():
+        return MongoDB.get_collection('audits', SECONDARY_PREFERRED).read_preference
+
+    @read_preference(SECONDARY_PREFERRED, max_staleness=120)
+    def secondary_view():
+        return MongoDB.get_collection('audits').read_preference
+
+    assert isinstance(primary_view(), Primary)
+    assert secondary_view().max_staleness == 120
+    assert isinstance(MongoDB.get_collection('audits').read_preference, Primary)
+
+
+def test_list_reads_see_created_audit(live_app):
+    CarbonEmissionAudit.create_indexes()
+    user_id = str(ObjectId())
+
+    CarbonEmissionAudit.create_audit(user_id, 'Plant', '2026', {'electricity_consumption': 100})
+    MongoDB._recent_writes = {}
+
+    # Served by secondaryPreferred, i.e. the primary on a single-host replica set
+    audits = CarbonEmissionAudit.find_by_tenant(user_id)
+    assert [audit['facility_name'] for audit in audits] == ['Plant']
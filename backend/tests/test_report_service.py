@@ -0,0 +1,131 @@
+"""Tests for report rendering and the artifact cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+import pytest
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.services import report_service
+from app.services.report_service import ReportService
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Render on threads, recording the path of every render started."""
+    started = []
+    render = report_service._render_to_file
+
+    def recording_render(audit_type, audit, fmt, path):
+        started.append(path)
+        return render(audit_type, audit, fmt, path)
+
+    monkeypatch.setattr(report_service, '_render_to_file', recording_render)
+    with ThreadPoolExecutor(4) as pool:
+        monkeypatch.setattr(ReportService, '_pool', pool)
+        yield started
+    ReportService._in_flight.clear()
+
+
+@pytest.fixture
+def user_id():
+    return str(ObjectId())
+
+
+@pytest.fixture
+def audit_id(user_id):
+    return CarbonEmissionAudit.create_audit(user_id, 'Plant <North>', '2026', {'electricity_consumption': 1000})
+
+
+def update(audit_id, user_id):
+    # updated_at is stored to the millisecond, so move past the previous one
+    time.sleep(0.002)
+    CarbonEmissionAudit.update_audit(audit_id, user_id, {'electricity_consumption': 2000})
+
+
+def get_report(audit_id, cache_dir, **kwargs):
+    """Get a report once the render's cleanup (run after its result) is done."""
+    audit = CarbonEmissionAudit.find_by_id(audit_id)
+    path = ReportService.get_report('carbon', audit, CarbonEmissionAudit.to_dict, 'html', str(cache_dir), **kwargs)
+    while ReportService._in_flight:
+        time.sleep(0.001)
+    # The sweep holds the lock from popping the render until it is done
+    with ReportService._lock:
+        return path
+
+
+def test_html_report_is_rendered(app, renders, audit_id, tmp_path):
+    path = get_report(audit_id, tmp_path)
+
+    html = open(path, encoding='utf-8').read()
+    assert 'Carbon Emission Audit Report' in html
+    assert 'Plant &lt;North&gt;' in html
+    assert '820.0 kg CO2' in html
+
+
+def test_same_version_is_served_from_the_cache(app, renders, audit_id, tmp_path):
+    assert get_report(audit_id, tmp_path) == get_report(audit_id, tmp_path)
+    assert len(renders) == 1
+
+
+def test_concurrent_requests_share_one_render(app, renders, audit_id, tmp_path, monkeypatch):
+    release = threading.Event()
+    render = report_service._render_to_file
+
+    def slow_render(*args):
+        release.wait(5)
+        return render(*args)
+
+    monkeypatch.setattr(report_service, '_render_to_file', slow_render)
+    audit = CarbonEmissionAudit.find_by_id(audit_id)
+
+    with ThreadPoolExecutor(4) as requests:
+        futures = [
+            requests.submit(ReportService.get_report, 'carbon', audit, CarbonEmissionAudit.to_dict,
+                            'html', str(tmp_path))
+            for _ in range(4)
+        ]
+        time.sleep(0.05)
+        assert len(ReportService._in_flight) == 1
+        release.set()
+        assert len({future.result() for future in futures}) == 1
+
+
+def test_update_renders_a_new_version(app, renders, user_id, audit_id, tmp_path):
+    old = get_report(audit_id, tmp_path)
+    update(audit_id, user_id)
+
+    new = get_report(audit_id, tmp_path)
+
+    assert new != old
+    assert '1640.0 kg CO2' in open(new, encoding='utf-8').read()
+    # The old version was served just now, so a download may be in progress
+    assert os.path.exists(old)
+
+
+def test_old_versions_are_swept_once_not_served(app, renders, user_id, audit_id, tmp_path):
+    old = get_report(audit_id, tmp_path)
+    served = time.time() - 301
+    os.utime(old, (served, served))
+    update(audit_id, user_id)
+
+    get_report(audit_id, tmp_path, stale_seconds=300)
+
+    assert not os.path.exists(old)
+
+
+def test_report_route(app, renders, user_id, audit_id, tmp_path):
+    app.config['REPORT_CACHE_DIR'] = str(tmp_path)
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    client = app.test_client()
+
+    response = client.get(f'/api/audits/carbon/{audit_id}/report', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/html'
+    response.close()
+
+    assert client.get(f'/api/audits/carbon/{audit_id}/report?format=doc', headers=headers).status_code == 400
+    assert client.get(f'/api/audits/carbon/{ObjectId()}/report', headers=headers).status_code == 404
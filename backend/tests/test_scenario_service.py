@@ -0,0 +1,51 @@
+"""Tests for scenario sweeps (no database needed)."""
+
+import pytest
+
+from app.services.scenario_service import ScenarioService
+
+INPUT = {'electricity_consumption': 1000, 'renewable_energy_percentage': 20}
+
+
+def sweep(parameters, max_points=1000, max_dimensions=2):
+    return ScenarioService.sweep(INPUT, parameters, max_points, max_dimensions)
+
+
+def test_sweep_builds_one_axis_per_parameter():
+    result = sweep([
+        {'field': 'renewable_energy_percentage', 'start': 0, 'stop': 100, 'steps': 3},
+        {'field': 'electricity_consumption', 'mode': 'percent_change', 'values': [0, -10]}
+    ])
+
+    assert result['shape'] == [3, 2]
+    assert result['axes'][0]['values'] == [0, 50, 100]
+    assert len(result['results']['total_carbon_footprint']) == 3
+
+
+@pytest.mark.parametrize('parameters', [
+    [{'field': 'electricity_consumption', 'start': 0, 'stop': 1, 'steps': 10 ** 10}],
+    [{'field': 'electricity_consumption', 'start': 0, 'stop': 1, 'steps': 1e308}],
+    [{'field': 'electricity_consumption', 'start': 0, 'stop': 1, 'steps': 40},
+     {'field': 'renewable_energy_percentage', 'values': list(range(30))}]
+])
+def test_grid_over_the_cap_is_rejected_before_allocation(parameters):
+    with pytest.raises(ValueError, match='maximum of 1000 points'):
+        sweep(parameters)
+
+
+@pytest.mark.parametrize('parameters', [
+    {'field': 'electricity_consumption'},
+    ['electricity_consumption'],
+    [None],
+    [{'field': 'electricity_consumption', 'values': 'abc'}],
+    [{'field': 'electricity_consumption', 'values': ['a', 'b']}],
+    [{'field': 'electricity_consumption', 'values': [[1, 2]]}],
+    [{'field': 'electricity_consumption', 'start': 0, 'stop': 1, 'steps': 'many'}],
+    [{'field': 'electricity_consumption', 'start': 0, 'stop': 1, 'steps': float('inf')}],
+    [{'field': 'electricity_consumption', 'start': 0, 'stop': 1, 'steps': 0}],
+    [{'field': 'unknown', 'values': [1]}],
+    None
+])
+def test_malformed_parameters_are_value_errors(parameters):
+    with pytest.raises(ValueError):
+        sweep(parameters)
@@ -0,0 +1,177 @@
+"""Equivalence of the compiled default specs with the original scalar formulas."""
+
+import numpy as np
+import pytest
+
+from app.models.esg_audit import ESGAudit
+from app.models.igbc_green_building_audit import IGBCGreenBuildingAudit
+from app.scoring import compiler
+from app.scoring.specs import ESG_V1
+
+
+def esg_reference(data):
+    """ESG scores as computed before scoring specs."""
+    value = lambda field: float(data.get(field, 0))
+    environmental = (value('carbon_management') * 0.3 + value('water_management') * 0.3 +
+                     value('waste_management') * 0.2 + value('renewable_energy') * 0.2)
+    social = (value('employee_satisfaction') * 0.3 + value('community_impact') * 0.3 +
+              value('health_safety') * 0.2 + value('diversity_inclusion') * 0.2)
+    governance = (value('ethics_compliance') * 0.35 + value('audit_controls') * 0.35 +
+                  value('board_diversity') * 0.15 + value('transparency') * 0.15)
+    esg = (environmental + social + governance) / 3
+    if esg >= 80:
+        rating = 'EXCELLENT'
+    elif esg >= 70:
+        rating = 'VERY GOOD'
+    elif esg >= 60:
+        rating = 'GOOD'
+    elif esg >= 50:
+        rating = 'ADEQUATE'
+    else:
+        rating = 'NEEDS IMPROVEMENT'
+    return {'environmental_score': environmental, 'social_score': social,
+            'governance_score': governance, 'esg_score': esg}, rating
+
+
+IGBC_CAPS = {
+    'site_selection': 10, 'water_conservation': 10, 'energy_conservation': 15,
+    'environment_protection': 10, 'health_wellbeing': 10, 'construction_practices': 10,
+    'management_operations': 10, 'innovation': 5
+}
+
+
+def igbc_reference(data):
+    """IGBC scores as computed before scoring specs."""
+    total = sum(min(float(data.get(field, 0)), cap) for field, cap in IGBC_CAPS.items())
+    if total >= 85:
+        rating = 'PLATINUM'
+    elif total >= 70:
+        rating = 'GOLD'
+    elif total >= 55:
+        rating = 'SILVER'
+    elif total >= 40:
+        rating = 'GREEN'
+    else:
+        rating = 'NOT RATED'
+    return {'total_score': total}, rating
+
+
+def random_rows(fields, high, count=2000):
+    rng = np.random.default_rng(7)
+    rows = [
+        {field: round(float(value), 1) for field, value in zip(fields, values)}
+        for values in rng.uniform(0, high, (count, len(fields)))
+    ]
+    # Exact threshold hits, missing fields and an industry without overrides
+    rows += [{field: 80 for field in fields}, {field: 50 for field in fields}, {}, {'industry': 'steel'}]
+    return rows
+
+
+def assert_equivalent(results, rows, reference, thresholds):
+    for result, row in zip(results, rows):
+        scores, rating = reference(row)
+        for name, score in scores.items():
+            assert result[name] == pytest.approx(score, abs=0.005 + 1e-9)
+        rated = list(scores.values())[-1]
+        # Ratings apply to the rounded score, which can only differ on a threshold
+        if min(abs(rated - threshold) for threshold in thresholds) >= 0.005:
+            assert result.get('esg_rating', result.get('rating')) == rating
+
+
+def test_esg_default_spec_matches_scalar_formulas():
+    fields = ESGAudit.ENVIRONMENTAL_FIELDS + ESGAudit.SOCIAL_FIELDS + ESGAudit.GOVERNANCE_FIELDS
+    rows = random_rows(fields, 100)
+
+    assert_equivalent(ESGAudit.calculate_scores_batch(rows), rows, esg_reference, (50, 60, 70, 80))
+
+
+def test_igbc_default_spec_matches_scalar_formulas():
+    # Up to twice the largest cap, so capping is exercised
+    rows = random_rows(list(IGBC_CAPS), 30)
+
+    results = IGBCGreenBuildingAudit.calculate_scores_batch(rows)
+
+    assert_equivalent(results, rows, igbc_reference, (40, 55, 70, 85))
+    for result, row in zip(results, rows):
+        for field, cap in IGBC_CAPS.items():
+            assert result[field] == pytest.approx(min(float(row.get(field, 0)), cap), abs=0.005)
+
+
+def test_single_audit_scoring_matches_batch():
+    row = {'carbon_management': 72.5, 'ethics_compliance': 90, 'industry': 'manufacturing'}
+
+    assert ESGAudit.calculate_scores(row) == ESGAudit.calculate_scores_batch([row])[0]
+    assert ESGAudit.calculate_scores(row)['industry'] == 'default'
+
+
+STEEL = {
+    'groups': {'environmental_score': {
+        'carbon_management': 0.7, 'water_management': 0.1, 'waste_management': 0.1, 'renewable_energy': 0.1
+    }},
+    'composite': {'environmental_score': 0.5, 'social_score': 0.25, 'governance_score': 0.25}
+}
+
+
+@pytest.fixture
+def steel_spec(monkeypatch):
+    """Register a synthetic steel override on esg-v1, which defines none."""
+    monkeypatch.setitem(compiler.SCORING_SPECS, 'esg-v1', {**ESG_V1, 'industries': {'steel': STEEL}})
+    compiler._compile.cache_clear()
+    yield
+    compiler._compile.cache_clear()
+
+
+def test_merge_industry_overrides_only_the_given_weights(steel_spec):
+    spec = compiler.SCORING_SPECS['esg-v1']
+
+    groups, composite, industry = compiler._merge_industry(spec, 'steel')
+    assert industry == 'steel'
+    assert groups['environmental_score'] == STEEL['groups']['environmental_score']
+    assert groups['social_score'] == ESG_V1['groups']['social_score']
+    assert composite == STEEL['composite']
+    # The base spec is copied, not modified
+    assert spec['groups']['environmental_score']['carbon_management'] == 0.3
+
+    assert compiler._merge_industry(spec, 'mining') == (
+        ESG_V1['groups'], ESG_V1['composite']['weights'], 'default'
+    )
+
+
+def test_industry_specs_are_compiled_and_cached_per_industry(steel_spec):
+    steel = compiler.get_spec('esg', industry=' Steel ')
+    default = compiler.get_spec('esg', industry='mining')
+
+    assert steel is compiler.get_spec('esg', industry='steel')
+    assert default is compiler.get_spec('esg')
+    assert (steel.industry, default.industry) == ('steel', 'default')
+    assert compiler._compile.cache_info().currsize == 2
+
+    carbon = steel.fields.index('carbon_management')
+    assert steel.weights[carbon, steel.outputs.index('environmental_score')] == 0.7
+    assert steel.weights[carbon, steel.outputs.index('esg_score')] == pytest.approx(0.35)
+    # Overrides change weights only; the rating scheme is shared
+    np.testing.assert_array_equal(steel.thresholds, default.thresholds)
+    np.testing.assert_array_equal(steel.labels, default.labels)
+
+
+def test_batch_scores_each_industry_with_its_own_spec(steel_spec):
+    fields = ESGAudit.ENVIRONMENTAL_FIELDS + ESGAudit.SOCIAL_FIELDS + ESGAudit.GOVERNANCE_FIELDS
+    base = {field: 60 for field in fields}
+    rows = [
+        {**base, 'carbon_management': 100, 'industry': 'steel'},
+        {**base, 'carbon_management': 100},
+        {**base, 'carbon_management': 100, 'industry': 'STEEL'},
+        {**base, 'carbon_management': 100, 'industry': 'mining'},
+    ]
+
+    results = ESGAudit.calculate_scores_batch(rows)
+
+    assert [result['industry'] for result in results] == ['steel', 'default', 'steel', 'default']
+    # Environmental 88 in steel (72 by default), weighted 0.5 against 60s
+    assert results[0]['environmental_score'] == 88
+    assert results[0]['esg_score'] == 74
+    assert results[0]['esg_rating'] == 'VERY GOOD'
+    assert results[1]['environmental_score'] == 72
+    assert results[1]['esg_score'] == 64
+    assert results[1]['esg_rating'] == 'GOOD'
+    assert results[2] == results[0] and results[3] == results[1]
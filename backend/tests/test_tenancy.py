@@ -0,0 +1,95 @@
+"""Tests for tenant isolation and organization membership."""
+
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+import pytest
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.tenant_service import TENANT_HEADER, TenantService
+
+
+@pytest.fixture
+def client(app):
+    Organization.create_indexes()
+    TenantService._roles.clear()
+    return app.test_client()
+
+
+def create_user(email):
+    return str(User.get_collection().insert_one({'email': email}).inserted_id)
+
+
+def auth(user_id, tenant_id=None):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    if tenant_id:
+        headers[TENANT_HEADER] = tenant_id
+    return headers
+
+
+def audit_names(client, headers):
+    response = client.get('/api/audits/carbon/list', headers=headers)
+    assert response.status_code == 200
+    return [audit['facility_name'] for audit in response.get_json()['audits']]
+
+
+def test_audits_are_isolated_by_tenant(client):
+    alice, bob = create_user('alice@example.com'), create_user('bob@example.com')
+    org = Organization.create_organization('Acme', alice)
+    CarbonEmissionAudit.create_audit(alice, 'Personal plant', '2026', {})
+    CarbonEmissionAudit.create_audit(alice, 'Acme plant', '2026', {}, tenant_id=org)
+
+    assert audit_names(client, auth(alice)) == ['Personal plant']
+    assert audit_names(client, auth(alice, org)) == ['Acme plant']
+    assert audit_names(client, auth(bob)) == []
+    assert client.get('/api/audits/carbon/list', headers=auth(bob, org)).status_code == 403
+
+
+def test_untagged_audits_match_their_creator_until_backfill_completes(app, client):
+    alice = create_user('alice@example.com')
+    audit_id = CarbonEmissionAudit.create_audit(alice, 'Legacy plant', '2020', {})
+    # As written before tenants existed
+    CarbonEmissionAudit._get_collection().update_one({'_id': ObjectId(audit_id)}, {'$unset': {'tenant_id': ''}})
+
+    assert audit_names(client, auth(alice)) == ['Legacy plant']
+
+    app.config['TENANT_BACKFILL_COMPLETE'] = True
+    assert audit_names(client, auth(alice)) == []
+
+
+def test_non_members_are_not_cached(client):
+    alice, bob = create_user('alice@example.com'), create_user('bob@example.com')
+    org = Organization.create_organization('Acme', alice)
+
+    assert TenantService.get_role(org, bob) is None
+    # Added by another worker: nothing to invalidate in this one
+    Organization.add_member(org, bob)
+
+    assert TenantService.get_role(org, bob) == 'member'
+
+
+def test_member_is_added_once_and_can_leave(client):
+    alice, bob = create_user('alice@example.com'), create_user('bob@example.com')
+    org = Organization.create_organization('Acme', alice)
+
+    added = client.post(f'/api/organizations/{org}/members', json={'email': 'bob@example.com'}, headers=auth(alice))
+    again = client.post(f'/api/organizations/{org}/members', json={'email': 'bob@example.com'}, headers=auth(alice))
+    by_member = client.post(f'/api/organizations/{org}/members', json={'email': 'x@example.com'}, headers=auth(bob))
+    left = client.delete(f'/api/organizations/{org}/members/{bob}', headers=auth(bob))
+
+    assert (added.status_code, again.status_code, by_member.status_code, left.status_code) == (201, 409, 404, 200)
+    assert TenantService.get_role(org, bob) is None
+
+
+def test_last_owner_cannot_leave(client):
+    alice, bob = create_user('alice@example.com'), create_user('bob@example.com')
+    org = Organization.create_organization('Acme', alice)
+    Organization.add_member(org, bob)
+
+    assert client.delete(f'/api/organizations/{org}/members/{alice}', headers=auth(alice)).status_code == 409
+    assert client.delete(f'/api/organizations/{org}/members/{alice}', headers=auth(bob)).status_code == 404
+
+    Organization.add_member(org, create_user('carol@example.com'), 'owner')
+    assert client.delete(f'/api/organizations/{org}/members/{alice}', headers=auth(alice)).status_code == 200
+    assert Organization.find_membership(org, alice) is None
@@ -0,0 +1,63 @@
+"""Tests for per-facility carbon trends."""
+
+from datetime import datetime
+from bson import ObjectId
+from flask import current_app
+from flask_jwt_extended import create_access_token
+import pytest
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+
+
+def create_audit(user_id, facility_name, electricity, month):
+    audit_id = CarbonEmissionAudit.create_audit(
+        user_id, facility_name, f'2026-{month:02d}', {'electricity_consumption': electricity}
+    )
+    CarbonEmissionAudit._get_collection().update_one(
+        {'_id': ObjectId(audit_id)}, {'$set': {'created_at': datetime(2026, month, 1)}}
+    )
+    return audit_id
+
+
+def get_trends(user_id, query=''):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    return current_app.test_client().get(f'/api/audits/carbon/trends{query}', headers=headers)
+
+
+@pytest.mark.parametrize('query, status', [
+    ('?facility_name=', 400),
+    ('?facility_name=%20%20', 400),
+    ('?facility_name=Nowhere', 404),
+])
+def test_route_checks_facility_name(app, query, status):
+    user_id = str(ObjectId())
+    create_audit(user_id, 'Plant', 1000, 1)
+    assert get_trends(user_id, query).status_code == status
+
+
+def test_other_tenants_facilities_are_not_found(app):
+    create_audit(str(ObjectId()), 'Plant', 1000, 1)
+    assert get_trends(str(ObjectId()), '?facility_name=Plant').status_code == 404
+
+
+def test_trends_compute_deltas_per_facility(live_app):
+    user_id = str(ObjectId())
+    create_audit(user_id, 'Plant', 1500, 2)
+    create_audit(user_id, 'Plant', 1000, 1)
+    create_audit(user_id, 'Depot', 200, 1)
+    create_audit(str(ObjectId()), 'Plant', 9000, 1)
+
+    facilities = CarbonEmissionAudit.facility_trends(ObjectId(user_id))
+
+    assert [facility['facility_name'] for facility in facilities] == ['Depot', 'Plant']
+    depot, plant = facilities
+    assert [period['audit_period'] for period in plant['periods']] == ['2026-01', '2026-02']
+    first, second = plant['periods']
+    assert first['deltas']['total_carbon_footprint'] == {'change': None, 'percent_change': None}
+    assert second['values']['total_carbon_footprint'] == 1230
+    assert second['deltas']['total_carbon_footprint'] == {'change': 410, 'percent_change': 50}
+    assert len(depot['periods']) == 1
+
+    response = get_trends(user_id, '?facility_name=Plant')
+    assert response.status_code == 200
+    assert [facility['facility_name'] for facility in response.get_json()['facilities']] == ['Plant']
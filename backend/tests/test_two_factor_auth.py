@@ -0,0 +1,158 @@
+"""Tests for 2FA TOTP verification and backup codes."""
+
+import threading
+import time
+from bson import ObjectId
+import pyotp
+import pytest
+from pymongo.errors import AutoReconnect
+
+from app.models.two_factor_auth import TwoFactorAuth
+from migrate_legacy_secrets import hash_legacy_backup_codes
+
+
+SECRET = 'JBSWY3DPEHPK3PXP'
+
+
+@pytest.fixture(autouse=True)
+def indexes(app):
+    TwoFactorAuth.create_indexes()
+    TwoFactorAuth._verifiers = {}
+    TwoFactorAuth._last_steps = {}
+
+
+def enable_2fa(backup_codes):
+    """Set up and enable 2FA for a new user."""
+    user_id = str(ObjectId())
+    TwoFactorAuth.create_2fa(user_id, SECRET, backup_codes)
+    TwoFactorAuth.enable_2fa(user_id)
+    return user_id
+
+
+def code(offset=0):
+    """TOTP code of the time step `offset` steps from the current one."""
+    totp = pyotp.TOTP(SECRET)
+    return totp.generate_otp(int(time.time()) // totp.interval + offset)
+
+
+def other_worker():
+    """Forget what this worker cached, as another worker would."""
+    TwoFactorAuth._verifiers = {}
+    TwoFactorAuth._last_steps = {}
+
+
+def test_totp_code_is_single_use_across_workers(app):
+    user_id = enable_2fa([])
+
+    assert TwoFactorAuth.verify_totp(user_id, code())
+    assert not TwoFactorAuth.verify_totp(user_id, code())
+    other_worker()
+    assert not TwoFactorAuth.verify_totp(user_id, code())
+    assert not TwoFactorAuth.verify_totp(user_id, code(-1))
+    assert TwoFactorAuth.verify_totp(user_id, code(1))
+
+
+def test_verifier_is_cached(app, monkeypatch):
+    user_id = enable_2fa([])
+    TwoFactorAuth._get_verifier(user_id)
+    monkeypatch.setattr(TwoFactorAuth, 'find_by_user', lambda user_id: pytest.fail('not cached'))
+
+    assert TwoFactorAuth.verify_totp(user_id, code())
+
+
+def test_cached_verifier_accepts_nothing_once_disabled_elsewhere(app):
+    user_id = enable_2fa([])
+    TwoFactorAuth._get_verifier(user_id)
+
+    # Disabled through another worker: this one still caches the verifier
+    TwoFactorAuth.get_collection().update_one({'user_id': ObjectId(user_id)}, {'$set': {'is_enabled': False}})
+
+    assert TwoFactorAuth._verifiers[user_id][1] is not None
+    assert not TwoFactorAuth.verify_totp(user_id, code())
+
+
+def test_failed_claim_does_not_use_up_the_step(app, monkeypatch):
+    user_id = enable_2fa([])
+    TwoFactorAuth._get_verifier(user_id)
+
+    class Unreachable:
+        def update_one(self, *args, **kwargs):
+            raise AutoReconnect('connection reset')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(TwoFactorAuth, 'get_collection', classmethod(lambda cls: Unreachable()))
+        with pytest.raises(AutoReconnect):
+            TwoFactorAuth.verify_totp(user_id, code())
+
+    assert TwoFactorAuth.verify_totp(user_id, code())
+
+
+def test_backup_codes_are_stored_hashed(app):
+    user_id = enable_2fa(['a1b2c3d4'])
+
+    stored = TwoFactorAuth.find_by_user(user_id)["backup_codes"]
+
+    assert stored == [TwoFactorAuth.hash_backup_code(user_id, 'a1b2c3d4')]
+
+
+def test_backup_code_is_single_use(app):
+    user_id = enable_2fa(['a1b2c3d4', 'e5f6a7b8'])
+
+    assert TwoFactorAuth.use_backup_code(user_id, 'a1b2c3d4')
+    assert not TwoFactorAuth.use_backup_code(user_id, 'a1b2c3d4')
+    assert TwoFactorAuth.count_backup_codes(user_id) == 1
+
+
+def test_concurrent_use_of_one_backup_code_succeeds_once(app):
+    user_id = enable_2fa(['a1b2c3d4'])
+    attempts = 32
+    barrier = threading.Barrier(attempts)
+    results = []
+
+    def attempt():
+        with app.app_context():
+            barrier.wait()
+            results.append(TwoFactorAuth.use_backup_code(user_id, 'a1b2c3d4'))
+
+    threads = [threading.Thread(target=attempt) for _ in range(attempts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert TwoFactorAuth.count_backup_codes(user_id) == 0
+
+
+def test_regenerate_replaces_backup_codes(app):
+    user_id = enable_2fa(['a1b2c3d4'])
+
+    codes = TwoFactorAuth.regenerate_backup_codes(user_id)
+
+    assert len(codes) == 10
+    assert TwoFactorAuth.count_backup_codes(user_id) == 10
+    assert not TwoFactorAuth.use_backup_code(user_id, 'a1b2c3d4')
+    assert TwoFactorAuth.use_backup_code(user_id, codes[0])
+
+
+def test_backup_codes_require_enabled_2fa(app):
+    user_id = str(ObjectId())
+    TwoFactorAuth.create_2fa(user_id, 'JBSWY3DPEHPK3PXP', ['a1b2c3d4'])
+
+    assert not TwoFactorAuth.use_backup_code(user_id, 'a1b2c3d4')
+    assert TwoFactorAuth.count_backup_codes(user_id) is None
+    assert TwoFactorAuth.regenerate_backup_codes(user_id) is None
+
+
+def test_migration_hashes_unused_plaintext_codes(live_app):
+    collection = TwoFactorAuth.get_collection()
+    user_id = ObjectId()
+    collection.insert_one({
+        'user_id': user_id, 'secret': 'JBSWY3DPEHPK3PXP', 'is_enabled': True,
+        'backup_codes': ['a1b2c3d4', 'e5f6a7b8'], 'used_backup_codes': ['a1b2c3d4']
+    })
+
+    assert hash_legacy_backup_codes(collection, batch_size=1) == 1
+    assert hash_legacy_backup_codes(collection, batch_size=1) == 0
+    assert TwoFactorAuth.count_backup_codes(user_id) == 1
+    assert TwoFactorAuth.use_backup_code(user_id, 'e5f6a7b8')
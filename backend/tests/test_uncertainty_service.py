@@ -0,0 +1,70 @@
+"""Tests for Monte Carlo uncertainty analysis."""
+
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+import pytest
+
+from app.models.carbon_emission_audit import CarbonEmissionAudit
+
+from app.services.uncertainty_service import UncertaintyService
+
+POINTS = [{'electricity_consumption': 1000, 'waste_generated': 0}, {'electricity_consumption': 500}]
+
+
+def simulate(input_specs=None, factor_specs=None, samples=1000, **kwargs):
+    return UncertaintyService.simulate(POINTS, input_specs or {}, factor_specs or {}, samples, seed=1, **kwargs)
+
+
+def test_same_seed_gives_same_intervals():
+    specs = {'electricity_consumption': {'distribution': 'triangular', 'low_percent': -10, 'high_percent': 10}}
+
+    assert simulate(specs) == simulate(specs)
+
+
+def test_chunks_are_bounded_by_audits_times_samples():
+    specs = {'electricity_consumption': {'distribution': 'normal', 'sd_percent': 5}}
+
+    # 2 audits x 500 cells per chunk: four chunks on the process pool
+    chunked = simulate(specs, samples=1000, chunk_size=1000, chunk_cells=500, max_workers=2)
+
+    assert chunked == simulate(specs, samples=1000, chunk_size=250)
+
+
+@pytest.mark.parametrize('input_specs, factor_specs', [
+    ({'electricity_consumption': {'distribution': 'triangular', 'low': 10, 'high': 20, 'mode': 30}}, {}),
+    ({'electricity_consumption': {'distribution': 'triangular', 'low_percent': 10, 'high_percent': 20}}, {}),
+    ({'electricity_consumption': {'distribution': 'uniform', 'low': 20, 'high': 10}}, {}),
+    ({}, {'electricity': {'distribution': 'triangular', 'low': 0.9, 'high': 0.7}}),
+    ({}, {'electricity': {'distribution': 'uniform', 'low': 'a', 'high': 1}}),
+    ({'electricity_consumption': 'normal'}, {}),
+    ([], {}),
+    ({'electricity_consumption': {'distribution': 'gamma'}}, {}),
+    ({'electricity_consumption': {'distribution': 'normal', 'sd_percent': 'x'}}, {}),
+    ({'electricity_consumption': {'distribution': 'normal', 'sd': -1}}, {}),
+    ({'electricity_consumption': {'distribution': 'normal', 'mean': None}}, {}),
+    ({'electricity_consumption': {'distribution': 'lognormal', 'sd_percent': -5}}, {}),
+    ({'electricity_consumption': {'distribution': 'lognormal', 'mean': float('nan')}}, {}),
+    ({}, {'electricity': {'distribution': 'uniform', 'low': 0.7, 'high': float('inf')}})
+])
+def test_invalid_specs_are_value_errors(input_specs, factor_specs):
+    with pytest.raises(ValueError):
+        UncertaintyService.simulate(POINTS, input_specs, factor_specs, 100)
+
+
+@pytest.mark.parametrize('body', [
+    {'audit_ids': 'abc'},
+    {'audit_ids': [['nested']]},
+    {'audit_ids': [{'id': 1}]},
+    {'audit_ids': ['not-an-id']},
+    {'audit_ids': '{audit_id}', 'inputs': {'electricity_consumption': {'distribution': 'normal', 'sd_percent': 'x'}}},
+    {'audit_ids': '{audit_id}', 'samples': 'many'}
+])
+def test_route_rejects_bad_requests(app, body):
+    user_id = str(ObjectId())
+    audit_id = CarbonEmissionAudit.create_audit(user_id, 'Plant', '2026', {'electricity_consumption': 1000})
+    if body['audit_ids'] == '{audit_id}':
+        body = {**body, 'audit_ids': [audit_id]}
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+    response = app.test_client().post('/api/audits/carbon/uncertainty', json=body, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,13 @@
+"""WSGI entry point for production servers.
+
+Usage (from backend/):
+    gunicorn -w 4 wsgi:app
+"""
+
+from app import create_app
+from app.utils.logging_config import configure_logging
+
+# Setup logging (JSON lines written by a background thread)
+configure_logging()
+
+app = create_app()
@@ -4,12 +4,69 @@
  */
 
 class AuditAPI {
-    constructor(baseURL = 'http://localhost:5000') {
+    constructor(baseURL = 'http://localhost:5000', { batch = true, maxBatchSize = 20 } = {}) {
         this.baseURL = baseURL;
         this.apiURL = `${baseURL}/api/audits`;
+        this.batch = batch;
+        // The server's BATCH_MAX_REQUESTS; larger batches are rejected whole
+        this.maxBatchSize = maxBatchSize;
+        this.pending = [];
     }
 
     async request(method, endpoint, data = null) {
+        if (!this.batch) {
+            return this.send(method, endpoint, data);
+        }
+
+        // Coalesce calls made in the same tick into one /api/batch request
+        return new Promise((resolve, reject) => {
+            this.pending.push({ method, endpoint, data, resolve, reject });
+            if (this.pending.length === 1) {
+                queueMicrotask(() => this.flush());
+            }
+        });
+    }
+
+    async flush() {
+        const calls = this.pending;
+        this.pending = [];
+
+        // One batch after the other, so writes stay in call order
+        for (let start = 0; start < calls.length; start += this.maxBatchSize) {
+            await this.sendBatch(calls.slice(start, start + this.maxBatchSize));
+        }
+    }
+
+    async sendBatch(calls) {
+        if (calls.length === 1) {
+            const { method, endpoint, data, resolve, reject } = calls[0];
+            return this.send(method, endpoint, data).then(resolve, reject);
+        }
+
+        try {
+            const result = await this.fetchJSON(`${this.baseURL}/api/batch`, 'POST', {
+                requests: calls.map((call, index) => ({
+                    id: index,
+                    method: call.method,
+                    path: `/api/audits${call.endpoint}`,
+                    body: call.data
+                }))
+            });
+            if (!result.success) {
+                calls.forEach(call => call.resolve(result));
+                return;
+            }
+            result.responses.forEach(response => calls[response.id].resolve(response.body));
+        } catch (error) {
+            calls.forEach(call => call.reject(error));
+        }
+    }
+
+    async send(method, endpoint, data = null) {
+        return this.fetchJSON(`${this.apiURL}${endpoint}`, method, data);
+    }
+
+    async fetchJSON(url, method, data = null) {
         const token = localStorage.getItem('authToken');
         const options = {
             method,
@@ -19,12 +76,18 @@ class AuditAPI {
             }
         };
 
+        // Act on the selected organization instead of the personal tenant
+        const tenantId = localStorage.getItem('tenantId');
+        if (tenantId) {
+            options.headers['X-Tenant-ID'] = tenantId;
+        }
+
         if (data) {
             options.body = JSON.stringify(data);
         }
 
         try {
-            const response = await fetch(`${this.apiURL}${endpoint}`, options);
+            const response = await fetch(url, options);
             return await response.json();
         } catch (error) {
             console.error('API Error:', error);
@@ -115,6 +178,19 @@ class AuditAPI {
     async deleteESGAudit(auditId) {
         return this.request('DELETE', `/esg/${auditId}`);
     }
+
+    // ==================== FEED & DASHBOARD ====================
+
+    async getAuditFeed(limit = 20, cursor = null, types = null) {
+        const params = new URLSearchParams({ limit });
+        if (cursor) params.set('cursor', cursor);
+        if (types) params.set('types', types.join(','));
+        return this.request('GET', `/feed?${params}`);
+    }
+
+    async getDashboardSummary() {
+        return this.request('GET', '/dashboard');
+    }
 }
 
 // Initialize audit API